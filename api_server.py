@@ -22,25 +22,51 @@ from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # App Logic
-from exchanges.nado import NadoClient
+from exchanges.nado import PRODUCT_IDS, NadoClient, product_id_for
 from hft_bot import HFTBot, TradingConfig
+from market_data import MarketDataHub
+from helpers.feed_recorder import FeedRecorder
+from helpers.x18 import x18_to_float
+from helpers.log_pipeline import get_pipeline
 
-# Logging Setup (Queue for WS streaming)
-log_queue = asyncio.Queue()
+# Logging Setup: file + console go through the background log pipeline,
+# the WS log stream gets the raw records (formatted only when a client reads them)
+LOG_STREAM_BUFFER = 1000
+log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_STREAM_BUFFER)
 
 class QueueHandler(logging.Handler):
+    """Feeds the WS log stream without blocking; keeps the newest LOG_STREAM_BUFFER records."""
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _offer(record):
+        if log_queue.full():
+            log_queue.get_nowait()
+        log_queue.put_nowait(record)
+
     def emit(self, record):
-        msg = self.format(record)
-        asyncio.create_task(log_queue.put(msg))
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._offer(record)
+        else:
+            loop.call_soon_threadsafe(self._offer, record)
 
+log_pipeline = get_pipeline()
+stream_handler = QueueHandler()
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
     datefmt='%H:%M:%S',
     handlers=[
-        logging.FileHandler("bot_debug.log", mode='w', encoding='utf-8'),
-        logging.StreamHandler(),
-        QueueHandler()
+        log_pipeline.file_handler("bot_debug.log", mode='w'),
+        log_pipeline.stream_handler(),
+        stream_handler
     ]
 )
 logger = logging.getLogger("API")
@@ -51,6 +77,10 @@ logger = logging.getLogger("API")
 bot_instance: Optional[HFTBot] = None
 last_trading_config: Optional[TradingConfig] = None
 query_client: Optional[NadoClient] = None
+# Shared multi-product depth feed (one WS for all bots / price queries)
+market_hub: Optional[MarketDataHub] = None
+# Raw WS feed capture for post-mortems, enabled by NADO_FEED_RECORD_DIR
+feed_recorder: Optional[FeedRecorder] = None
 
 
 # Models
@@ -112,6 +142,7 @@ def load_last_config() -> Optional[TradingConfig]:
 async def lifespan(app: FastAPI):
     # Load Env
     load_dotenv()
+    stream_handler.loop = asyncio.get_running_loop()
     
     # Load Last Config
     global last_trading_config
@@ -123,6 +154,12 @@ async def lifespan(app: FastAPI):
     # Cleanup
     if bot_instance:
         await bot_instance.stop()
+    if market_hub:
+        await market_hub.close()
+    if feed_recorder:
+        feed_recorder.close()
+    stream_handler.loop = None
+    await asyncio.to_thread(log_pipeline.flush)
 
 app = FastAPI(lifespan=lifespan)
 
@@ -231,9 +268,20 @@ async def start_bot(cfg: StartConfig):
             "boost_mode": cfg.boost_mode
         }
         
-        # New Signature: HFTBot(config_dict, client=client)
+        global market_hub, feed_recorder
+        if market_hub is None:
+            record_dir = os.getenv("NADO_FEED_RECORD_DIR")
+            if record_dir and feed_recorder is None:
+                feed_recorder = FeedRecorder(record_dir).start()
+                logger.info(f"📼 Recording WS feed to {record_dir}")
+            market_hub = MarketDataHub(client, product_ids=PRODUCT_IDS.values(), recorder=feed_recorder)
+        else:
+            # The hub outlives bots: snapshots and the fills channel follow the new config's client
+            market_hub.bind_client(client)
+        
+        # New Signature: HFTBot(config_dict, client=client, market_data=hub)
         logger.info(f"🚀 Initializing HFTBot with config: {bot_config}")
-        bot_instance = HFTBot(bot_config, client=client)
+        bot_instance = HFTBot(bot_config, client=client, market_data=market_hub)
         
         # We need to explicitly run start task
         asyncio.create_task(bot_instance.start())
@@ -291,7 +339,11 @@ async def get_products():
     """Fetch available trading pairs."""
     dummy_cfg = TradingConfig(exchange="nado", ticker="ETH", contract_id="4", quantity=Decimal("0"), take_profit=Decimal("1"), tick_size=Decimal("0.01"), direction="buy", max_orders=1, wait_time=5, grid_step=Decimal("0.01"), stop_price=Decimal(0), pause_price=Decimal(0), boost_mode=False)
     client = NadoClient(dummy_cfg)
-    pairs = await client.get_available_pairs()
+    try:
+        pairs = await client.get_available_pairs()
+    finally:
+        # Throwaway client: release its keep-alive session instead of leaking one per call
+        await client.http.close()
     return {"status": "success", "products": pairs}
 
 @app.post("/close_all")
@@ -325,7 +377,7 @@ async def close_all():
         await asyncio.sleep(1) # Wait for cancel propagation
         
         # B. Get Position (Decimal)
-        pos_size = await active_client.get_account_positions()
+        pos_size = await active_client.get_account_positions(max_age_ms=0)
         logger.info(f"[Panic] Current Position: {pos_size}")
         
         if abs(pos_size) < Decimal("0.0001"):
@@ -420,10 +472,14 @@ async def get_price(ticker: str):
     """Fetch approximate market price for ticker."""
     try:
         # Resolve ID
-        pid = 4
-        if "BTC" in ticker: pid = 2
-        elif "ETH" in ticker: pid = 4
-        elif "SOL" in ticker: pid = 6
+        pid = product_id_for(ticker)
+        
+        # Serve from the shared live book when it is healthy
+        book = market_hub.get_book(pid) if market_hub and market_hub.running else None
+        if book and not book.stale:
+            best = book.best_bid()
+            if best:
+                return {"price": x18_to_float(best[0])}
         
         url = "https://gateway.prod.nado.xyz/v1/query"
         payload = {"type": "market_liquidity", "product_id": pid, "depth": 5}
@@ -447,8 +503,7 @@ async def get_price(ticker: str):
             return {"price": 0}
             
         # Bids are [price, size]
-        best_bid = Decimal(bids[0][0]) / Decimal(10**18)
-        return {"price": float(best_bid)}
+        return {"price": x18_to_float(bids[0][0])}
         
     except Exception as e:
         logger.error(f"Price fetch failed: {e}")
@@ -460,7 +515,7 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             # Simple Log Streaming
-            log = await log_queue.get()
-            await websocket.send_text(log)
+            record = await log_queue.get()
+            await websocket.send_text(stream_handler.format(record))
     except WebSocketDisconnect:
         pass
@@ -0,0 +1,561 @@
+"""
+回测 / 回放引擎 (Backtest & Replay)
+作用：用 FeedRecorder 录制的深度数据驱动真实的 HFTBot 策略循环。时间由模拟时钟推进（不再真实 sleep），
+下单走注册到 ExchangeFactory 的模拟交易所客户端，挂单按回放订单簿撮合，可远快于实时地扫描 spread / interval / max_exposure。
+
+用法: python backtest.py <录制目录或 .bin 文件...> [--spread 0.0003,0.0005] [--interval 2,5] [--max-exposure 200,500]
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from exchanges.base import BaseExchangeClient, OrderInfo, OrderResult
+from exchanges.factory import ExchangeFactory
+from exchanges.nado_frames import DepthFrame, FillFrame, decode_frame
+from hft_bot import HFTBot, TradingConfig
+from helpers.feed_recorder import feed_files, iter_frames
+from helpers.x18 import X18_ONE, to_x18, x18_to_decimal
+from orderbook import LocalOrderBook
+
+logger = logging.getLogger("Backtest")
+
+
+class SimClock:
+    """Discrete-event clock: ``sleep`` parks the caller until the driver advances time past its deadline."""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + max(0.0, float(seconds)), next(self._seq), fut))
+        await fut
+
+    @property
+    def pending(self) -> int:
+        return len(self._sleepers)
+
+    def next_wake(self) -> Optional[float]:
+        # Drop sleepers whose task was cancelled
+        while self._sleepers and self._sleepers[0][2].done():
+            heapq.heappop(self._sleepers)
+        return self._sleepers[0][0] if self._sleepers else None
+
+    def fire_next(self):
+        """Jump to the earliest deadline and wake everything due at that instant."""
+        wake = self.next_wake()
+        if wake is None:
+            return
+        self.now = max(self.now, wake)
+        while self._sleepers and self._sleepers[0][0] <= wake:
+            _, _, fut = heapq.heappop(self._sleepers)
+            if not fut.done():
+                fut.set_result(None)
+
+
+class _SimOrder:
+    __slots__ = ('digest', 'side', 'size', 'price_x18')
+
+    def __init__(self, digest: str, side: str, size: Decimal, price_x18: int):
+        self.digest = digest
+        self.side = side
+        self.size = size
+        self.price_x18 = price_x18
+
+
+class SimVenue:
+    """Matching and account state shared by the replay driver, the simulated client and the feed stand-in.
+
+    Resting limit orders fill in full at their own price as soon as the replayed book trades
+    through them (best ask <= bid price / best bid >= ask price); IOC orders sweep the replayed
+    levels up to their limit. Our own orders never change the recorded book.
+    """
+
+    def __init__(self, book: LocalOrderBook, clock: SimClock, product_id: int = 4,
+                 initial_balance: Decimal = Decimal("1000"), maker_fee_bps: Decimal = Decimal("0"),
+                 taker_fee_bps: Decimal = Decimal("0")):
+        self.book = book
+        self.clock = clock
+        self.product_id = product_id
+        self.initial_balance = Decimal(str(initial_balance))
+        self.maker_fee = Decimal(str(maker_fee_bps)) / Decimal(10_000)
+        self.taker_fee = Decimal(str(taker_fee_bps)) / Decimal(10_000)
+
+        self.orders: Dict[str, _SimOrder] = {}
+        self.position = Decimal("0")
+        # Perp quote leg: -(signed qty * price) - fees, as in Nado's v_quote_balance
+        self.v_quote = Decimal("0")
+        self.fill_handlers: List = []
+        self._pending_fills: List[FillFrame] = []
+        self._digest_seq = itertools.count(1)
+
+        self.fills = 0
+        self.maker_fills = 0
+        self.volume = Decimal("0")
+        self.fees = Decimal("0")
+        self.orders_placed = 0
+        self.orders_cancelled = 0
+        self.max_abs_position = Decimal("0")
+
+    def new_digest(self) -> str:
+        return "0x" + format(next(self._digest_seq), "064x")
+
+    def mark_price(self) -> Decimal:
+        return x18_to_decimal(self.book.get_mid_price_x18())
+
+    def equity(self) -> Decimal:
+        return self.initial_balance + self.v_quote + self.position * self.mark_price()
+
+    def _fill(self, digest: str, side: str, size: Decimal, price_x18: int, maker: bool):
+        price = x18_to_decimal(price_x18)
+        signed = size if side == 'buy' else -size
+        fee = size * price * (self.maker_fee if maker else self.taker_fee)
+        self.position += signed
+        self.v_quote -= signed * price + fee
+        self.fills += 1
+        self.maker_fills += maker
+        self.volume += size * price
+        self.fees += fee
+        self.max_abs_position = max(self.max_abs_position, abs(self.position))
+        self._pending_fills.append(FillFrame(self.product_id, int(signed * X18_ONE), price_x18, digest,
+                                             int(self.clock.now * 1e9)))
+
+    def rest(self, side: str, size: Decimal, price_x18: int) -> str:
+        """Place a GTC limit; a marketable one takes liquidity immediately, the rest rests."""
+        digest = self.new_digest()
+        self.orders_placed += 1
+        filled = self._take(digest, side, size, price_x18)
+        if size - filled > 0:
+            self.orders[digest] = _SimOrder(digest, side, size - filled, price_x18)
+        return digest
+
+    def ioc(self, side: str, size: Decimal, limit_x18: int) -> Tuple[str, Decimal]:
+        digest = self.new_digest()
+        self.orders_placed += 1
+        return digest, self._take(digest, side, size, limit_x18)
+
+    def _take(self, digest: str, side: str, size: Decimal, limit_x18: int) -> Decimal:
+        """Sweep replayed levels up to the limit price; returns the filled size."""
+        snap = self.book.snapshot()
+        if side == 'buy':
+            prices, sizes, crosses = snap.ask_prices, snap.ask_sizes, lambda p: p <= limit_x18
+        else:
+            prices, sizes, crosses = snap.bid_prices, snap.bid_sizes, lambda p: p >= limit_x18
+        remaining = size
+        for price, level_x18 in zip(prices, sizes):
+            if remaining <= 0 or not crosses(price):
+                break
+            take = min(remaining, x18_to_decimal(level_x18))
+            self._fill(digest, side, take, price, maker=False)
+            remaining -= take
+        return size - remaining
+
+    def cancel(self, digests: Sequence[str]) -> int:
+        removed = 0
+        for digest in digests:
+            if self.orders.pop(digest, None) is not None:
+                removed += 1
+        self.orders_cancelled += removed
+        return removed
+
+    def match_resting(self):
+        """Fill resting orders the current book has traded through."""
+        if not self.orders:
+            return
+        bid = self.book.best_bid()
+        ask = self.book.best_ask()
+        for digest, order in list(self.orders.items()):
+            if order.side == 'buy':
+                hit = ask is not None and ask[0] <= order.price_x18
+            else:
+                hit = bid is not None and bid[0] >= order.price_x18
+            if hit:
+                del self.orders[digest]
+                self._fill(digest, order.side, order.size, order.price_x18, maker=True)
+
+    async def flush_fills(self):
+        """Deliver queued fills to the bot like the private fills channel would."""
+        while self._pending_fills:
+            fills, self._pending_fills = self._pending_fills, []
+            for fill in fills:
+                for handler in self.fill_handlers:
+                    await handler(fill)
+
+    def subaccount_info(self) -> Dict[str, Any]:
+        """subaccount_info-shaped body so PnLTracker works unchanged."""
+        x18 = lambda d: str(int(d * X18_ONE))
+        return {
+            "spot_balances": [{"product_id": 0, "balance": {"amount": x18(self.initial_balance)}}],
+            "perp_products": [{"product_id": self.product_id,
+                               "oracle_price_x18": str(self.book.get_mid_price_x18())}],
+            "perp_balances": [{"product_id": self.product_id,
+                               "balance": {"amount": x18(self.position), "v_quote_balance": x18(self.v_quote)}}],
+            "healths": [{"health": x18(self.equity())}],
+        }
+
+
+class SimExchangeClient(BaseExchangeClient):
+    """Simulated BaseExchangeClient backed by a SimVenue (passed in the config dict as ``sim_venue``)."""
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.venue: SimVenue = config['sim_venue']
+        # Same shape NadoClient gets from api_server, so round_to_tick / tick_size lookups work
+        self.config = TradingConfig(ticker=config.get('ticker', 'ETH'),
+                                    contract_id=str(self.venue.product_id),
+                                    tick_size=Decimal(str(config.get('tick_size', '0.1'))))
+        self.product_id = self.venue.product_id
+        self.wallet_address = "0x" + "00" * 20
+        self.subaccount_name = "sim"
+        self._order_update_handler = None
+        self._pos_cache: Optional[Decimal] = None
+        self._zero_balance_strikes = 0
+
+    def get_exchange_name(self) -> str:
+        return "sim"
+
+    def _validate_config(self) -> None:
+        if 'sim_venue' not in self.config:
+            raise ValueError("Missing sim_venue")
+
+    def _subaccount_to_bytes32(self, address: str, name: str) -> str:
+        return address[2:].lower() + name.encode().hex().ljust(24, '0')
+
+    async def _post(self, endpoint: str, payload: Dict = None) -> Dict:
+        payload = payload or {}
+        if endpoint == "/query" and payload.get('type') == 'subaccount_info':
+            return {"status": "success", "data": self.venue.subaccount_info()}
+        return {"status": "failure", "error": f"sim: unsupported {endpoint} {payload.get('type')}"}
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def place_open_order(self, contract_id: str, quantity: Decimal, direction: str,
+                               price: Decimal = None, order_type: int = 0) -> OrderResult:
+        if price is None:
+            price = await self._get_execution_price(direction)
+            if price is None:
+                return OrderResult(success=False, error_message="sim: empty book")
+        size = Decimal(str(quantity))
+        price_x18 = to_x18(price)
+        if order_type == 1:
+            digest, filled = self.venue.ioc(direction, size, price_x18)
+        else:
+            digest = self.venue.rest(direction, size, price_x18)
+            filled = None
+        await self.venue.flush_fills()
+        return OrderResult(success=True, order_id=digest, side=direction, size=size,
+                           price=x18_to_decimal(price_x18), status="submitted", filled_size=filled,
+                           order_ids=[digest])
+
+    async def _get_execution_price(self, direction) -> Optional[Decimal]:
+        level = self.venue.book.best_ask() if direction == 'buy' else self.venue.book.best_bid()
+        return x18_to_decimal(level[0]) if level else None
+
+    async def place_market_order(self, contract_id: str, quantity: Decimal, direction: str) -> OrderResult:
+        base_price = await self._get_execution_price(direction)
+        if base_price is None:
+            return OrderResult(success=False, error_message="sim: empty book")
+        # Same 5% slippage bound as NadoClient.place_market_order
+        exec_price = base_price * (Decimal("1.05") if direction == 'buy' else Decimal("0.95"))
+        return await self.place_open_order(contract_id, quantity, direction, price=exec_price, order_type=1)
+
+    async def place_close_order(self, contract_id: str, quantity: Decimal, price: Decimal, side: str) -> OrderResult:
+        return await self.place_open_order(contract_id, quantity, side)
+
+    async def place_batch_open_orders(self, orders: List[Tuple[Decimal, str, Decimal]]) -> OrderResult:
+        digests = []
+        for quantity, direction, price in orders:
+            if price is None:
+                price = await self._get_execution_price(direction)
+                if price is None:
+                    return OrderResult(success=False, error_message="sim: empty book")
+            digests.append(self.venue.rest(direction, Decimal(str(quantity)), to_x18(price)))
+        await self.venue.flush_fills()
+        return OrderResult(success=True, order_id=digests[0] if digests else None, order_ids=digests)
+
+    async def cancel_orders(self, order_ids: List[str], product_ids: List[int] = None) -> OrderResult:
+        self.venue.cancel(order_ids)
+        return OrderResult(success=True)
+
+    async def cancel_order(self, order_id: str) -> OrderResult:
+        return await self.cancel_orders([order_id])
+
+    async def cancel_all_orders(self, contract_id: Optional[str] = None) -> OrderResult:
+        return await self.cancel_orders(list(self.venue.orders))
+
+    async def get_order_info(self, order_id: str) -> Optional[OrderInfo]:
+        return None
+
+    async def get_active_orders(self, contract_id: str) -> List[OrderInfo]:
+        return [OrderInfo(order_id=o.digest, side=o.side, size=o.size, price=x18_to_decimal(o.price_x18),
+                          status="open", filled_size=Decimal("0"))
+                for o in self.venue.orders.values()]
+
+    async def get_account_positions(self) -> Decimal:
+        self._pos_cache = self.venue.position
+        return self.venue.position
+
+    def setup_order_update_handler(self, handler) -> None:
+        self._order_update_handler = handler
+
+
+ExchangeFactory.register_exchange('sim', SimExchangeClient)
+
+
+class ReplayFeed:
+    """Stand-in for WebSocketManager: exposes the replayed book and routes simulated fills to the bot."""
+
+    def __init__(self, client: SimExchangeClient, bot: HFTBot):
+        self.client = client
+        self.bot = bot
+        self.book = client.venue.book
+
+    async def connect(self):
+        self.client.venue.fill_handlers.append(self.bot._handle_fill_update)
+
+    async def close(self):
+        if self.bot._handle_fill_update in self.client.venue.fill_handlers:
+            self.client.venue.fill_handlers.remove(self.bot._handle_fill_update)
+
+
+@dataclass
+class BacktestResult:
+    spread: float
+    interval: float
+    max_exposure: float
+    boost_mode: bool
+    sim_seconds: float
+    wall_seconds: float
+    speedup: float
+    depth_frames: int
+    orders_placed: int
+    orders_cancelled: int
+    fills: int
+    maker_fills: int
+    volume: float
+    fees: float
+    final_position: float
+    max_abs_position: float
+    pnl: float
+
+
+class _ReplayDriver:
+    """Interleaves recorded depth frames with the bot's timers on one simulated timeline."""
+
+    # Upper bound on event-loop turns per step; bot tasks park on the clock within one or two
+    MAX_SETTLE_SPINS = 50
+
+    def __init__(self, paths: List[str], config: Dict[str, Any], product_id: int,
+                 duration: Optional[float] = None, **venue_kwargs):
+        self.paths = paths
+        self.config = config
+        self.product_id = product_id
+        self.duration = duration
+        self.venue_kwargs = venue_kwargs
+        self.depth_frames = 0
+
+    def _bot_tasks(self, bot: HFTBot, start_task: asyncio.Task) -> List[asyncio.Task]:
+        tasks = [start_task, bot._stats_task, getattr(bot, '_strategy_task', None)]
+        return [t for t in tasks if t is not None and not t.done()]
+
+    async def _settle(self, clock: SimClock, bot: HFTBot, start_task: asyncio.Task):
+        """Run the loop until every live bot task is parked on the simulated clock."""
+        for _ in range(self.MAX_SETTLE_SPINS):
+            await asyncio.sleep(0)
+            if clock.pending >= len(self._bot_tasks(bot, start_task)):
+                return
+
+    async def _advance(self, t: float, clock: SimClock, bot: HFTBot, start_task: asyncio.Task):
+        """Fire every timer due up to ``t`` in order, then move the clock to ``t``."""
+        while True:
+            wake = clock.next_wake()
+            if wake is None or wake > t:
+                break
+            clock.fire_next()
+            await self._settle(clock, bot, start_task)
+        clock.now = max(clock.now, t)
+
+    async def run(self) -> BacktestResult:
+        frames = iter_frames(self.paths)
+        depth = self._next_depth(frames)
+        if depth is None:
+            raise ValueError("recording contains no depth frames for product %d" % self.product_id)
+        t0, frame = depth
+
+        clock = SimClock(t0)
+        book = LocalOrderBook()
+        venue = SimVenue(book, clock, self.product_id, **self.venue_kwargs)
+        await book.apply_levels(frame.bids, frame.asks, is_snapshot=frame.is_snapshot)
+        self.depth_frames = 1
+
+        bot = HFTBot(dict(self.config, exchange='sim', sim_venue=venue), clock=clock)
+        bot.ws_manager = ReplayFeed(bot.client, bot)
+        wall_start = time.perf_counter()
+        start_task = asyncio.create_task(bot.start())
+        await self._settle(clock, bot, start_task)
+
+        end = t0 + self.duration if self.duration else None
+        while True:
+            depth = self._next_depth(frames)
+            if depth is None:
+                break
+            t, frame = depth
+            if end is not None and t > end:
+                break
+            await self._advance(t, clock, bot, start_task)
+            await book.apply_levels(frame.bids, frame.asks, is_snapshot=frame.is_snapshot)
+            self.depth_frames += 1
+            venue.match_resting()
+            await venue.flush_fills()
+        if end is not None:
+            await self._advance(end, clock, bot, start_task)
+
+        await bot.stop()
+        start_task.cancel()
+        tasks = [t for t in (start_task, bot._stats_task, getattr(bot, '_strategy_task', None)) if t is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        wall = time.perf_counter() - wall_start
+        sim_seconds = clock.now - t0
+
+        return BacktestResult(
+            spread=float(self.config.get('spread', 0.0005)),
+            interval=float(self.config.get('interval', 5)),
+            max_exposure=float(self.config.get('max_exposure', 200)),
+            boost_mode=bool(self.config.get('boost_mode', False)),
+            sim_seconds=sim_seconds,
+            wall_seconds=wall,
+            speedup=sim_seconds / wall if wall > 0 else 0.0,
+            depth_frames=self.depth_frames,
+            orders_placed=venue.orders_placed,
+            orders_cancelled=venue.orders_cancelled,
+            fills=venue.fills,
+            maker_fills=venue.maker_fills,
+            volume=float(venue.volume),
+            fees=float(venue.fees),
+            final_position=float(venue.position),
+            max_abs_position=float(venue.max_abs_position),
+            pnl=float(venue.equity() - venue.initial_balance),
+        )
+
+    def _next_depth(self, frames) -> Optional[Tuple[float, DepthFrame]]:
+        for rec in frames:
+            try:
+                frame = decode_frame(rec.payload)
+            except ValueError:
+                continue
+            if type(frame) is DepthFrame and frame.product_id == self.product_id:
+                return rec.ts_ns / 1e9, frame
+        return None
+
+
+def resolve_paths(inputs: Sequence[str], prefix: str = "nado_feed") -> List[str]:
+    """Expand recorder directories into their rotated files; plain file paths pass through."""
+    paths: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(feed_files(item, prefix))
+        else:
+            paths.append(item)
+    return paths
+
+
+def run_backtest(paths: Sequence[str], config: Dict[str, Any], product_id: int = 4,
+                 duration: Optional[float] = None, **venue_kwargs) -> BacktestResult:
+    """Replay ``paths`` through one HFTBot configured with ``config`` (the same dict api_server builds)."""
+    driver = _ReplayDriver(list(paths), config, product_id, duration, **venue_kwargs)
+    return asyncio.run(driver.run())
+
+
+def _run_one(args) -> BacktestResult:
+    paths, config, product_id, duration, venue_kwargs, log_level = args
+    logging.getLogger().setLevel(log_level)
+    return run_backtest(paths, config, product_id, duration, **venue_kwargs)
+
+
+def sweep(paths: Sequence[str], base_config: Dict[str, Any], spreads: Sequence[float],
+          intervals: Sequence[float], max_exposures: Sequence[float], product_id: int = 4,
+          duration: Optional[float] = None, workers: int = 1, **venue_kwargs) -> List[BacktestResult]:
+    """Grid-search spread x interval x max_exposure; each run replays the full recording."""
+    jobs = []
+    for spread, interval, max_exposure in itertools.product(spreads, intervals, max_exposures):
+        config = dict(base_config, spread=spread, interval=interval, max_exposure=max_exposure)
+        jobs.append((list(paths), config, product_id, duration, venue_kwargs, logging.getLogger().level))
+    if workers <= 1:
+        return [_run_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_one, jobs))
+
+
+def _floats(text: str) -> List[float]:
+    return [float(x) for x in text.split(',') if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Nado feeds through HFTBot")
+    parser.add_argument("inputs", nargs="+", help="recorder directories or .bin files")
+    parser.add_argument("--prefix", default="nado_feed", help="recorder file prefix inside directories")
+    parser.add_argument("--product-id", type=int, default=4)
+    parser.add_argument("--spread", type=_floats, default=[0.0005])
+    parser.add_argument("--interval", type=_floats, default=[5.0])
+    parser.add_argument("--max-exposure", type=_floats, default=[200.0])
+    parser.add_argument("--quantity", type=float, default=0.01)
+    parser.add_argument("--tick-size", default="0.1")
+    parser.add_argument("--boost", action="store_true", help="run the booster (IOC) strategy")
+    parser.add_argument("--balance", default="1000", help="starting USDC balance")
+    parser.add_argument("--maker-fee-bps", default="0")
+    parser.add_argument("--taker-fee-bps", default="0")
+    parser.add_argument("--duration", type=float, default=None, help="only replay the first N seconds")
+    parser.add_argument("--workers", type=int, default=1, help="parallel processes for the sweep")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    parser.add_argument("-v", "--verbose", action="store_true", help="keep bot INFO logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    paths = resolve_paths(args.inputs, args.prefix)
+    if not paths:
+        parser.error("no recordings found")
+
+    base_config = {
+        "quantity": args.quantity,
+        "ticker": "ETH",
+        "tick_size": args.tick_size,
+        "boost_mode": args.boost,
+    }
+    results = sweep(paths, base_config, args.spread, args.interval, args.max_exposure,
+                    product_id=args.product_id, duration=args.duration, workers=args.workers,
+                    initial_balance=Decimal(args.balance), maker_fee_bps=Decimal(args.maker_fee_bps),
+                    taker_fee_bps=Decimal(args.taker_fee_bps))
+
+    if args.json:
+        for r in results:
+            print(json.dumps(asdict(r)))
+        return
+    print(f"{'spread':>9} {'interval':>8} {'max_exp':>8} {'fills':>6} {'volume':>12} {'pnl':>10} "
+          f"{'max_pos':>8} {'sim_s':>9} {'speedup':>8}")
+    for r in results:
+        print(f"{r.spread:>9.5f} {r.interval:>8.1f} {r.max_exposure:>8.0f} {r.fills:>6d} {r.volume:>12.2f} "
+              f"{r.pnl:>10.4f} {r.max_abs_position:>8.4f} {r.sim_seconds:>9.0f} {r.speedup:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
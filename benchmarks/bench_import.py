@@ -0,0 +1,92 @@
+"""
+冷启动 / 导入耗时基准测试
+作用：在全新子进程中测量 `import edgex_sdk`、`import api_server` 的耗时，以及 SDK 首次 Pedersen 哈希的耗时
+（常量点在首次使用时才从 constant_points.bin 加载）。每项分别在两种场景下测量：
+- warm: 使用已有的 __pycache__ 字节码
+- cold: 通过 -X pycache_prefix 指向空目录，强制重新编译所有源文件
+
+--ref 指定一个 git 版本（如 HEAD~1）时，会把该版本的 vendor/edgex-python-sdk 解包到临时目录，
+在相同条件下测量 edgex_sdk 的两项，便于对比改动前后的冷启动。
+
+用法: python benchmarks/bench_import.py [--runs 7] [--ref HEAD~1]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SDK_DIR = os.path.join(ROOT, "vendor", "edgex-python-sdk")
+
+# 子进程内计时，排除解释器自身启动开销
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+FIRST_HASH_SNIPPET = (
+    "import time; import edgex_sdk; from edgex_sdk.crypto import pedersen_hash; "
+    "t = time.perf_counter(); pedersen_hash(1, 2); print(time.perf_counter() - t)"
+)
+
+
+def run_once(code: str, cwd: str, cold: bool, env: dict) -> float:
+    args = [sys.executable]
+    with tempfile.TemporaryDirectory() as pycache:
+        if cold:
+            args += ["-X", f"pycache_prefix={pycache}"]
+        out = subprocess.run(args + ["-c", code], cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure(code: str, cwd: str, cold: bool, runs: int, env: dict):
+    run_once(code, cwd, cold, env)  # 预热文件系统缓存 (warm 场景同时生成 __pycache__)
+    samples = [run_once(code, cwd, cold, env) for _ in range(runs)]
+    return statistics.median(samples) * 1000, min(samples) * 1000
+
+
+def extract_sdk(rev: str, dest: str) -> str:
+    """把 rev 版本的 vendor/edgex-python-sdk 解包到 dest，返回 SDK 根目录。"""
+    data = subprocess.run(["git", "archive", rev, "vendor/edgex-python-sdk/edgex_sdk"],
+                          cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(dest)
+    return os.path.join(dest, "vendor", "edgex-python-sdk")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import / cold start benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--ref", help="git revision to compare the edgex_sdk rows against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Pedersen 窗口表磁盘缓存放在临时目录，并先让它生成，首次哈希测的是"缓存命中"路径
+        env = dict(os.environ, EDGEX_SDK_CACHE_DIR=cache_dir)
+        targets = [("current", SDK_DIR)]
+        ref_tmp = None
+        if args.ref:
+            ref_tmp = tempfile.TemporaryDirectory()
+            targets.insert(0, (args.ref, extract_sdk(args.ref, ref_tmp.name)))
+
+        print(f"python {sys.version.split()[0]} | runs={args.runs} | median (min) ms")
+        try:
+            for label, sdk_dir in targets:
+                for name, code in (("import edgex_sdk", IMPORT_SNIPPET.format(module="edgex_sdk")),
+                                   ("first pedersen_hash", FIRST_HASH_SNIPPET)):
+                    for cold in (False, True):
+                        med, low = measure(code, sdk_dir, cold, args.runs, env)
+                        print(f"{label:>10} | {name:<20} | {'cold' if cold else 'warm':<4} | {med:8.1f} ({low:.1f})")
+            # api_server 导入时会在当前目录创建 bot_debug.log: 在临时目录里运行，项目根目录经 PYTHONPATH 导入
+            server_env = dict(env, PYTHONPATH=ROOT)
+            for cold in (False, True):
+                med, low = measure(IMPORT_SNIPPET.format(module="api_server"), cache_dir, cold, args.runs, server_env)
+                print(f"{'current':>10} | {'import api_server':<20} | {'cold' if cold else 'warm':<4} | {med:8.1f} ({low:.1f})")
+        finally:
+            if ref_tmp:
+                ref_tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+热路径基准测试套件 (Benchmark Suite)
+作用：在固定输入上测量各热路径的单次耗时分布 (p50/p99)，输出 JSON，并与 benchmarks/baseline.json 中的基线对比，
+超过阈值即判定为性能回退（退出码 1）。
+
+覆盖：
+- depth_ingest        WebSocketManager._dispatch -> _handle_depth_update (解码 + 序列校验 + 订单簿更新)
+- mid_price           LocalOrderBook.get_mid_price
+- sign_order          NadoClient._sign_order
+- sign_cancellation   NadoClient._sign_cancellation
+- batch_payload_build NadoClient._build_place_orders (2 单做市报价，含签名)
+- batch_sign_pool     NadoClient._sign_place_orders (8 单经签名池签名，模式由 NADO_SIGNER_MODE 决定，process 模式下按核数并行)
+- mid_to_execute      本地模拟网关发出深度帧 -> 网关收到 /execute (MarketDataHub + NadoClient 全链路)
+- order_log           下单路径的日志开销: TradingLogger.log (payload 转储仅在 DEBUG 级别) + log_transaction，写盘由后台线程完成
+
+用法: python benchmarks/bench_suite.py [--only sign_order,mid_price] [--quick] [--output out.json] [--update-baseline]
+--quick 模式样本太少 (p99 约等于最大值)，只比较 p50。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fixed throwaway key so signing inputs are identical run to run; never used against a real gateway
+os.environ["NADO_PRIVATE_KEY"] = "0x" + "11" * 32
+for _var in ("NADO_GATEWAY_URL", "NADO_WS_URL", "NADO_ARCHIVE_URL"):
+    os.environ.pop(_var, None)
+# Clients built by the cases log to a throwaway directory, never the repo's logs/
+os.environ["NADO_LOGS_DIR"] = tempfile.mkdtemp(prefix="nado-bench-logs-")
+
+from exchanges.nado_frames import JSON_BACKEND
+from hft_bot import TradingConfig, WebSocketManager
+from helpers.x18 import X18
+from orderbook import LocalOrderBook
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLDS = {"p50": 1.25, "p99": 1.5}
+
+
+def summarize(samples_ns, ops_per_sample: int = 1):
+    """Per-op microsecond stats from per-sample nanosecond timings."""
+    us = sorted(s / 1e3 / ops_per_sample for s in samples_ns)
+    pick = lambda q: us[min(len(us) - 1, int(q * len(us)))]
+    return {"p50_us": round(pick(0.50), 3), "p99_us": round(pick(0.99), 3), "mean_us": round(statistics.fmean(us), 3),
+            "max_us": round(us[-1], 3), "n": len(us) * ops_per_sample,
+            "ops_per_s": round(1e6 / statistics.fmean(us), 1)}
+
+
+def make_client():
+    from exchanges.nado import DEFAULT_ENDPOINT_ADDR, NadoClient
+    client = NadoClient(TradingConfig(ticker="ETH", tick_size=Decimal("0.1")))
+    client.product_id = 4
+    client.endpoint_addr = DEFAULT_ENDPOINT_ADDR
+    return client
+
+
+def make_depth_frames(count: int, levels: int):
+    """One snapshot followed by timestamp-chained deltas around 3000 USD."""
+    rng = random.Random(7)
+    ts = 1_700_000_000_000_000_000
+    base = 3000 * 10**18
+
+    def side(sign):
+        return [[str(base + sign * rng.randint(1, 500) * 10**17), str(rng.randint(0, 50) * 10**16)]
+                for _ in range(levels)]
+
+    frames = [json.dumps({"type": "snapshot", "channel": "depth.4",
+                          "data": {"product_id": 4, "max_timestamp": str(ts), "bids": side(-1), "asks": side(1)}})]
+    for _ in range(count):
+        prev, ts = ts, ts + rng.randint(1_000_000, 50_000_000)
+        frames.append(json.dumps({"type": "book_depth", "channel": "depth.4", "data": {
+            "product_id": 4, "min_timestamp": str(prev + 1), "max_timestamp": str(ts),
+            "last_max_timestamp": str(prev), "bids": side(-1), "asks": side(1)}}))
+    return frames
+
+
+# ---------------------------
+# Cases
+# ---------------------------
+
+def bench_depth_ingest(quick: bool):
+    frames = make_depth_frames(2000 if quick else 20000, 10)
+    client = SimpleNamespace(product_id=4, ws_url="ws://unused")
+    manager = WebSocketManager(client, bot=None)
+
+    async def run():
+        await manager._dispatch(frames[0])
+        samples = []
+        clock = time.perf_counter_ns
+        for raw in frames[1:]:
+            t0 = clock()
+            await manager._dispatch(raw)
+            samples.append(clock() - t0)
+        assert not manager.book.stale and manager.depth_sync.gaps == 0
+        return samples
+
+    return summarize(asyncio.run(run()))
+
+
+def bench_mid_price(quick: bool):
+    book = LocalOrderBook()
+    rng = random.Random(7)
+    bids = [(3000 * 10**18 - i * 10**17, rng.randint(1, 50) * 10**16) for i in range(100)]
+    asks = [(3000 * 10**18 + (i + 1) * 10**17, rng.randint(1, 50) * 10**16) for i in range(100)]
+    batch = 100
+
+    async def run():
+        await book.apply_levels(bids, asks, is_snapshot=True)
+        samples = []
+        clock = time.perf_counter_ns
+        for _ in range(200 if quick else 2000):
+            t0 = clock()
+            for _ in range(batch):
+                await book.get_mid_price()
+            samples.append(clock() - t0)
+        return samples
+
+    return summarize(asyncio.run(run()), ops_per_sample=batch)
+
+
+def _order_msg(client, i: int):
+    sender = client._subaccount_to_bytes32(client.wallet_address, client.subaccount_name)
+    return {"sender": "0x" + sender, "priceX18": 3000 * 10**18 + i * 10**17, "amount": 10**16,
+            "expiration": 1_700_003_600_000, "nonce": (1_700_000_010_000 << 20) + i,
+            "appendix": client._build_appendix(order_type=0)}
+
+
+def bench_sign_order(quick: bool):
+    client = make_client()
+    msgs = [_order_msg(client, i) for i in range(100 if quick else 1000)]
+    samples = []
+    clock = time.perf_counter_ns
+    for msg in msgs:
+        t0 = clock()
+        client._sign_order(msg, 4)
+        samples.append(clock() - t0)
+    return summarize(samples)
+
+
+def bench_sign_cancellation(quick: bool):
+    client = make_client()
+    sender = "0x" + client._subaccount_to_bytes32(client.wallet_address, client.subaccount_name)
+    digests = ["0x" + format(i, "064x") for i in range(1, 3)]
+    samples = []
+    clock = time.perf_counter_ns
+    for i in range(100 if quick else 1000):
+        cancellation = {"sender": sender, "productIds": [4, 4], "digests": digests,
+                        "nonce": (1_700_000_020_000 << 20) + i}
+        t0 = clock()
+        client._sign_cancellation(cancellation)
+        samples.append(clock() - t0)
+    return summarize(samples)
+
+
+def bench_batch_payload_build(quick: bool):
+    client = make_client()
+    qty = Decimal("0.01")
+    samples = []
+    clock = time.perf_counter_ns
+    for i in range(100 if quick else 1000):
+        orders = [(qty, "buy", X18(2999 * 10**18 - i * 10**17)), (qty, "sell", X18(3001 * 10**18 + i * 10**17))]
+        t0 = clock()
+        client._build_place_orders(orders, now_sec=1_700_000_000.0 + i)
+        samples.append(clock() - t0)
+    return summarize(samples)
+
+
+def bench_batch_sign_pool(quick: bool):
+    client = make_client()
+    qty = Decimal("0.01")
+
+    async def run():
+        await client.signing_pool.start()
+        samples = []
+        clock = time.perf_counter_ns
+        try:
+            for i in range(50 if quick else 300):
+                orders = [(qty, "buy" if j % 2 else "sell", X18(3000 * 10**18 + (i + j) * 10**17)) for j in range(8)]
+                t0 = clock()
+                await client._sign_place_orders(orders, now_sec=1_700_000_000.0 + i)
+                samples.append(clock() - t0)
+        finally:
+            client.signing_pool.shutdown(wait=True)
+        return samples
+
+    return summarize(asyncio.run(run()))
+
+
+def bench_mid_to_execute(quick: bool):
+    from benchmarks.bench_tick_to_order import run
+    args = SimpleNamespace(samples=50 if quick else 300, tick_ms=20, latency_ms=0.0, jitter_ms=0.0, timeout=120)
+    try:
+        result = asyncio.run(run(args))["tick_to_order_ms"]
+    finally:
+        for var in ("NADO_GATEWAY_URL", "NADO_WS_URL", "NADO_ARCHIVE_URL"):
+            os.environ.pop(var, None)
+    return {"p50_us": round(result["p50"] * 1e3, 3), "p99_us": round(result["p99"] * 1e3, 3),
+            "mean_us": round(result["mean"] * 1e3, 3), "max_us": round(result["max"] * 1e3, 3),
+            "n": result["n"], "ops_per_s": round(1e3 / result["mean"], 1)}
+
+
+def bench_order_log(quick: bool):
+    from helpers.logger import TradingLogger
+    payload = json.dumps({"place_order": {"product_id": 4, "order": _order_msg(make_client(), 0)}})
+    samples = []
+    clock = time.perf_counter_ns
+    # Keep the bench's activity log and orders CSV out of the repo's logs/
+    with tempfile.TemporaryDirectory(prefix="nado-bench-logs-") as logs_dir:
+        trading_logger = TradingLogger(exchange="bench", ticker="ETH", logs_dir=logs_dir)
+        for i in range(500 if quick else 5000):
+            t0 = clock()
+            if trading_logger.enabled_for("DEBUG"):
+                trading_logger.log("FORENSIC_PAYLOAD: %s", "DEBUG", payload, category="payload")
+            trading_logger.log(f"Placing order: Product=4, Price=3000.{i}, Amount=0.01, Dir=buy, Type=POST_ONLY", "INFO")
+            trading_logger.log_transaction(f"0x{i:064x}", "buy", Decimal("0.01"), Decimal("3000.1"), "OPEN")
+            samples.append(clock() - t0)
+        trading_logger.pipeline.flush()
+    return summarize(samples)
+
+
+CASES = {
+    "depth_ingest": bench_depth_ingest,
+    "mid_price": bench_mid_price,
+    "sign_order": bench_sign_order,
+    "sign_cancellation": bench_sign_cancellation,
+    "batch_payload_build": bench_batch_payload_build,
+    "batch_sign_pool": bench_batch_sign_pool,
+    "mid_to_execute": bench_mid_to_execute,
+    "order_log": bench_order_log,
+}
+
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+
+def load_baseline(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, quick: bool = False):
+    """Cases whose p50/p99 exceed baseline x threshold (per-case thresholds override the defaults).
+
+    With ``quick`` only p50 is checked: p99 of ~100 samples is effectively the max.
+    """
+    regressions = []
+    if not baseline:
+        return regressions
+    thresholds = baseline.get("thresholds", {})
+    for name, current in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        limits = {**DEFAULT_THRESHOLDS, **thresholds.get("default", {}), **thresholds.get(name, {})}
+        for stat, factor in limits.items():
+            if quick and stat == "p99":
+                continue
+            key = f"{stat}_us"
+            if base.get(key) and current[key] > base[key] * factor:
+                regressions.append({"case": name, "stat": stat, "baseline_us": base[key],
+                                    "current_us": current[key], "ratio": round(current[key] / base[key], 3),
+                                    "threshold": factor})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot-path benchmark suite with baseline regression check")
+    parser.add_argument("--only", default="", help="comma-separated case names (default: all)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations (smoke run)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--output", default=None, help="also write the JSON report to this file")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run's figures as the new baseline (keeps thresholds)")
+    args = parser.parse_args()
+
+    names = [n for n in args.only.split(",") if n] or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}; available: {', '.join(CASES)}")
+
+    results = {}
+    for name in names:
+        print(f"running {name}...", file=sys.stderr)
+        results[name] = CASES[name](args.quick)
+
+    meta = {"timestamp": int(time.time()), "python": platform.python_version(), "machine": platform.machine(),
+            "platform": platform.platform(), "json_backend": JSON_BACKEND, "quick": args.quick,
+            "cpus": os.cpu_count(), "signer_mode": os.getenv("NADO_SIGNER_MODE", "inline")}
+    baseline = load_baseline(args.baseline)
+    regressions = [] if args.update_baseline else compare(results, baseline, quick=args.quick)
+    report = {"meta": meta, "results": results, "regressions": regressions,
+              "baseline": args.baseline if baseline else None}
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if args.update_baseline:
+        merged = dict((baseline or {}).get("results", {}), **results)
+        thresholds = (baseline or {}).get("thresholds", {"default": DEFAULT_THRESHOLDS})
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": meta, "thresholds": thresholds, "results": merged}, f, indent=2)
+            f.write("\n")
+        print(f"baseline updated: {args.baseline}", file=sys.stderr)
+    elif regressions:
+        for r in regressions:
+            print(f"REGRESSION {r['case']} {r['stat']}: {r['current_us']}us vs {r['baseline_us']}us "
+                  f"(x{r['ratio']} > x{r['threshold']})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Tick-to-order 端到端延迟基准
+作用：在进程内启动本地模拟网关 (mock_gateway.py)，让 MarketDataHub + NadoClient 走真实的 WS 解码、订单簿更新、
+EIP-712 签名与下单路径（默认经 WS 执行通道，NADO_WS_EXECUTE=0 时走 REST /execute），
+测量 "网关发出深度帧 -> 网关收到下单请求" 以及 "-> 客户端收到回执" 的延迟分布。
+
+用法: python benchmarks/bench_tick_to_order.py [--samples 300] [--latency-ms 0] [--jitter-ms 0] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eth_account import Account
+
+from hft_bot import TradingConfig
+from market_data import MarketDataHub
+from mock_gateway import FaultConfig, MockGateway
+
+PRODUCT_ID = 4
+
+
+def percentiles(samples_ns):
+    ms = sorted(s / 1e6 for s in samples_ns)
+    pick = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))]
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": ms[-1],
+            "mean": statistics.fmean(ms), "n": len(ms)}
+
+
+class _TimedHub(MarketDataHub):
+    """Hub that hands each applied depth frame's gateway timestamp to the benchmark."""
+
+    def __init__(self, *args, on_tick=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_tick = on_tick
+
+    async def on_depth(self, frame):
+        await super().on_depth(frame)
+        if self.on_tick and frame.product_id == PRODUCT_ID and frame.max_ts:
+            self.on_tick(frame.max_ts)
+
+
+async def run(args):
+    gateway = MockGateway(faults=FaultConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms),
+                          tick_interval=args.tick_ms / 1000, seed=7)
+    urls = await gateway.start()
+    os.environ.update(urls)
+    # Throwaway key: the benchmark never talks to a real gateway
+    os.environ["NADO_PRIVATE_KEY"] = Account.create().key.hex()
+    # Activity log / orders CSV go to a throwaway directory, never the repo's logs/
+    os.environ["NADO_LOGS_DIR"] = tempfile.mkdtemp(prefix="nado-bench-logs-")
+
+    from exchanges.nado import NadoClient
+    client = NadoClient(TradingConfig(ticker="ETH", tick_size=Decimal("0.1")))
+    await client.get_contract_attributes()
+    await client.connect()
+
+    tick_to_order, tick_to_ack = [], []
+    in_flight = False
+    done = asyncio.Event()
+
+    async def quote(tick_ns):
+        nonlocal in_flight
+        try:
+            bid = hub.get_book(PRODUCT_ID).best_bid()
+            if not bid:
+                return
+            price = Decimal(bid[0] - 50 * 10**17) / Decimal(10**18)
+            res = await client.place_batch_open_orders([(Decimal("0.01"), "buy", price)])
+            ack_ns = time.time_ns()
+            if res.success and gateway.execute_log:
+                tick_to_order.append(gateway.execute_log[-1] - tick_ns)
+                tick_to_ack.append(ack_ns - tick_ns)
+            if len(tick_to_ack) >= args.samples:
+                done.set()
+        finally:
+            in_flight = False
+
+    def on_tick(tick_ns):
+        nonlocal in_flight
+        if in_flight or done.is_set():
+            return
+        in_flight = True
+        asyncio.create_task(quote(tick_ns))
+
+    hub = _TimedHub(client, [PRODUCT_ID], on_tick=on_tick)
+    await hub.start()
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    finally:
+        transport = client.transport_stats()
+        ws_execute = client.ws_exec.stats()
+        await hub.close()
+        await client.disconnect()
+        await gateway.stop()
+
+    return {"tick_to_order_ms": percentiles(tick_to_order), "tick_to_ack_ms": percentiles(tick_to_ack),
+            "gateway": dict(gateway.stats), "transport": transport,
+            "ws_execute": ws_execute,
+            "injected_latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick-to-order latency against the local mock gateway")
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--tick-ms", type=float, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="one-way latency injected by the gateway")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    for name in ("tick_to_order_ms", "tick_to_ack_ms"):
+        r = result[name]
+        print(f"{name:<17} p50={r['p50']:7.3f} p90={r['p90']:7.3f} p99={r['p99']:7.3f} "
+              f"max={r['max']:7.3f} mean={r['mean']:7.3f} (n={r['n']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+WS 帧解码基准测试
+作用：对比旧的 json.loads + dict 路由 + 逐档 Decimal 解析路径与新的类型化解码层 (nado_frames) 的每秒帧处理量。
+
+用法: python benchmarks/bench_ws_decode.py [--frames 50000] [--levels 10]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchanges.nado_frames import JSON_BACKEND, DepthFrame, decode_frame
+from orderbook import LocalOrderBook
+
+
+def make_frames(count: int, levels: int):
+    """Synthetic depth stream around 3000 USD, sequenced like Nado's book_depth channel."""
+    frames = []
+    ts = 1_700_000_000_000_000_000
+    for _ in range(count):
+        prev, ts = ts, ts + random.randint(1_000_000, 50_000_000)
+        bids = [[str((3000 * 10**18) - random.randint(1, 500) * 10**17), str(random.randint(0, 50) * 10**16)]
+                for _ in range(levels)]
+        asks = [[str((3000 * 10**18) + random.randint(1, 500) * 10**17), str(random.randint(0, 50) * 10**16)]
+                for _ in range(levels)]
+        frames.append(json.dumps({
+            "type": "book_depth", "channel": "depth.4",
+            "data": {"product_id": 4, "min_timestamp": str(prev + 1), "max_timestamp": str(ts),
+                     "last_max_timestamp": str(prev), "bids": bids, "asks": asks}
+        }))
+    return frames
+
+
+def bench_legacy_decode(frames):
+    """Baseline: json.loads + nested .get() routing + per-level Decimal(str(x)) / 10**18."""
+    t0 = time.perf_counter()
+    for raw in frames:
+        data = json.loads(raw)
+        msg_type = data.get('type', data.get('event', 'unknown'))
+        if msg_type in ('depth', 'snapshot', 'book_depth') or (msg_type == 'quote-event' and 'depth' in data.get('channel', '')):
+            body = data.get('data', data)
+            for p, s in body.get('bids', []):
+                Decimal(str(p)) / Decimal(10**18)
+                Decimal(str(s)) / Decimal(10**18)
+            for p, s in body.get('asks', []):
+                Decimal(str(p)) / Decimal(10**18)
+                Decimal(str(s)) / Decimal(10**18)
+    return len(frames) / (time.perf_counter() - t0)
+
+
+def bench_typed_decode(frames):
+    """New: decode_frame once into a DepthFrame, levels stay as X18 wire values."""
+    t0 = time.perf_counter()
+    for raw in frames:
+        frame = decode_frame(raw)
+        if type(frame) is DepthFrame:
+            pass
+    return len(frames) / (time.perf_counter() - t0)
+
+
+async def bench_legacy_ingest(frames):
+    """Baseline end-to-end: legacy parse + one awaited book update per level (dict book)."""
+    bids, asks, lock = {}, {}, asyncio.Lock()
+
+    async def update(side, price, size):
+        async with lock:
+            book = bids if side == 'buy' else asks
+            if size == 0:
+                book.pop(price, None)
+            else:
+                book[price] = size
+
+    t0 = time.perf_counter()
+    for raw in frames:
+        data = json.loads(raw)
+        body = data.get('data', data)
+        for p, s in body.get('bids', []):
+            await update('buy', Decimal(str(p)) / Decimal(10**18), Decimal(str(s)) / Decimal(10**18))
+        for p, s in body.get('asks', []):
+            await update('sell', Decimal(str(p)) / Decimal(10**18), Decimal(str(s)) / Decimal(10**18))
+    return len(frames) / (time.perf_counter() - t0)
+
+
+async def bench_typed_ingest(frames):
+    """New end-to-end: decode_frame + LocalOrderBook.apply_levels (one lock per frame)."""
+    book = LocalOrderBook()
+    t0 = time.perf_counter()
+    for raw in frames:
+        frame = decode_frame(raw)
+        await book.apply_levels(frame.bids, frame.asks, is_snapshot=frame.is_snapshot)
+    return len(frames) / (time.perf_counter() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WS frame decode benchmark")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--levels", type=int, default=10, help="levels per side per frame")
+    args = parser.parse_args()
+
+    random.seed(7)
+    frames = make_frames(args.frames, args.levels)
+    print(f"JSON backend: {JSON_BACKEND} | frames={args.frames} levels/side={args.levels}")
+
+    legacy = bench_legacy_decode(frames)
+    typed = bench_typed_decode(frames)
+    print(f"decode   legacy: {legacy:>12,.0f} frames/s | typed: {typed:>12,.0f} frames/s | x{typed / legacy:.1f}")
+
+    legacy = asyncio.run(bench_legacy_ingest(frames))
+    typed = asyncio.run(bench_typed_ingest(frames))
+    print(f"ingest   legacy: {legacy:>12,.0f} frames/s | typed: {typed:>12,.0f} frames/s | x{typed / legacy:.1f}")
+
+
+if __name__ == "__main__":
+    main()
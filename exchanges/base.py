@@ -43,6 +43,7 @@ class OrderResult:
     status: Optional[str] = None
     error_message: Optional[str] = None
     filled_size: Optional[Decimal] = None
+    order_ids: Optional[List[str]] = None  # one per order for batch placements
 
 
 @dataclass
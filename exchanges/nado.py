@@ -4,13 +4,16 @@ Nado Protocol 交易所客户端 (SDK 标准化版)
 """
 
 import os
-import asyncio
 import json
 import traceback
+import threading
 import time
 import websockets
 import aiohttp
+from collections import deque
+from dataclasses import dataclass
 from decimal import Decimal
+from email.utils import parsedate_to_datetime
 from typing import Dict, Any, List, Optional, Tuple
 
 from eth_account import Account
@@ -18,7 +21,185 @@ from eth_account.messages import encode_typed_data
 from web3 import Web3
 
 from .base import BaseExchangeClient, OrderResult, OrderInfo, query_retry
+from .nado_presign import IOC_ORDER_TYPE, PresignedLadder
+from .nado_signer import NadoSigner, SigningPool
+from .nado_account import AccountStateService
+from .nado_prices import OraclePriceCache
+from .nado_transport import HttpTransport
+from .nado_ws_exec import WsExecutionChannel
 from helpers.logger import TradingLogger
+from helpers.x18 import X18, to_x18, x18_to_decimal
+
+# NADO_NETWORK -> gateway URLs and the EIP-712 chain id orders are signed for
+NETWORKS = {
+    # Updated based on user logs and verification
+    "mainnet": {
+        "gateway_url": "https://gateway.prod.nado.xyz/v1",
+        "ws_url": "wss://gateway.prod.nado.xyz/v1/ws",
+        "archive_url": "https://archive.prod.nado.xyz/v1",
+        "chain_id": 57073,  # Ink Mainnet Chain ID
+    },
+    "testnet": {
+        "gateway_url": "https://gateway.test.nado.xyz/v1",
+        "ws_url": "wss://gateway.test.nado.xyz/v1/ws",
+        "archive_url": "https://archive.test.nado.xyz/v1",
+        "chain_id": 763373,  # Ink Sepolia Chain ID (Verify if changed)
+    },
+}
+# Endpoint contract used when the contracts query fails (Ink Mainnet)
+DEFAULT_ENDPOINT_ADDR = "0x05ec92d78ed421f3d3ada77ffde167106565974e"
+# Perp product ids of the tickers we trade (hub subscriptions, /price, the cancel-all scan)
+PRODUCT_IDS = {"BTC": 2, "ETH": 4, "SOL": 34}
+
+
+def product_id_for(ticker: str, default: int = 4) -> int:
+    """PRODUCT_IDS entry for a ticker such as "SOL" or "SOL-PERP" (``default`` if unknown)."""
+    ticker = ticker.upper()
+    for symbol, product_id in PRODUCT_IDS.items():
+        if symbol in ticker:
+            return product_id
+    return default
+
+
+def network_config(network: Optional[str] = None) -> Dict[str, Any]:
+    """NETWORKS entry for ``network`` (NADO_NETWORK by default); anything but mainnet is testnet."""
+    network = network or os.getenv('NADO_NETWORK', 'mainnet')
+    return NETWORKS["mainnet" if network == "mainnet" else "testnet"]
+
+
+# recv_time lead over the gateway clock carried in nonces (covers transit + residual skew)
+ORDER_NONCE_LEAD_MS = 10_000
+CANCEL_NONCE_LEAD_MS = 20_000
+
+# Appendix order types that rest on the book after placement (default limit, post-only)
+_RESTING_ORDER_TYPES = (0, 3)
+_PENDING_PRUNE_SIZE = 512
+# order_update reasons after which the order is no longer on the book
+_CLOSED_ORDER_REASONS = ("filled", "cancelled", "canceled", "expired")
+
+
+@dataclass
+class PendingOrder:
+    """An order we signed, keyed by its locally computed EIP-712 digest."""
+    digest: str
+    product_id: int
+    side: str
+    amount_x18: int
+    price_x18: int
+    order_type: int
+    expiration: float
+    status: str = "pending"  # pending (sent, no answer yet) -> open (resting on the book)
+    opened_at: float = 0.0   # local time the gateway confirmed it resting
+
+
+class NonceAllocator:
+    """Strictly increasing Nado nonces ``(recv_time_ms << 20) | low bits``, safe across tasks and threads.
+    
+    recv_time is the gateway-clock deadline for the transaction: local time + estimated gateway
+    clock offset + a lead covering transit. The offset is bracketed from observed server timestamps
+    (HTTP Date headers, depth frame timestamps); until the first observation it is 0 and the lead
+    alone absorbs skew, as before.
+    
+    The low 20 bits are split into lanes of 2^19 (lane 0: regular orders and cancels, lane 1: the
+    pre-signed ladder). Within a lane each millisecond hands out a counter; when the counter runs
+    out or the clock steps back, allocation carries on in the following millisecond, so a lane
+    never repeats or decreases.
+    """
+    
+    LANE_BITS = 19
+    
+    def __init__(self, clock=time.time, window: int = 64):
+        self._now = clock
+        self._lock = threading.Lock()
+        self._lanes: Dict[int, List[int]] = {}  # lane -> [last_ms, next_counter]
+        # Per-sample bounds on (server - local) seconds; the estimate is their intersection
+        self._samples: deque = deque(maxlen=window)
+        self._offset = 0.0
+        self._uncertainty: Optional[float] = None
+        self._last_date: Optional[str] = None
+        self._last_stream = 0.0
+    
+    # ---------------------------
+    # Clock offset
+    # ---------------------------
+    
+    @property
+    def offset(self) -> float:
+        """Estimated gateway clock minus local clock, in seconds."""
+        return self._offset
+    
+    @property
+    def uncertainty(self) -> Optional[float]:
+        """Half-width of the offset bracket in seconds (None until a two-sided sample is seen)."""
+        return self._uncertainty
+    
+    def observe(self, server_sec: float, sent_at: Optional[float], received_at: float, resolution: float = 0.0):
+        """Record that the server clock read ``server_sec`` (truncated to ``resolution``) between
+        ``sent_at`` and ``received_at`` local time. ``sent_at=None`` gives a one-sided (push) sample."""
+        lo = server_sec - received_at
+        hi = server_sec + resolution - sent_at if sent_at is not None else float("inf")
+        with self._lock:
+            self._samples.append((lo, hi))
+            lo = max(b[0] for b in self._samples)
+            hi = min(b[1] for b in self._samples)
+            if lo > hi:
+                # Samples disagree (clock step / drift): restart from the newest one
+                lo, hi = self._samples[-1]
+                self._samples.clear()
+                self._samples.append((lo, hi))
+            if hi == float("inf"):
+                self._offset, self._uncertainty = lo, None
+            else:
+                self._offset, self._uncertainty = (lo + hi) / 2, (hi - lo) / 2
+    
+    def observe_date_header(self, date: Optional[str], sent_at: float, received_at: float):
+        """HTTP Date header sample (1s resolution); parsed only when the header changes."""
+        if not date or date == self._last_date:
+            return
+        self._last_date = date
+        try:
+            server_sec = parsedate_to_datetime(date).timestamp()
+        except (TypeError, ValueError):
+            return
+        self.observe(server_sec, sent_at, received_at, resolution=1.0)
+    
+    def observe_stream_ns(self, server_ns: int, min_interval: float = 0.1):
+        """Push sample: a frame stamped ``server_ns`` by the gateway just arrived (rate-limited)."""
+        now = self._now()
+        if now - self._last_stream < min_interval:
+            return
+        self._last_stream = now
+        self.observe(server_ns / 1e9, None, now)
+    
+    # ---------------------------
+    # Allocation
+    # ---------------------------
+    
+    def local_time(self) -> float:
+        return self._now()
+    
+    def gateway_time(self) -> float:
+        return self._now() + self._offset
+    
+    def allocate(self, count: int = 1, lead_ms: int = 10_000, lane: int = 0) -> List[int]:
+        """``count`` consecutive nonces whose recv_time is gateway now + ``lead_ms``."""
+        span = 1 << self.LANE_BITS
+        target_ms = int(self.gateway_time() * 1000) + lead_ms
+        out = []
+        with self._lock:
+            state = self._lanes.setdefault(lane, [0, 0])
+            if target_ms > state[0]:
+                state[0], state[1] = target_ms, 0
+            for _ in range(count):
+                if state[1] >= span:
+                    state[0], state[1] = state[0] + 1, 0
+                out.append((state[0] << 20) | (lane << self.LANE_BITS) | state[1])
+                state[1] += 1
+        return out
+    
+    def next(self, lead_ms: int = 10_000, lane: int = 0) -> int:
+        return self.allocate(1, lead_ms, lane)[0]
+
 
 class NadoClient(BaseExchangeClient):
     """Nado exchange client implementation."""
@@ -31,17 +212,16 @@ class NadoClient(BaseExchangeClient):
         self.private_key = os.getenv('NADO_PRIVATE_KEY')
         self.network = os.getenv('NADO_NETWORK', 'mainnet')
         
-        if self.network == 'mainnet':
-            # Updated based on user logs and verification
-            self.gateway_url = "https://gateway.prod.nado.xyz/v1"
-            self.ws_url = "wss://gateway.prod.nado.xyz/v1/ws"
-            self.archive_url = "https://archive.prod.nado.xyz/v1"
-            self.chain_id = 57073 # Ink Mainnet Chain ID
-        else:
-            self.gateway_url = "https://gateway.test.nado.xyz/v1"
-            self.ws_url = "wss://gateway.test.nado.xyz/v1/ws"
-            self.archive_url = "https://archive.test.nado.xyz/v1"
-            self.chain_id = 763373 # Ink Sepolia Chain ID (Verify if changed)
+        network = network_config(self.network)
+        self.gateway_url = network["gateway_url"]
+        self.ws_url = network["ws_url"]
+        self.archive_url = network["archive_url"]
+        self.chain_id = network["chain_id"]
+
+        # Explicit endpoint overrides (e.g. the local mock_gateway.py for benchmarks / chaos tests)
+        self.gateway_url = os.getenv('NADO_GATEWAY_URL') or self.gateway_url
+        self.ws_url = os.getenv('NADO_WS_URL') or self.ws_url
+        self.archive_url = os.getenv('NADO_ARCHIVE_URL') or self.archive_url
         
         print(f"[NADO] Initialized with Network: {self.network}")
         print(f"[NADO] Gateway URL: {self.gateway_url}")
@@ -49,7 +229,9 @@ class NadoClient(BaseExchangeClient):
         if not self.private_key:
             raise ValueError("NADO_PRIVATE_KEY must be set in environment variables")
 
-        self.logger = TradingLogger(exchange="nado", ticker=self.config.ticker, log_to_console=False)
+        # NADO_LOGS_DIR moves the activity log / orders CSV out of the project's logs/ (benchmarks, mock runs)
+        self.logger = TradingLogger(exchange="nado", ticker=self.config.ticker, log_to_console=False,
+                                    logs_dir=os.getenv('NADO_LOGS_DIR') or None)
         
         # Setup Account
         try:
@@ -58,6 +240,10 @@ class NadoClient(BaseExchangeClient):
              else:
                  self.account = Account.from_key("0x" + self.private_key)
              self.wallet_address = self.account.address
+             # Precomputed EIP-712 signer (cached domains/type hashes, fixed-base secp256k1 table)
+             self.signer = NadoSigner(self.account.key, self.chain_id)
+             # Off-loop signing (NADO_SIGNER_MODE=inline|thread|process, NADO_SIGNER_WORKERS)
+             self.signing_pool = SigningPool(self.signer)
              self.subaccount_name = os.getenv('NADO_SUBACCOUNT_NAME', 'default')
              print(f"[NADO] Subaccount: {self.subaccount_name}")
         except Exception as e:
@@ -68,19 +254,29 @@ class NadoClient(BaseExchangeClient):
         self.product_id: Optional[int] = None
         self.verifying_contract: Optional[str] = None
         self.endpoint_addr: Optional[str] = None
+        self.presign_ladder: Optional[PresignedLadder] = None
+        # Shared nonce source for place_* / cancel_orders / the ladder, synced to the gateway clock
+        self.nonces = NonceAllocator()
+        # Locally computed digest -> order, from signing until it is rejected, cancelled or expires
+        self._pending_orders: Dict[str, PendingOrder] = {}
         
         # Persistence & Control
-        self._session = None
-        self._ws_session = None
-        self._ws_connection = None
+        # Shared keep-alive REST transport (created on first request, warmed by warm_transport())
+        self.http = HttpTransport()
+        # Oracle prices by product_id, refreshed in the background and by account snapshots
+        self.prices = OraclePriceCache(self)
+        # Cached, single-flight subaccount_info shared by positions and PnL stats (NADO_ACCOUNT_TTL_MS)
+        self.account_state = AccountStateService(
+            self, on_snapshot=lambda snap: self.prices.update_many(snap.oracle_prices, snap.fetched_at))
+        # Executes over a persistent gateway WS (request-id correlated), REST while it is down
+        self.ws_exec = WsExecutionChannel(self)
         self._order_update_handler = None
-        self._ws_task: Optional[asyncio.Task] = None
-        self._ws_stop = asyncio.Event()
 
         # V3 Resilience: Position Cache & Anti-Glitch
         self._pos_cache: Optional[Decimal] = None
         self._zero_balance_strikes = 0
         self._STRIKE_THRESHOLD = 3
+        self._strike_fetched_at: Optional[float] = None  # snapshot that counted the last strike
 
 
     def get_exchange_name(self) -> str:
@@ -103,47 +299,12 @@ class NadoClient(BaseExchangeClient):
         return Web3.to_checksum_address("0x" + padded)
 
     def _sign_order(self, order_dict: Dict, product_id: int) -> str:
-        """Sign order using EIP-712. 
-        Audit V3: Always use 5-field struct (sender, priceX18, amount, expiration, nonce).
-        The appendix is included in the JSON payload but EXCLUDED from the signature.
-        """
-        vc_address = self._get_verifying_contract(product_id)
-        
-        domain = {
-            "name": "Nado", 
-            "version": "0.0.1", 
-            "chainId": int(self.chain_id), 
-            "verifyingContract": vc_address
-        }
-        
-        # Types definition - SDK Order Struct always has 6 fields
-        types = {
-            "Order": [
-                {"name": "sender", "type": "bytes32"},
-                {"name": "priceX18", "type": "int128"},
-                {"name": "amount", "type": "int128"},
-                {"name": "expiration", "type": "uint64"},
-                {"name": "nonce", "type": "uint64"},
-                {"name": "appendix", "type": "uint128"}
-            ]
-        }
+        """Sign order using EIP-712 (6-field Order struct incl. appendix).
         
-        sign_message = {
-            "sender": bytes.fromhex(order_dict["sender"][2:]),
-            "priceX18": int(order_dict["priceX18"]),
-            "amount": int(order_dict["amount"]),
-            "expiration": int(order_dict["expiration"]),
-            "nonce": int(order_dict["nonce"]),
-            "appendix": int(order_dict.get("appendix", 0))
-        }
-        
-        signed_message = Account.sign_typed_data(
-            self.private_key, 
-            domain_data=domain, 
-            message_types=types, 
-            message_data=sign_message
-        )
-        return "0x" + signed_message.signature.hex()
+        Domain: name "Nado", version "0.0.1", chainId, verifyingContract = address(productId)
+        (see _get_verifying_contract). The signer caches the domain separator per product.
+        """
+        return self.signer.sign_order(order_dict, int(product_id))
 
     def _subaccount_to_bytes32(self, address: str, name: str) -> str:
         """Generate subaccount ID bytes32.
@@ -172,10 +333,7 @@ class NadoClient(BaseExchangeClient):
     async def _post(self, endpoint: str, payload: Dict = None) -> Dict:
         """Helper for POST requests."""
         url = f"{self.gateway_url}{endpoint}"
-        
-        # Use persistent session if available (initialized in connect())
-        # Fallback to a temporary one if called before connect
-        session = self._session if self._session and not self._session.closed else aiohttp.ClientSession()
+        session = self.http.session
         
         try:
             headers = {
@@ -185,11 +343,12 @@ class NadoClient(BaseExchangeClient):
             }
             
             data_str = json.dumps(payload, separators=(',', ':')) if payload else None
-            self.logger.log(f"FORENSIC_PAYLOAD: {data_str}", "INFO")
-            
-            timeout = aiohttp.ClientTimeout(total=30)
+            if self.logger.enabled_for("DEBUG"):
+                self.logger.log("FORENSIC_PAYLOAD: %s", "DEBUG", data_str, category="payload")
             
-            async with session.post(url, data=data_str, headers=headers, timeout=timeout) as resp:
+            sent_at = self.nonces.local_time()
+            async with session.post(url, data=data_str, headers=headers) as resp:
+                self.nonces.observe_date_header(resp.headers.get('Date'), sent_at, self.nonces.local_time())
                 text = await resp.text()
                 if resp.status != 200:
                     self.logger.log(f"API {endpoint} Reject {resp.status}: {text[:200]}", "ERROR")
@@ -198,14 +357,11 @@ class NadoClient(BaseExchangeClient):
         except Exception as e:
             self.logger.log(f"Connection error (POST): {e}", "ERROR")
             raise
-        finally:
-            if session != self._session:
-                await session.close()
 
     async def _archive_post(self, endpoint: str, payload: Dict = None) -> Dict:
         """Helper for Indexer/Archive POST requests."""
         url = f"{self.archive_url}{endpoint}"
-        session = self._session if self._session and not self._session.closed else aiohttp.ClientSession()
+        session = self.http.session
         
         try:
             # Indexer requires gzip/br/deflate compatibility headers usually
@@ -222,14 +378,11 @@ class NadoClient(BaseExchangeClient):
         except Exception as e:
             self.logger.log(f"Archive Request Failed: {e}", "ERROR")
             return {}
-        finally:
-            if session != self._session:
-                await session.close()
 
     async def _get(self, endpoint: str) -> Dict:
         """Helper for GET requests."""
         url = f"{self.gateway_url}{endpoint}"
-        session = self._session if self._session and not self._session.closed else aiohttp.ClientSession()
+        session = self.http.session
         
         try:
             headers = {"User-Agent": "NadoBot/1.0"}
@@ -242,9 +395,28 @@ class NadoClient(BaseExchangeClient):
         except Exception as e:
             self.logger.log(f"Connection error (GET): {e}", "ERROR")
             return {}
-        finally:
-            if session != self._session:
-                await session.close()
+
+    @property
+    def _session(self) -> Optional[aiohttp.ClientSession]:
+        """The REST session if one is open (api_server checks it to reuse a live client)."""
+        return self.http._session
+
+    async def _execute(self, payload: Dict) -> Dict:
+        """POST /execute equivalent: over the WS execution channel when it is up, REST otherwise."""
+        return await self.ws_exec.execute(payload)
+
+    async def warm_transport(self) -> int:
+        """Open NADO_HTTP_WARM keep-alive sockets to the gateway before the first order.
+
+        Each probe is a `status` query, so it also feeds the nonce allocator's clock offset.
+        """
+        warmed = await self.http.warm(lambda: self._post("/query", {"type": "status"}))
+        self.logger.log(f"HTTP transport warmed: {warmed} connection(s) to {self.gateway_url}", "INFO")
+        return warmed
+
+    def transport_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host REST request / connection counters (see HttpTransport.stats)."""
+        return self.http.stats()
 
     # ---------------------------
     # Core Trading Methods
@@ -290,7 +462,7 @@ class NadoClient(BaseExchangeClient):
         except Exception as e:
             self.logger.log(f"Failed to fetch products/contracts: {e}. Using Hardcoded defaults.", "ERROR")
             self.product_id = 4
-            self.endpoint_addr = "0x05ec92d78ed421f3d3ada77ffde167106565974e" # Ink Mainnet Backup
+            self.endpoint_addr = DEFAULT_ENDPOINT_ADDR # Ink Mainnet Backup
             
         return self.config.contract_id, self.config.tick_size
 
@@ -316,39 +488,21 @@ class NadoClient(BaseExchangeClient):
             self.logger.log(f"Failed to fetch pairs: {e}", "ERROR")
             return []
             
-    async def _get_execution_price(self, direction) -> Decimal:
-        """Fetch current market price (Oracle/Mark)."""
+    async def _get_execution_price(self, direction, max_age_ms: Optional[float] = None) -> Decimal:
+        """Current market price (Oracle/Mark) from the price cache.
+
+        Answers from memory while the cached oracle price is younger than ``max_age_ms``
+        (NADO_PRICE_MAX_AGE_MS by default), otherwise refreshes it via all_products.
+        """
         try:
-            # CORRECT: Use /query {type: all_products} which contains oracle prices
-            res = await self._post("/query", {"type": "all_products"})
-            data = res.get('data', {})
-            
-            # Combine
-            products = data.get('spot_products', []) + data.get('perp_products', [])
-            
-            # Default fallback if not found
-            price = None
-            
-            for p in products:
-                if int(p.get('product_id', 0)) == int(self.product_id):
-                    # Oracle price is in oracle_price_x18
-                    px18 = p.get('oracle_price_x18')
-                    if px18:
-                        price = Decimal(str(px18)) / Decimal(10**18)
-                    break
-            
-            if price is None:
-                raise ValueError(f"Product {self.product_id} not found in all_products")
-                
-            return price
-            
+            return x18_to_decimal(await self.prices.price(self.product_id, max_age_ms))
         except Exception as e:
             self.logger.log(f"Price fetch failed ({e}).", "WARNING")
             raise e
             # return Decimal("3300") # UNSAFE: Removed to prevent bad orders
 
-    async def get_depth(self, product_id: int = None) -> Dict:
-        """Fetch Level 2 Orderbook Depth."""
+    async def get_depth(self, product_id: int = None, depth: int = 5) -> Dict:
+        """Fetch Level 2 Orderbook Depth (market_liquidity snapshot, incl. its timestamp)."""
         pid = product_id or self.product_id
         if not pid:
             raise ValueError("Product ID required for Depth")
@@ -359,7 +513,7 @@ class NadoClient(BaseExchangeClient):
             payload = {
                 "type": "market_liquidity",
                 "product_id": pid,
-                "depth": 5
+                "depth": depth
             }
             res = await self._post("/query", payload)
             
@@ -406,105 +560,277 @@ class NadoClient(BaseExchangeClient):
         
         return res
 
+    def _order_entry(self, quantity, direction: str, price, nonce: int, expiration_ms: int,
+                     order_type: int = 0) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return (EIP-712 message, unsigned place_orders entry) for one order."""
+        sender_str = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
+        
+        # X18 prices pass straight through
+        price_x18 = to_x18(price)
+        amount_x18 = to_x18(quantity)
+        if direction == 'sell':
+            amount_x18 = -amount_x18
+        appendix = self._build_appendix(is_reduce_only=False, order_type=order_type)
+        
+        # Signing needs the 0x-prefixed sender and ints; the payload wants strings and no 0x
+        order_msg = {
+            "sender": "0x" + sender_str,
+            "priceX18": price_x18,
+            "amount": amount_x18,
+            "expiration": expiration_ms,
+            "nonce": nonce,
+            "appendix": appendix
+        }
+        payload_order = {
+            "sender": sender_str,
+            "priceX18": str(price_x18),
+            "amount": str(amount_x18),
+            "expiration": str(expiration_ms),
+            "nonce": str(nonce),
+            "appendix": str(appendix)
+        }
+        return order_msg, {
+            "product_id": self.product_id,
+            "order": payload_order
+        }
+
+    def _build_order(self, quantity, direction: str, price, nonce: int, expiration_ms: int,
+                     order_type: int = 0) -> Dict[str, Any]:
+        """Sign one order and return its place_orders entry (product_id / order / signature)."""
+        order_msg, entry = self._order_entry(quantity, direction, price, nonce, expiration_ms, order_type)
+        entry["signature"] = self._sign_order(order_msg, self.product_id)
+        return entry
+
+    def _order_entries(self, orders_data: List[Tuple[Decimal, str, Any]], order_type: int = 0,
+                       now_sec: Optional[float] = None) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """(message, unsigned entry) pairs for (quantity, direction, price) tuples.
+        
+        Error 2011 Fix: expiration +1h; nonces come from the shared allocator (gateway clock + lead,
+        unique per order even within one millisecond).
+        """
+        if now_sec is None:
+            now_sec = time.time()
+        future_ms = int((now_sec + 3600) * 1000)
+        nonces = self.nonces.allocate(len(orders_data), lead_ms=ORDER_NONCE_LEAD_MS)
+        return [
+            self._order_entry(quantity, direction, price, nonce, future_ms, order_type)
+            for nonce, (quantity, direction, price) in zip(nonces, orders_data)
+        ]
+
+    def _build_place_orders(self, orders_data: List[Tuple[Decimal, str, Any]], order_type: int = 0,
+                            now_sec: Optional[float] = None) -> Dict[str, Any]:
+        """Build the signed /execute place_orders bundle, signing inline on the caller."""
+        orders = []
+        for order_msg, entry in self._order_entries(orders_data, order_type, now_sec):
+            entry["signature"] = self._sign_order(order_msg, self.product_id)
+            orders.append(entry)
+        return {
+            "place_orders": {
+                "orders": orders
+            }
+        }
+
+    async def _sign_place_orders(self, orders_data: List[Tuple[Decimal, str, Any]], order_type: int = 0,
+                                 now_sec: Optional[float] = None) -> Tuple[Dict[str, Any], List[str]]:
+        """Same bundle as _build_place_orders plus the orders' digests, signed on the signing pool.
+        
+        Digests (keccak only) are hashed here; the scalar multiplications run in parallel off the
+        loop so the WS listener keeps applying depth frames while a batch signs. The digests are
+        the orders' ids on Nado and are tracked as pending before the bundle is sent.
+        """
+        entries = self._order_entries(orders_data, order_type, now_sec)
+        raw_digests = [self.signer.order_digest(order_msg, int(self.product_id)) for order_msg, _ in entries]
+        signatures = await self.signing_pool.sign_digests(raw_digests)
+        orders = []
+        for (_, entry), signature in zip(entries, signatures):
+            entry["signature"] = signature
+            orders.append(entry)
+        digests = ["0x" + d.hex() for d in raw_digests]
+        self._track_pending(digests, [msg for msg, _ in entries], order_type)
+        return {
+            "place_orders": {
+                "orders": orders
+            }
+        }, digests
+
+    # ---------------------------
+    # Pending order table
+    # ---------------------------
+
+    def _track_pending(self, digests: List[str], order_msgs: List[Dict[str, Any]], order_type: int):
+        """Register signed orders under their local digests before they are sent."""
+        if len(self._pending_orders) > _PENDING_PRUNE_SIZE:
+            now = time.time()
+            for digest in [d for d, o in self._pending_orders.items() if o.expiration <= now]:
+                del self._pending_orders[digest]
+        for digest, msg in zip(digests, order_msgs):
+            self._pending_orders[digest] = PendingOrder(
+                digest=digest, product_id=int(self.product_id), side="buy" if msg["amount"] > 0 else "sell",
+                amount_x18=msg["amount"], price_x18=msg["priceX18"], order_type=order_type,
+                expiration=msg["expiration"] / 1000)
+
+    def _reconcile_pending(self, digests: List[str], res: Dict) -> List[Optional[str]]:
+        """Match a place_orders response against the local digests.
+        
+        Returns the gateway digest per order (None = rejected). Rejected and non-resting (IOC/FOK)
+        orders leave the table; resting ones are marked open.
+        """
+        data = res.get('data') if res.get('status') == 'success' else None
+        if not isinstance(data, list):
+            data = []
+        confirmed = []
+        for i, local in enumerate(digests):
+            item = data[i] if i < len(data) and isinstance(data[i], dict) else {}
+            server = item.get('digest')
+            pending = self._pending_orders.pop(local, None)
+            if not server:
+                confirmed.append(None)
+                continue
+            if server.lower() != local:
+                self.logger.log(f"Digest mismatch: local {local} vs gateway {server}", "WARNING")
+            if pending is not None and pending.order_type in _RESTING_ORDER_TYPES:
+                pending.status = "open"
+                pending.opened_at = time.time()
+                pending.digest = server
+                self._pending_orders[server] = pending
+            confirmed.append(server)
+        return confirmed
+
+    def _reconcile_open_orders(self, product_id: int, open_digests: List[str], queried_at: float):
+        """Drop open orders of ``product_id`` that a subaccount_orders snapshot no longer lists.
+        
+        They were filled or cancelled without a WS event reaching us. Orders still waiting for
+        their place response, or confirmed after the query was sent, are kept.
+        """
+        listed = {d.lower() if d.lower().startswith("0x") else "0x" + d.lower() for d in open_digests if d}
+        for digest, pending in list(self._pending_orders.items()):
+            if (pending.product_id == int(product_id) and pending.status == "open"
+                    and pending.opened_at < queried_at and digest.lower() not in listed):
+                del self._pending_orders[digest]
+
+    def _forget_pending(self, digests: List[str]):
+        for d in digests:
+            d = d.lower()
+            self._pending_orders.pop(d if d.startswith("0x") else "0x" + d, None)
+
+    def _settle_pending(self, digest: Optional[str], remaining_x18: Optional[int] = None,
+                        reason: Optional[str] = None):
+        """Apply a WS fill (unsigned remaining size) or order update (reason) to the pending table.
+        
+        Orders with nothing remaining, or closed by the update, leave the table; partial fills
+        shrink the tracked amount.
+        """
+        if not digest:
+            return
+        key = digest.lower()
+        key = key if key.startswith("0x") else "0x" + key
+        pending = self._pending_orders.get(key)
+        if pending is None:
+            return
+        if remaining_x18 == 0 or (reason or "").lower() in _CLOSED_ORDER_REASONS:
+            del self._pending_orders[key]
+        elif remaining_x18 is not None:
+            pending.amount_x18 = abs(remaining_x18) if pending.amount_x18 > 0 else -abs(remaining_x18)
+
+    def tracked_orders(self, product_id: Optional[int] = None) -> List[PendingOrder]:
+        """Orders signed by this client that are in flight or resting, newest last.
+        
+        Available as soon as place_* has signed them, so a requote can cancel the previous
+        quotes without waiting for their /execute response or a subaccount_orders query.
+        """
+        return [o for o in self._pending_orders.values() if product_id is None or o.product_id == int(product_id)]
+
     async def place_open_order(self, contract_id: str, quantity: Decimal, direction: str, price: Decimal = None, order_type: int = 0) -> OrderResult:
+        digests: List[str] = []
         try:
             if price:
                 current_price = price
             else:
                 current_price = await self._get_execution_price(direction)
             
-            self.logger.log(f"Placing order: Product={self.product_id}, Price={current_price}, Amount={quantity}, Dir={direction}, Type={order_type}", "INFO")
+            display_price = current_price.to_decimal() if isinstance(current_price, X18) else current_price
+            self.logger.log(f"Placing order: Product={self.product_id}, Price={display_price}, Amount={quantity}, "
+                            f"Dir={direction}, Type={order_type}", "INFO")
 
-            # 1. Prepare Sender
-            sender_str = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
+            # 1-7. Nonce/expiry, X18 amounts, appendix, EIP-712 signature and string payload
+            tx_payload, digests = await self._sign_place_orders([(quantity, direction, current_price)], order_type=order_type)
             
-            # 2. Prepare Timestamps/Nonce
-            # Error 2011 Fix: Aggressive buffers.
-            # Expiration: +1h (3600s) to be safe.
-            # Nonce: +10s to compensate for local clock lag and network latency.
-            now_sec = time.time()
-            future_ms = int((now_sec + 3600) * 1000)
-            nonce = (int((now_sec + 10) * 1000) << 20) + 12345
-            
-            # 3. Prepare Amounts (x18)
-            price_x18 = int(Decimal(str(current_price)) * Decimal("1000000000000000000"))
-            amount_x18 = int(Decimal(str(quantity)) * Decimal("1000000000000000000"))
-            if direction == 'sell':
-                amount_x18 = -amount_x18
-                
-            # 4. Build Appendix
-            # Standard Limit Order: Type 0 (default)
-            # Support IOC if order_type is passed
-            appendix = self._build_appendix(is_reduce_only=False, order_type=order_type)
-
-            # 5. Build Order Dict (for Signing)
-            order_msg = {
-                "sender": "0x" + sender_str, # Signing still needs 0x
-                "priceX18": price_x18,
-                "amount": amount_x18,
-                "expiration": future_ms,
-                "nonce": nonce,
-                "appendix": appendix
-            }
+            # 8. Execute (WS execution channel when it is up, else REST via _post)
+            res = await self._execute(tx_payload)
             
-            # 6. Sign
-            signature = self._sign_order(order_msg, self.product_id)
-            
-            # 7. Construct Payload (Strings for API)
-            payload_order = {
-                "sender": sender_str, # Payload does NOT want 0x
-                "priceX18": str(price_x18),
-                "amount": str(amount_x18),
-                "expiration": str(future_ms),
-                "nonce": str(nonce),
-                "appendix": str(appendix)
-            }
-            
-            tx_payload = {
-                "place_orders": {
-                    "orders": [{
-                        "product_id": self.product_id,
-                        "order": payload_order,
-                        "signature": signature
-                    }]
-                }
-            }
-            
-            # 8. Execute via REST
-            # Note: We use existing _post helper which handles headers/session
-            res = await self._post("/execute", tx_payload)
-            
-            # 9. Handle Response
-            with open("debug_response.json", "w") as df:
-                json.dump(res, df, indent=2)
-                
-            if res.get('status') == 'success':
-                if res.get('data') and len(res['data']) > 0:
-                    digest = res['data'][0].get('digest')
-                    if digest:
-                        self.logger.log(f"Order placed! Digest: {digest}", "INFO")
-                        return OrderResult(success=True, order_id=digest)
-                    else:
-                         error_msg = f"Item Error: {res['data'][0].get('error', 'Unknown')}"
-                else:
-                    error_msg = f"Success but no data: {json.dumps(res)}"
-            else:
-                error_msg = res.get('error', 'Unknown error')
-                
-            self.logger.log(f"Order rejected: {error_msg} (Full: {res})", "ERROR")
-            return OrderResult(success=False, error_message=str(error_msg))
+            # 9. Handle Response (rejects are logged in full by _single_order_result)
+            return self._single_order_result(res, digests[0])
 
         except Exception as e:
             self.logger.log(f"Place Order Failed: {e}", "ERROR")
+            # No response to reconcile against: stop tracking what was signed
+            self._forget_pending(digests)
             # traceback.print_exc()
             return OrderResult(success=False, error_message=str(e))
 
+    def _single_order_result(self, res: Dict, local_digest: str) -> OrderResult:
+        """OrderResult for a one-order place_orders response (reconciles the pending table)."""
+        digest = self._reconcile_pending([local_digest], res)[0]
+        if res.get('status') == 'success':
+            if res.get('data') and len(res['data']) > 0:
+                if digest:
+                    self.logger.log(f"Order placed! Digest: {digest}", "INFO")
+                    return OrderResult(success=True, order_id=digest, order_ids=[digest])
+                else:
+                     error_msg = f"Item Error: {res['data'][0].get('error', 'Unknown')}"
+            else:
+                error_msg = f"Success but no data: {json.dumps(res)}"
+        else:
+            error_msg = res.get('error', 'Unknown error')
+            
+        self.logger.log(f"Order rejected: {error_msg} (Full: {res})", "ERROR")
+        return OrderResult(success=False, error_message=str(error_msg))
+
+    # ---------------------------
+    # Pre-signed IOC ladder
+    # ---------------------------
+
+    def start_presign_ladder(self, quantity: Decimal, mid_source, **kwargs) -> PresignedLadder:
+        """Keep IOC orders for `quantity` pre-signed around `mid_source()` for place_market_order."""
+        if self.presign_ladder is None or self.presign_ladder.quantity != Decimal(quantity):
+            self.presign_ladder = PresignedLadder(self, quantity, **kwargs)
+        self.presign_ladder.start(mid_source)
+        return self.presign_ladder
+
+    async def stop_presign_ladder(self):
+        if self.presign_ladder:
+            await self.presign_ladder.stop()
+            self.presign_ladder = None
+
+    async def _place_presigned(self, quantity: Decimal, direction: str) -> Optional[OrderResult]:
+        """Send a ready-made ladder rung if one matches the current mid, else None."""
+        ladder = self.presign_ladder
+        if ladder is None:
+            return None
+        rung = ladder.take(direction, quantity, await ladder.mid_source())
+        if rung is None:
+            return None
+        self.logger.log(f"MARKET {direction.upper()} {quantity} @ {x18_to_decimal(rung.price_x18)} (IOC, pre-signed)", "INFO")
+        self._track_pending([rung.digest], [rung.order_msg], IOC_ORDER_TYPE)
+        try:
+            res = await self._execute(rung.payload)
+        except Exception:
+            self._forget_pending([rung.digest])
+            raise
+        return self._single_order_result(res, rung.digest)
+
     async def place_market_order(self, contract_id: str, quantity: Decimal, direction: str) -> OrderResult:
         """
         Place a Market Order (IOC + Aggressive Price).
         Slippage: 5%
+        Uses a pre-signed ladder rung when one is ready (see start_presign_ladder).
         """
         try:
+            # 0. Fast path: pre-signed payload for the current mid
+            result = await self._place_presigned(quantity, direction)
+            if result is not None:
+                return result
+
             # 1. Get Base Price
             base_price = await self._get_execution_price(direction)
             
@@ -535,76 +861,30 @@ class NadoClient(BaseExchangeClient):
             orders_data: List of (quantity, direction, price) tuples.
                          price can be None to use current execution price (not recommended for batch).
         """
+        local_digests: List[str] = []
         try:
             self.logger.log(f"Placing BATCH of {len(orders_data)} orders", "INFO")
             
-            # Common Data
-            sender_str = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
-            now_sec = time.time()
-            future_ms = int((now_sec + 3600) * 1000)
-            
-            batched_orders_payload = []
-            
-            for i, (quantity, direction, price) in enumerate(orders_data):
-                # 1. Price/Amount Prep
+            resolved = []
+            market_price = None
+            for quantity, direction, price in orders_data:
                 if price is None:
-                    # Fetching price sequentially in batch is slow, better to pass it in.
-                    price = await self._get_execution_price(direction)
-                
-                price_x18 = int(Decimal(str(price)) * Decimal("1000000000000000000"))
-                amount_x18 = int(Decimal(str(quantity)) * Decimal("1000000000000000000"))
-                if direction == 'sell':
-                    amount_x18 = -amount_x18
-                
-                # 2. Nonce (Increment for each order to be safe)
-                nonce = (int((now_sec + 10 + i) * 1000) << 20) + 12345
-                
-                # 3. Appendix
-                appendix = self._build_appendix(is_reduce_only=False, order_type=0)
-                
-                # 4. Message for Signing
-                order_msg = {
-                    "sender": "0x" + sender_str,
-                    "priceX18": price_x18,
-                    "amount": amount_x18,
-                    "expiration": future_ms,
-                    "nonce": nonce,
-                    "appendix": appendix
-                }
-                
-                # 5. Sign
-                signature = self._sign_order(order_msg, self.product_id)
-                
-                # 6. Payload Construction
-                payload_order = {
-                    "sender": sender_str,
-                    "priceX18": str(price_x18),
-                    "amount": str(amount_x18),
-                    "expiration": str(future_ms),
-                    "nonce": str(nonce),
-                    "appendix": str(appendix)
-                }
-                
-                batched_orders_payload.append({
-                    "product_id": self.product_id,
-                    "order": payload_order,
-                    "signature": signature
-                })
+                    # One cache read serves every un-priced order in the batch
+                    if market_price is None:
+                        market_price = await self._get_execution_price(direction)
+                    price = market_price
+                resolved.append((quantity, direction, price))
             
-            # 7. Final Bundle
-            tx_payload = {
-                "place_orders": {
-                    "orders": batched_orders_payload
-                }
-            }
+            tx_payload, local_digests = await self._sign_place_orders(resolved)
             
-            # 8. Execute
-            res = await self._post("/execute", tx_payload)
+            # Execute
+            res = await self._execute(tx_payload)
+            digests = self._reconcile_pending(local_digests, res)
             
             if res.get('status') == 'success':
-                digests = [o.get('digest') for o in res.get('data', [])]
                 self.logger.log(f"Batch Success! Digests: {digests}", "INFO")
-                return OrderResult(success=True, order_id=str(digests))
+                placed = [d for d in digests if d]
+                return OrderResult(success=True, order_id=placed[0] if placed else None, order_ids=digests)
             else:
                 error_msg = res.get('error', 'Unknown error')
                 self.logger.log(f"Batch Rejected: {error_msg} (Full: {res})", "ERROR")
@@ -612,6 +892,7 @@ class NadoClient(BaseExchangeClient):
 
         except Exception as e:
             self.logger.log(f"Batch Order Failed: {e}", "ERROR")
+            self._forget_pending(local_digests)
             return OrderResult(success=False, error_message=str(e))
 
     def _sign_cancellation(self, cancellation_dict: Dict) -> str:
@@ -620,51 +901,15 @@ class NadoClient(BaseExchangeClient):
         Note: Unlike Order placement which uses product-specific verifying contracts,
         all other execute operations (Cancel, Withdraw, etc.) use the global Endpoint address.
         """
-        vc_address = self.endpoint_addr if self.endpoint_addr else self._get_verifying_contract(0)
-        
-        domain = {
-            "name": "Nado", 
-            "version": "0.0.1", 
-            "chainId": int(self.chain_id),
-            "verifyingContract": vc_address
-        }
-        
-        types = {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"}
-            ],
-            "Cancellation": [
-                {"name": "sender", "type": "bytes32"},
-                {"name": "productIds", "type": "uint32[]"},
-                {"name": "digests", "type": "bytes32[]"},
-                {"name": "nonce", "type": "uint64"}
-            ]
-        }
-        
-        # Ensure types
-        def to_bytes32(val):
-            if isinstance(val, str):
-                clean = val[2:] if val.startswith("0x") else val
-                return bytes.fromhex(clean)
-            return val
-
-        msg = {
-            "sender": to_bytes32(cancellation_dict["sender"]),
-            "productIds": [int(p) for p in cancellation_dict["productIds"]],
-            "digests": [to_bytes32(d) for d in cancellation_dict["digests"]],
-            "nonce": int(cancellation_dict["nonce"])
-        }
-        
-        signed = Account.sign_typed_data(
-            self.private_key, 
-            domain_data=domain, 
-            message_types={"Cancellation": types["Cancellation"]}, 
-            message_data=msg
-        )
-        return "0x" + signed.signature.hex()
+        return self.signer.sign_cancellation(cancellation_dict, self._cancellation_contract())
+
+    def _cancellation_contract(self) -> str:
+        return self.endpoint_addr if self.endpoint_addr else self._get_verifying_contract(0)
+
+    async def _sign_cancellation_async(self, cancellation_dict: Dict) -> str:
+        """_sign_cancellation on the signing pool."""
+        digest = self.signer.cancellation_digest(cancellation_dict, self._cancellation_contract())
+        return (await self.signing_pool.sign_digests([digest]))[0]
 
     async def cancel_orders(self, digests: List[str], product_ids: List[int] = None) -> OrderResult:
         """Batch cancel orders, optionally from different products."""
@@ -675,8 +920,7 @@ class NadoClient(BaseExchangeClient):
             self.logger.log(f"Cancelling {len(digests)} orders...", "INFO")
             
             sender_str = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
-            now_sec = time.time()
-            nonce = (int((now_sec + 20) * 1000) << 20) + 12345
+            nonce = self.nonces.next(lead_ms=CANCEL_NONCE_LEAD_MS)
             
             # Group by product
             if not product_ids:
@@ -691,7 +935,7 @@ class NadoClient(BaseExchangeClient):
                 "nonce": nonce
             }
             
-            signature = self._sign_cancellation(cancellation)
+            signature = await self._sign_cancellation_async(cancellation)
             
             payload = {
                 "tx": {
@@ -707,10 +951,11 @@ class NadoClient(BaseExchangeClient):
                 "cancel_orders": payload
             }
             
-            res = await self._post("/execute", tx_payload)
+            res = await self._execute(tx_payload)
             
             if res.get('status') == 'success':
                  self.logger.log("Cancellation Success!", "INFO")
+                 self._forget_pending(digests)
                  return OrderResult(success=True)
             else:
                  error = res.get('error', 'Unknown')
@@ -734,16 +979,11 @@ class NadoClient(BaseExchangeClient):
             
             if not target_ids:
                 self.logger.log("🔍 [Safety] Identifying active orders across all products...", "INFO")
-                # Instead of a complex scan, we query the global 'subaccount_info' to find products with orders
-                sender = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
-                res = await self._post("/query", {"type": "subaccount_info", "subaccount": "0x" + sender})
-                
-                # Nado usually has list of orders in subaccount_info if depth is requested?
-                # No, they have open_interest. 
-                # Better: Scan known product range [1-100] is too slow.
-                # Optimized Scan: ETH (4), BTC (2), SOL (34)
+                # subaccount_info does not list open orders, so scan the products we trade.
+                # Scanning the full product range [1-100] is too slow.
+                # Optimized Scan: the products in PRODUCT_IDS
                 all_found_orders = []
-                for pid in [4, 2, 34]:
+                for pid in PRODUCT_IDS.values():
                     ords = await self.get_active_orders(str(pid))
                     all_found_orders.extend(ords)
                 
@@ -780,6 +1020,7 @@ class NadoClient(BaseExchangeClient):
                 "sender": sender,
                 "product_id": int(contract_id) if contract_id else self.product_id
             }
+            queried_at = time.time()
             res = await self._post("/query", payload)
             # self.logger.log(f"DEBUG: subaccount_orders raw res: {res}", "DEBUG")
             data = res.get('data', {}) if 'data' in res else res
@@ -811,13 +1052,18 @@ class NadoClient(BaseExchangeClient):
                     orders.append(OrderInfo(
                         order_id=digest,
                         side="buy" if amount > 0 else "sell",
-                        size=Decimal(str(abs(amount))) / Decimal(10**18),
-                        price=Decimal(str(price_x18)) / Decimal(10**18),
+                        size=x18_to_decimal(abs(amount)),
+                        price=x18_to_decimal(price_x18),
                         status="open",
                         filled_size=Decimal("0")
                     ))
                 except Exception as e:
                     self.logger.log(f"Mapping error for order: {e} | Data: {o}", "ERROR")
+            
+            # Open orders we track but the gateway no longer lists are gone
+            if res.get('status') == 'success':
+                listed = [o.get('digest', (o.get('order') or {}).get('digest')) for o in orders_list if isinstance(o, dict)]
+                self._reconcile_open_orders(payload["product_id"], listed, queried_at)
                 
             return orders
         except Exception as e:
@@ -825,32 +1071,27 @@ class NadoClient(BaseExchangeClient):
             return []
 
 
-    async def get_account_positions(self) -> Decimal:
-        """Fetch current position size with Zero-Balance Glitch protection."""
+    async def get_account_positions(self, max_age_ms: Optional[float] = None) -> Decimal:
+        """Fetch current position size with Zero-Balance Glitch protection.
+
+        Served from the shared subaccount_info snapshot when it is younger than
+        ``max_age_ms`` (the account_state TTL by default; 0 forces a query).
+        """
         try:
-            sender = self._subaccount_to_bytes32(self.wallet_address, self.subaccount_name)
-            payload = {
-                "type": "subaccount_info",
-                "subaccount": sender
-            }
-            res = await self._post("/query", payload)
-            
-            # Handle response
-            data = res.get('data', {})
-            perp_balances = data.get('perp_balances', [])
-            
-            current_pos = Decimal("0")
-            found = False
-            for p in perp_balances:
-                if int(p.get('product_id')) == int(self.product_id):
-                    amt_x18 = Decimal(p['balance']['amount'])
-                    current_pos = amt_x18 / Decimal(10**18)
-                    found = True
-                    break
+            snapshot = await self.account_state.get(max_age_ms)
+            found = snapshot.has_position(self.product_id)
+            current_pos = snapshot.position(self.product_id)
+
+            # Sent before a fill invalidated the cache: the position predates the fill, don't cache it
+            if self.account_state.superseded(snapshot):
+                return current_pos
             
             # --- Anti-Glitch Logic ---
             if found and current_pos == 0 and self._pos_cache is not None and self._pos_cache != 0:
-                self._zero_balance_strikes += 1
+                # Snapshots are shared by several readers within the TTL: one strike per distinct response
+                if snapshot.fetched_at != self._strike_fetched_at:
+                    self._strike_fetched_at = snapshot.fetched_at
+                    self._zero_balance_strikes += 1
                 if self._zero_balance_strikes < self._STRIKE_THRESHOLD:
                     self.logger.log(f"⚠️ [ANTI-GLITCH] API reported 0 balance, but cache is {self._pos_cache}. Strike {self._zero_balance_strikes}/{self._STRIKE_THRESHOLD}. Holding state.", "WARNING")
                     return self._pos_cache
@@ -882,8 +1123,8 @@ class NadoClient(BaseExchangeClient):
             for m in matches:
                 # Standardize SDK match to local trade format
                 p_id = int(m.get('product_id', 0))
-                amt = Decimal(m['amount']) / Decimal(10**18)
-                px = Decimal(m['price']) / Decimal(10**18)
+                amt = x18_to_decimal(m['amount'])
+                px = x18_to_decimal(m['price'])
                 ts = int(m.get('timestamp', 0))
                 
                 trades.append({
@@ -912,73 +1153,31 @@ class NadoClient(BaseExchangeClient):
     async def connect(self):
         """Establish WebSocket connection. Non-fatal if fails."""
         try:
-            # Initialize persistent REST session for api_server compatibility and efficiency
-            if not self._session or self._session.closed:
-                self._session = aiohttp.ClientSession()
+            # Warm the signing workers before the first quote needs them
+            await self.signing_pool.start()
 
-            # Use aiohttp to avoid 'websockets' library issues on Python 3.14
-            headers = {
-                "Origin": "https://app.nado.xyz",
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                "Sec-WebSocket-Version": "13",
-            }
-            self.logger.log(f"Connecting to WS: {self.ws_url}", "INFO")
-            
-            self._ws_session = aiohttp.ClientSession()
-            self._ws_connection = await self._ws_session.ws_connect(self.ws_url, headers=headers, heartbeat=20)
-            
-            self._ws_stop.clear()
-            self.logger.log("WebSocket Connected (aiohttp)", "INFO")
-            
-            # Start heartbeat or listen loop if needed
-            self._ws_task = asyncio.create_task(self._ws_loop())
+            # Open the keep-alive REST sockets (also what api_server checks via _session)
+            await self.warm_transport()
+
+            # Keep oracle prices in memory once a market / un-priced order needs one
+            self.prices.start()
+
+            # Persistent WS for order executes (NADO_WS_EXECUTE=0 keeps everything on REST)
+            if self.ws_exec.enabled:
+                self.logger.log(f"Connecting to WS: {self.ws_url}", "INFO")
+                if not await self.ws_exec.start():
+                    self.logger.log("WS not connected yet; executes use REST until it is.", "WARNING")
             
         except Exception as e:
             self.logger.log(f"WS Connect Failed: {e}. Continuing in REST-only mode.", "WARNING")
-            if self._ws_session:
-                await self._ws_session.close()
             # DO NOT raise - allow REST-only operation
 
-    async def _ws_loop(self):
-        """Keep connection alive and listen."""
-        try:
-            while not self._ws_stop.is_set():
-                if not self._ws_connection:
-                    break
-                try:
-                    # Receive message with timeout
-                    msg = await self._ws_connection.receive(timeout=25.0)
-                    
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        # self.logger.log(f"WS Received: {msg.data[:100]}", "DEBUG")
-                        pass # Process data here
-                        
-                    elif msg.type == aiohttp.WSMsgType.CLOSED:
-                        self.logger.log("WS Closed", "WARNING")
-                        break
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
-                        self.logger.log("WS Error", "ERROR")
-                        break
-                        
-                except asyncio.TimeoutError:
-                    # Heartbeat handled by aiohttp usually, but we can verify aliveness
-                    pass
-                except Exception as e:
-                    self.logger.log(f"WS Loop Error: {e}", "WARNING")
-                    break
-        except Exception as e:
-            self.logger.log(f"WS Loop Crash: {e}", "ERROR")
-
     async def disconnect(self):
-        self._ws_stop.set()
-        if self._ws_connection:
-            await self._ws_connection.close()
-        if self._ws_session:
-            await self._ws_session.close()
-        if self._session:
-            await self._session.close()
-        if self._ws_task:
-            self._ws_task.cancel()
+        await self.ws_exec.stop()
+        await self.prices.stop()
+        await self.http.close()
+        await self.stop_presign_ladder()
+        self.signing_pool.shutdown()
 
     def setup_order_update_handler(self, handler):
         self._order_update_handler = handler
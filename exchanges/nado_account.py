@@ -0,0 +1,157 @@
+"""
+Shared subaccount_info query service.
+
+PnL stats, the maker cycle's position check and the panic close all read the
+same ``{"type": "subaccount_info"}`` response. ``AccountStateService`` keeps
+the last parsed response as an ``AccountSnapshot`` and serves it while it is
+younger than the caller's ``max_age_ms`` (NADO_ACCOUNT_TTL_MS by default).
+Concurrent callers that miss the cache share one in-flight request
+(single-flight) instead of each sending their own.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from helpers.x18 import parse_x18, x18_to_decimal
+
+DEFAULT_TTL_MS = 1000.0
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    """One parsed subaccount_info response; amounts and prices are raw X18 ints."""
+    fetched_at: float                                   # service clock when the request was sent
+    spot_balances: Dict[int, int] = field(default_factory=dict)
+    perp_balances: Dict[int, Tuple[int, int]] = field(default_factory=dict)  # pid -> (amount, v_quote)
+    oracle_prices: Dict[int, int] = field(default_factory=dict)
+    healths: Tuple[int, ...] = ()
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], fetched_at: float) -> 'AccountSnapshot':
+        spot = {int(s['product_id']): parse_x18(s['balance']['amount']) for s in data.get('spot_balances', [])}
+        perp = {int(p['product_id']): (parse_x18(p['balance']['amount']),
+                                       parse_x18(p['balance'].get('v_quote_balance', 0)))
+                for p in data.get('perp_balances', [])}
+        prices = {}
+        for key in ('spot_products', 'perp_products'):
+            for p in data.get(key, []):
+                if p.get('oracle_price_x18') is not None:
+                    prices[int(p['product_id'])] = parse_x18(p['oracle_price_x18'])
+        healths = tuple(parse_x18(h.get('health', 0)) for h in data.get('healths', []))
+        return cls(fetched_at, spot, perp, prices, healths, data)
+
+    @property
+    def empty(self) -> bool:
+        return not self.data
+
+    def has_position(self, product_id: int) -> bool:
+        return int(product_id) in self.perp_balances
+
+    def position(self, product_id: int) -> Decimal:
+        return x18_to_decimal(self.perp_balances.get(int(product_id), (0, 0))[0])
+
+    def balance(self, product_id: int = 0) -> Decimal:
+        return x18_to_decimal(self.spot_balances.get(int(product_id), 0))
+
+    def oracle_price(self, product_id: int) -> Decimal:
+        return x18_to_decimal(self.oracle_prices.get(int(product_id), 0))
+
+    def health(self, index: int = 0) -> Decimal:
+        """healths[0] is maintenance health, healths[1] initial health."""
+        return x18_to_decimal(self.healths[index]) if index < len(self.healths) else Decimal("0")
+
+    def equity(self) -> Decimal:
+        """Quote balance plus, per perp, v_quote + amount * oracle price."""
+        total = self.balance(0)
+        for pid, (amount, v_quote) in self.perp_balances.items():
+            total += x18_to_decimal(v_quote) + x18_to_decimal(amount) * self.oracle_price(pid)
+        return total
+
+
+class AccountStateService:
+    """TTL-cached, single-flight subaccount_info for one client (anything with ``_post``).
+
+    ``on_snapshot`` sees every non-empty response, e.g. to feed its oracle prices to OraclePriceCache.
+    """
+
+    def __init__(self, client, ttl_ms: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 on_snapshot: Optional[Callable[[AccountSnapshot], None]] = None):
+        self.client = client
+        self.on_snapshot = on_snapshot
+        self.ttl_ms = ttl_ms if ttl_ms is not None else float(os.getenv("NADO_ACCOUNT_TTL_MS", DEFAULT_TTL_MS))
+        self._clock = clock
+        self._snapshot: Optional[AccountSnapshot] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._inflight_started = 0.0
+        self._invalidated_at = float("-inf")
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @property
+    def snapshot(self) -> Optional[AccountSnapshot]:
+        """Last snapshot, however old (None before the first successful fetch)."""
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next get() to query again (e.g. after a fill); requests already in flight no longer count."""
+        self._snapshot = None
+        self._invalidated_at = self._clock()
+
+    def superseded(self, snapshot: AccountSnapshot) -> bool:
+        """Whether ``snapshot``'s request was sent before the last invalidate() (e.g. it predates a fill)."""
+        return snapshot.fetched_at <= self._invalidated_at
+
+    async def get(self, max_age_ms: Optional[float] = None) -> AccountSnapshot:
+        """
+        A snapshot no older than ``max_age_ms`` (the service TTL by default; 0 forces a new query).
+
+        Age is measured from when the request was sent, so joining an in-flight request
+        is only allowed while it is itself young enough.
+        """
+        max_age = (self.ttl_ms if max_age_ms is None else max_age_ms) / 1000
+        now = self._clock()
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot.fetched_at <= max_age:
+            self.hits += 1
+            return snapshot
+        started = self._inflight_started
+        if self._inflight is not None and now - started <= max_age and started > self._invalidated_at:
+            self.coalesced += 1
+        else:
+            self._inflight_started = now
+            self._inflight = asyncio.ensure_future(self._fetch(now))
+        # shield: one caller being cancelled must not cancel the request the others wait on
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self, started: float) -> AccountSnapshot:
+        self.requests += 1
+        try:
+            sender = self.client._subaccount_to_bytes32(self.client.wallet_address, self.client.subaccount_name)
+            res = await self.client._post("/query", {"type": "subaccount_info", "subaccount": sender})
+            snapshot = AccountSnapshot.from_data(res.get('data') or {}, started)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            if self._inflight_started == started:
+                self._inflight = None
+        # Empty responses are returned but not cached, so the next caller retries
+        if not snapshot.empty and started > self._invalidated_at and (
+                self._snapshot is None or started >= self._snapshot.fetched_at):
+            self._snapshot = snapshot
+        if not snapshot.empty and self.on_snapshot:
+            self.on_snapshot(snapshot)
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        age = (self._clock() - self._snapshot.fetched_at) * 1000 if self._snapshot else None
+        return {"requests": self.requests, "hits": self.hits, "coalesced": self.coalesced,
+                "errors": self.errors, "ttl_ms": self.ttl_ms,
+                "age_ms": round(age, 1) if age is not None else None}
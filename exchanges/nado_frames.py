@@ -0,0 +1,196 @@
+"""
+Nado WebSocket frame decoder.
+
+Decodes each raw frame exactly once into a compact typed struct and routes it
+by channel prefix / event type. Uses orjson (or msgspec) when installed and
+falls back to the stdlib json module otherwise.
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+from helpers.depth_frame import DepthFrame, depth_frame_from_snapshot  # noqa: F401 (re-exported)
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover - depends on the environment
+    try:
+        import msgspec
+        _loads = msgspec.json.decode
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        _loads = json.loads
+        JSON_BACKEND = "json"
+
+
+def _opt_int(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+class FillFrame:
+    """A private fill/match/trade event; ``amount`` is the signed filled size in X18.
+
+    ``remaining`` is the order's unsigned unfilled size in X18 (None when the event omits it).
+    """
+    __slots__ = ('product_id', 'amount', 'price_x18', 'order_id', 'timestamp', 'remaining')
+
+    def __init__(self, product_id: int, amount, price_x18: int, order_id: str = 'unknown',
+                 timestamp: Optional[int] = None, remaining: Optional[int] = None):
+        self.product_id = product_id
+        self.amount = amount
+        self.price_x18 = price_x18
+        self.order_id = order_id
+        self.timestamp = timestamp
+        self.remaining = remaining
+
+
+class OrderUpdateFrame:
+    """Order/position/account lifecycle event; ``raw`` keeps the payload for handlers."""
+    __slots__ = ('kind', 'product_id', 'digest', 'reason', 'raw')
+
+    def __init__(self, kind: str, product_id: Optional[int], digest: Optional[str],
+                 reason: Optional[str], raw: Dict[str, Any]):
+        self.kind = kind
+        self.product_id = product_id
+        self.digest = digest
+        self.reason = reason
+        self.raw = raw
+
+
+class PingFrame:
+    __slots__ = ('time',)
+
+    def __init__(self, time):
+        self.time = time
+
+
+class ErrorFrame:
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+
+
+class OtherFrame:
+    """Anything we do not route (subscription acks, unknown events)."""
+    __slots__ = ('kind', 'raw')
+
+    def __init__(self, kind: str, raw: Dict[str, Any]):
+        self.kind = kind
+        self.raw = raw
+
+
+def _body(msg: Dict[str, Any]) -> Dict[str, Any]:
+    body = msg.get('data')
+    return body if isinstance(body, dict) else msg
+
+
+def _channel_product_id(msg: Dict[str, Any]) -> Optional[int]:
+    """'depth.4' -> 4 (None if the channel carries no numeric suffix)."""
+    suffix = (msg.get('channel') or '').rpartition('.')[2]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def _depth(msg: Dict[str, Any], kind: str) -> DepthFrame:
+    body = _body(msg)
+    pid = body.get('product_id')
+    return DepthFrame(
+        product_id=int(pid) if pid is not None else _channel_product_id(msg),
+        bids=body.get('bids') or [],
+        asks=body.get('asks') or [],
+        last_max_ts=_opt_int(body.get('last_max_timestamp')),
+        max_ts=_opt_int(body.get('max_timestamp')),
+        seq=_opt_int(body.get('seq', body.get('sequence'))),
+        is_snapshot=kind == 'snapshot',
+    )
+
+
+def _fill(msg: Dict[str, Any], kind: str) -> FillFrame:
+    body = _body(msg)
+    amount = body.get('amount')
+    if amount is None:
+        # Gateway fill events carry an unsigned filled_qty plus is_bid
+        amount = int(body.get('filled_qty', 0))
+        if body.get('is_bid') is False:
+            amount = -amount
+    return FillFrame(
+        product_id=int(body.get('product_id', 0)),
+        amount=int(amount),
+        price_x18=int(body.get('price', 0)),
+        order_id=body.get('order_id', body.get('order_digest', 'unknown')),
+        timestamp=_opt_int(body.get('timestamp')),
+        remaining=_opt_int(body.get('remaining_qty')),
+    )
+
+
+def _order_update(msg: Dict[str, Any], kind: str) -> OrderUpdateFrame:
+    body = _body(msg)
+    pid = body.get('product_id')
+    return OrderUpdateFrame(kind, int(pid) if pid is not None else None,
+                            body.get('digest'), body.get('reason'), body)
+
+
+def _ping(msg: Dict[str, Any], kind: str) -> PingFrame:
+    return PingFrame(msg.get('time'))
+
+
+def _error(msg: Dict[str, Any], kind: str) -> ErrorFrame:
+    return ErrorFrame(msg)
+
+
+# Channel prefix ("depth.4" -> "depth") takes priority over the event type
+_CHANNEL_ROUTES = {
+    'depth': _depth,
+    'book_depth': _depth,
+    'fills': _fill,
+    'fill': _fill,
+    'orders': _order_update,
+    'order_update': _order_update,
+}
+
+# order/position/account events used to share the fill handler, which added their
+# ``amount`` (an order or position size, not a fill delta) to the position cache.
+# They now go to the order-update handler, which keeps the strike reset.
+_TYPE_ROUTES = {
+    'depth': _depth,
+    'snapshot': _depth,
+    'book_depth': _depth,
+    'fill': _fill,
+    'match': _fill,
+    'trade': _fill,
+    'order_update': _order_update,
+    'order': _order_update,
+    'position': _order_update,
+    'account': _order_update,
+    'ping': _ping,
+    'error': _error,
+}
+
+
+_CONTROL_TYPES = frozenset(('snapshot', 'ping', 'pong', 'error', 'subscribe', 'subscribed',
+                            'unsubscribe', 'unsubscribed'))
+
+
+def decode_frame(raw):
+    """Decode one raw WS frame (str or bytes) into a typed frame.
+
+    Raises ValueError on malformed JSON.
+    """
+    msg = _loads(raw)
+    if not isinstance(msg, dict):
+        return OtherFrame('unknown', {'data': msg})
+    kind = msg.get('type') or msg.get('event') or 'unknown'
+
+    # Snapshots, pings, errors and subscription acks are identified by type even on a data channel
+    if kind not in _CONTROL_TYPES:
+        channel = msg.get('channel')
+        if channel:
+            route = _CHANNEL_ROUTES.get(channel.split('.', 1)[0])
+            if route is not None:
+                return route(msg, kind)
+    route = _TYPE_ROUTES.get(kind)
+    if route is not None:
+        return route(msg, kind)
+    return OtherFrame(kind, msg)
@@ -0,0 +1,208 @@
+"""
+Speculative pre-signed IOC ladder for Nado market orders.
+
+A background task keeps signed IOC buy and sell orders for one quantity at a
+grid of anchor mids around the current book mid. Each rung is priced like
+``NadoClient.place_market_order`` would price it for that mid (mid +/- slippage,
+rounded to tick). ``take()`` pops the rung for the current mid, so a market
+order becomes a single POST with no price query or signing in front of it.
+
+Rungs take nonces from their own NonceAllocator lane (so they never collide
+with regular orders) and are dropped when they expire, drift outside the ladder,
+or the mid jumps by more than ``max_move_bps`` between refreshes.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from helpers.x18 import X18, X18_ONE, decimal_to_x18, quantize_x18
+
+# NonceAllocator lane reserved for rungs (low nonce bits [2^19, 2^20)); regular orders use lane 0
+LADDER_NONCE_LANE = 1
+LADDER_NONCE_LEAD_MS = 10_000
+
+IOC_ORDER_TYPE = 1
+
+
+@dataclass
+class PresignedOrder:
+    """One ladder rung: a signed single-order place_orders payload and its digest."""
+    direction: str
+    anchor_x18: int
+    price_x18: int
+    order_msg: Dict[str, Any]
+    digest: str
+    payload: Dict[str, Any]
+    expires_at: float
+
+
+class PresignedLadder:
+    """Pre-signed IOC orders at ``levels`` anchors either side of the mid, per direction.
+
+    ``ttl`` must stay below ``LADDER_NONCE_LEAD_MS`` (10s), past which the gateway
+    rejects the order anyway.
+    """
+
+    def __init__(self, client, quantity: Decimal, levels: int = 3, step_bps: int = 10,
+                 slippage: Decimal = Decimal("0.05"), ttl: float = 5.0, max_move_bps: int = 50,
+                 refresh_interval: float = 0.2, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.quantity = Decimal(quantity)
+        self.levels = levels
+        self.step_bps = step_bps
+        self.slippage_x18 = decimal_to_x18(slippage)
+        self.ttl = ttl
+        self.max_move_bps = max_move_bps
+        self.refresh_interval = refresh_interval
+        self._now = clock
+
+        self._rungs: Dict[Tuple[str, int], PresignedOrder] = {}
+        self._step_x18: Optional[int] = None
+        self._mid_x18: Optional[int] = None
+        self._generation = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"signed": 0, "hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._rungs)
+
+    # ---------------------------
+    # Grid
+    # ---------------------------
+
+    def _tick_x18(self) -> int:
+        return decimal_to_x18(getattr(self.client.config, 'tick_size', Decimal("0.1")))
+
+    def _anchor(self, mid_x18: int) -> int:
+        return quantize_x18(mid_x18, self._step_x18)
+
+    def _rung_price(self, direction: str, anchor_x18: int) -> int:
+        factor = X18_ONE + self.slippage_x18 if direction == 'buy' else X18_ONE - self.slippage_x18
+        return quantize_x18(anchor_x18 * factor // X18_ONE, self._tick_x18())
+
+    def _moved_too_far(self, mid_x18: int) -> bool:
+        return (self._mid_x18 is not None
+                and abs(mid_x18 - self._mid_x18) * 10_000 > self.max_move_bps * self._mid_x18)
+
+    def invalidate(self) -> None:
+        """Drop every rung (and any batch still being signed)."""
+        if self._rungs:
+            self.stats["invalidations"] += 1
+        self._rungs.clear()
+        self._step_x18 = None
+        self._mid_x18 = None
+        self._generation += 1
+
+    # ---------------------------
+    # Refresh
+    # ---------------------------
+
+    async def refresh(self, mid: Decimal) -> None:
+        """Re-centre the ladder on ``mid``: evict stale rungs, sign the missing ones."""
+        mid_x18 = decimal_to_x18(mid)
+        if mid_x18 <= 0:
+            return
+        if self._moved_too_far(mid_x18):
+            self.invalidate()
+        if self._step_x18 is None:
+            tick = self._tick_x18()
+            self._step_x18 = max(tick, quantize_x18(mid_x18 * self.step_bps // 10_000, tick))
+        self._mid_x18 = mid_x18
+
+        now = self._now()
+        centre = self._anchor(mid_x18)
+        reach = self.levels * self._step_x18
+        for key, rung in list(self._rungs.items()):
+            if rung.expires_at <= now:
+                del self._rungs[key]
+                self.stats["expired"] += 1
+            elif abs(rung.anchor_x18 - centre) > reach:
+                del self._rungs[key]
+                self.stats["evicted"] += 1
+
+        wanted = [(direction, centre + k * self._step_x18)
+                  for k in range(-self.levels, self.levels + 1) for direction in ('buy', 'sell')]
+        missing = [key for key in wanted if key not in self._rungs]
+        if not missing:
+            return
+
+        generation = self._generation
+        client = self.client
+        future_ms = int((now + 3600) * 1000)
+        nonces = client.nonces.allocate(len(missing), lead_ms=LADDER_NONCE_LEAD_MS, lane=LADDER_NONCE_LANE)
+        entries = []
+        for nonce, (direction, anchor) in zip(nonces, missing):
+            price_x18 = self._rung_price(direction, anchor)
+            entries.append(client._order_entry(self.quantity, direction, X18(price_x18), nonce,
+                                               future_ms, IOC_ORDER_TYPE))
+        digests = [client.signer.order_digest(msg, int(client.product_id)) for msg, _ in entries]
+        signatures = await client.signing_pool.sign_digests(digests)
+        if generation != self._generation:
+            return  # invalidated while signing
+
+        expires_at = now + self.ttl
+        for (direction, anchor), (msg, entry), digest, signature in zip(missing, entries, digests, signatures):
+            entry["signature"] = signature
+            self._rungs[(direction, anchor)] = PresignedOrder(
+                direction, anchor, msg["priceX18"], msg, "0x" + digest.hex(),
+                {"place_orders": {"orders": [entry]}}, expires_at)
+        self.stats["signed"] += len(missing)
+
+    # ---------------------------
+    # Use
+    # ---------------------------
+
+    def take(self, direction: str, quantity: Decimal, mid: Optional[Decimal]) -> Optional[PresignedOrder]:
+        """Pop the signed rung for ``mid``, or None on a miss."""
+        rung = None
+        if mid and self._step_x18 is not None and Decimal(quantity) == self.quantity:
+            mid_x18 = decimal_to_x18(mid)
+            if self._moved_too_far(mid_x18):
+                self.invalidate()
+            else:
+                rung = self._rungs.pop((direction, self._anchor(mid_x18)), None)
+                if rung is not None and rung.expires_at <= self._now():
+                    self.stats["expired"] += 1
+                    rung = None
+        if rung is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return rung
+
+    # ---------------------------
+    # Background task
+    # ---------------------------
+
+    def start(self, mid_source: Callable[[], Awaitable[Optional[Decimal]]]) -> None:
+        """Keep the ladder centred on ``mid_source()`` (None/0 while the book is unusable)."""
+        self.mid_source = mid_source
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                mid = await self.mid_source()
+                if mid and mid > 0:
+                    await self.refresh(mid)
+                else:
+                    self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.client.logger.log(f"Presign ladder refresh failed: {e}", "WARNING")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.invalidate()
@@ -0,0 +1,169 @@
+"""
+In-memory oracle price cache for Nado products.
+
+Prices are kept per product_id as raw X18 ints with the time they were
+observed. Once ``start()`` has armed it, a background task refreshes every
+product from one ``all_products`` query (NADO_PRICE_REFRESH_MS), beginning
+with the first ``price()`` call, so a maker that always sends explicit prices
+never polls. Any other response that carries ``oracle_price_x18`` (e.g.
+subaccount_info snapshots) feeds the cache too.
+``price()`` answers from memory while the entry is younger than the caller's
+``max_age_ms`` (NADO_PRICE_MAX_AGE_MS by default) and only otherwise waits for
+a refresh, which concurrent callers share.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from helpers.x18 import parse_x18
+
+DEFAULT_REFRESH_MS = 1000.0
+DEFAULT_MAX_AGE_MS = 3000.0
+
+
+class OraclePriceCache:
+    """product_id -> (oracle price X18, observed at) for one client (anything with ``_post``)."""
+
+    def __init__(self, client, refresh_ms: Optional[float] = None, max_age_ms: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.refresh_ms = (refresh_ms if refresh_ms is not None
+                           else float(os.getenv("NADO_PRICE_REFRESH_MS", DEFAULT_REFRESH_MS)))
+        self.max_age_ms = (max_age_ms if max_age_ms is not None
+                           else float(os.getenv("NADO_PRICE_MAX_AGE_MS", DEFAULT_MAX_AGE_MS)))
+        self._clock = clock
+        self._prices: Dict[int, Tuple[int, float]] = {}
+        self._inflight: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._armed = False
+        self._refreshed_from = float("-inf")  # request time of the last successful refresh
+        self.refreshes = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    # ---------------------------
+    # Feeding
+    # ---------------------------
+
+    def update(self, product_id: int, price_x18: int, at: Optional[float] = None) -> None:
+        """Record one price observed at ``at`` (service clock, default now); older observations are ignored."""
+        at = self._clock() if at is None else at
+        current = self._prices.get(product_id)
+        if current is None or at >= current[1]:
+            self._prices[product_id] = (price_x18, at)
+
+    def update_many(self, prices: Dict[int, int], at: Optional[float] = None) -> None:
+        at = self._clock() if at is None else at
+        for product_id, price_x18 in prices.items():
+            self.update(product_id, price_x18, at)
+
+    def update_from(self, data: Dict[str, Any], at: Optional[float] = None) -> int:
+        """Feed the oracle prices of an all_products / subaccount_info ``data`` body; returns how many."""
+        at = self._clock() if at is None else at
+        count = 0
+        for key in ('spot_products', 'perp_products'):
+            for p in data.get(key, []):
+                px18 = p.get('oracle_price_x18')
+                if px18:
+                    self.update(int(p['product_id']), parse_x18(px18), at)
+                    count += 1
+        return count
+
+    # ---------------------------
+    # Reading
+    # ---------------------------
+
+    def get(self, product_id: int, max_age_ms: Optional[float] = None) -> Optional[int]:
+        """The cached price if it is younger than ``max_age_ms``, else None (never queries)."""
+        entry = self._prices.get(int(product_id))
+        if entry is None:
+            return None
+        max_age = self.max_age_ms if max_age_ms is None else max_age_ms
+        if (self._clock() - entry[1]) * 1000 > max_age:
+            return None
+        return entry[0]
+
+    def age_ms(self, product_id: int) -> Optional[float]:
+        entry = self._prices.get(int(product_id))
+        return (self._clock() - entry[1]) * 1000 if entry else None
+
+    async def price(self, product_id: int, max_age_ms: Optional[float] = None) -> int:
+        """
+        Oracle price X18 no older than ``max_age_ms``, refreshing from all_products if needed.
+
+        Raises:
+            ValueError: the refresh did not carry the product (the gateway does not list it)
+        """
+        product_id = int(product_id)
+        self._ensure_running()
+        px18 = self.get(product_id, max_age_ms)
+        if px18 is not None:
+            self.hits += 1
+            return px18
+        self.misses += 1
+        await self.refresh()
+        # The refresh may not have carried this product: don't fall back to the stale entry
+        entry = self._prices.get(product_id)
+        if entry is None or entry[1] < self._refreshed_from:
+            raise ValueError(f"Product {product_id} not found in all_products")
+        return entry[0]
+
+    async def refresh(self) -> int:
+        """Query all_products once (joining a refresh already in flight); returns how many prices it carried."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch(self._clock()))
+        # shield: one caller being cancelled must not cancel the query the others wait on
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self, started: float) -> int:
+        self.refreshes += 1
+        try:
+            res = await self.client._post("/query", {"type": "all_products"})
+            count = self.update_from(res.get('data', {}), started)
+            self._refreshed_from = started
+            return count
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight = None
+
+    # ---------------------------
+    # Background refresh
+    # ---------------------------
+
+    def start(self) -> None:
+        """Refresh every NADO_PRICE_REFRESH_MS in the background (0 disables it) from the first price() on."""
+        self._armed = True
+
+    def _ensure_running(self) -> None:
+        if self._armed and self.refresh_ms > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.client.logger.log(f"Oracle price refresh failed: {e}", "WARNING")
+            await asyncio.sleep(self.refresh_ms / 1000)
+
+    async def stop(self) -> None:
+        self._armed = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"products": len(self._prices), "refreshes": self.refreshes, "hits": self.hits,
+                "misses": self.misses, "errors": self.errors, "armed": self._armed,
+                "running": self._task is not None}
@@ -0,0 +1,352 @@
+"""
+Precomputed EIP-712 signer for Nado orders and cancellations.
+
+Everything that does not depend on the order is computed once: the key,
+the EIP712Domain / Order / Cancellation type hashes, one domain separator
+per verifying contract, and a fixed-base table for secp256k1's generator.
+Per order only the struct hash, the RFC 6979 nonce and one table-driven
+scalar multiplication remain. Signatures are byte-identical to
+``eth_account.Account.sign_typed_data`` (r || s || v+27, low-s).
+
+``SigningPool`` moves the scalar multiplications off the asyncio loop onto
+a thread or process pool so depth frames keep draining while a batch signs.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from eth_hash.auto import keccak
+from eth_keys import keys
+
+# secp256k1
+_P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+_GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+
+_WINDOW = 8
+_WINDOW_MASK = (1 << _WINDOW) - 1
+
+DOMAIN_NAME = "Nado"
+DOMAIN_VERSION = "0.0.1"
+
+_DOMAIN_TYPEHASH = keccak(b"EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+ORDER_TYPEHASH = keccak(b"Order(bytes32 sender,int128 priceX18,int128 amount,uint64 expiration,"
+                        b"uint64 nonce,uint128 appendix)")
+CANCELLATION_TYPEHASH = keccak(b"Cancellation(bytes32 sender,uint32[] productIds,bytes32[] digests,uint64 nonce)")
+
+_NAME_HASH = keccak(DOMAIN_NAME.encode())
+_VERSION_HASH = keccak(DOMAIN_VERSION.encode())
+
+_UINT256 = 1 << 256
+
+
+def _word(value: int) -> bytes:
+    """ABI-encode an int as one 32-byte word (two's complement for negatives)."""
+    return (value % _UINT256).to_bytes(32, 'big')
+
+
+def _bytes32(value: Union[str, bytes]) -> bytes:
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(value) != 32:
+        raise ValueError(f"expected 32 bytes, got {len(value)}")
+    return value
+
+
+def _address_bytes(value: Union[str, int, bytes]) -> bytes:
+    if isinstance(value, int):
+        return value.to_bytes(20, 'big')
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if len(value) != 20:
+        raise ValueError(f"expected a 20-byte address, got {len(value)} bytes")
+    return value
+
+
+# ---------------------------
+# Fixed-base scalar multiplication
+# ---------------------------
+
+_G_TABLE: Optional[List[List[Tuple[int, int]]]] = None
+
+
+def _jacobian_double(x1, y1, z1):
+    if not y1:
+        return 0, 0, 0
+    ysq = y1 * y1 % _P
+    s = 4 * x1 * ysq % _P
+    m = 3 * x1 * x1 % _P
+    x3 = (m * m - 2 * s) % _P
+    return x3, (m * (s - x3) - 8 * ysq * ysq) % _P, 2 * y1 * z1 % _P
+
+
+def _add_affine(acc, x2, y2):
+    """Jacobian + affine point addition (acc may be the identity, z == 0)."""
+    x1, y1, z1 = acc
+    if not z1:
+        return x2, y2, 1
+    z1z1 = z1 * z1 % _P
+    u2 = x2 * z1z1 % _P
+    s2 = y2 * z1 * z1z1 % _P
+    h = (u2 - x1) % _P
+    r = (s2 - y1) % _P
+    if not h:
+        return _jacobian_double(x1, y1, z1) if not r else (0, 0, 0)
+    hh = h * h % _P
+    hhh = h * hh % _P
+    v = x1 * hh % _P
+    x3 = (r * r - hhh - 2 * v) % _P
+    return x3, (r * (v - x3) - y1 * hhh) % _P, z1 * h % _P
+
+
+def _to_affine(point):
+    x, y, z = point
+    zinv = pow(z, -1, _P)
+    zinv2 = zinv * zinv % _P
+    return x * zinv2 % _P, y * zinv2 * zinv % _P
+
+
+def _batch_to_affine(points):
+    """Normalize many Jacobian points with a single field inversion (Montgomery's trick)."""
+    prefix = [1]
+    for _, _, z in points:
+        prefix.append(prefix[-1] * z % _P)
+    inv = pow(prefix[-1], -1, _P)
+    out = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        zinv = inv * prefix[i] % _P
+        inv = inv * z % _P
+        zinv2 = zinv * zinv % _P
+        out[i] = (x * zinv2 % _P, y * zinv2 * zinv % _P)
+    return out
+
+
+def _g_table() -> List[List[Tuple[int, int]]]:
+    """table[i][j - 1] = j * 2^(8i) * G in affine coordinates (built once, ~8k points)."""
+    global _G_TABLE
+    if _G_TABLE is None:
+        table = []
+        base = (_GX, _GY)
+        for _ in range(256 // _WINDOW):
+            row = [(base[0], base[1], 1)]
+            for _ in range(_WINDOW_MASK - 1):
+                row.append(_add_affine(row[-1], *base))
+            nxt = row[_WINDOW_MASK // 2]  # 128 * base
+            row = _batch_to_affine(row)
+            table.append(row)
+            base = _to_affine(_jacobian_double(*nxt))
+        _G_TABLE = table
+    return _G_TABLE
+
+
+def _mul_g(k: int) -> Tuple[int, int]:
+    """k * G with one mixed addition per non-zero 8-bit window and a single inversion."""
+    table = _g_table()
+    acc = (0, 0, 0)
+    i = 0
+    while k:
+        digit = k & _WINDOW_MASK
+        if digit:
+            acc = _add_affine(acc, *table[i][digit - 1])
+        k >>= _WINDOW
+        i += 1
+    return _to_affine(acc)
+
+
+def _rfc6979_k(msg_hash: bytes, key_bytes: bytes) -> int:
+    """Deterministic nonce, same derivation as eth_keys' native backend (first candidate)."""
+    v = b"\x01" * 32
+    k = hmac.new(b"\x00" * 32, v + b"\x00" + key_bytes + msg_hash, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b"\x01" + key_bytes + msg_hash, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    return int.from_bytes(hmac.new(k, v, hashlib.sha256).digest(), 'big')
+
+
+@lru_cache(maxsize=256)
+def _domain_separator(chain_id: int, addr: bytes) -> bytes:
+    return keccak(_DOMAIN_TYPEHASH + _NAME_HASH + _VERSION_HASH + _word(chain_id) + addr.rjust(32, b"\x00"))
+
+
+def domain_separator(chain_id: int, verifying_contract: Union[str, int, bytes]) -> bytes:
+    """Cached hashStruct(EIP712Domain) for a chain and verifying contract (address or product id)."""
+    return _domain_separator(int(chain_id), _address_bytes(verifying_contract))
+
+
+def order_digest(order: Dict, chain_id: int, verifying_contract: Union[str, int, bytes]) -> bytes:
+    """EIP-712 digest of an Order. Accepts the signing message or the string /execute payload.
+
+    This is the order's id on Nado, so it is known before the gateway answers.
+    """
+    struct_hash = keccak(ORDER_TYPEHASH + _bytes32(order["sender"])
+                         + _word(int(order["priceX18"])) + _word(int(order["amount"]))
+                         + _word(int(order["expiration"])) + _word(int(order["nonce"]))
+                         + _word(int(order.get("appendix", 0))))
+    return keccak(b"\x19\x01" + domain_separator(chain_id, verifying_contract) + struct_hash)
+
+
+def cancellation_digest(cancellation: Dict, chain_id: int, verifying_contract: Union[str, int, bytes]) -> bytes:
+    product_ids = b"".join(_word(int(p)) for p in cancellation["productIds"])
+    digests = b"".join(_bytes32(d) for d in cancellation["digests"])
+    struct_hash = keccak(CANCELLATION_TYPEHASH + _bytes32(cancellation["sender"])
+                         + keccak(product_ids) + keccak(digests) + _word(int(cancellation["nonce"])))
+    return keccak(b"\x19\x01" + domain_separator(chain_id, verifying_contract) + struct_hash)
+
+
+class NadoSigner:
+    """Signs Nado EIP-712 messages for one key and chain."""
+
+    def __init__(self, private_key: Union[str, bytes], chain_id: int):
+        if isinstance(private_key, str):
+            private_key = bytes.fromhex(private_key[2:] if private_key.startswith("0x") else private_key)
+        self._key = keys.PrivateKey(private_key)
+        self._key_bytes = self._key.to_bytes()
+        self._d = int.from_bytes(self._key_bytes, 'big')
+        self.address = self._key.public_key.to_checksum_address()
+        self.chain_id = int(chain_id)
+        _g_table()
+
+    def domain_separator(self, verifying_contract: Union[str, int, bytes]) -> bytes:
+        return domain_separator(self.chain_id, verifying_contract)
+
+    # ---------------------------
+    # Digests
+    # ---------------------------
+
+    def order_digest(self, order: Dict, verifying_contract: Union[str, int, bytes]) -> bytes:
+        """EIP-712 digest of an Order (fields as passed to NadoClient._sign_order)."""
+        return order_digest(order, self.chain_id, verifying_contract)
+
+    def cancellation_digest(self, cancellation: Dict, verifying_contract: Union[str, int, bytes]) -> bytes:
+        return cancellation_digest(cancellation, self.chain_id, verifying_contract)
+
+    # ---------------------------
+    # Signing
+    # ---------------------------
+
+    def sign_digest(self, digest: bytes) -> bytes:
+        """65-byte r || s || v signature (v = 27/28, low-s) over a 32-byte digest."""
+        z = int.from_bytes(digest, 'big')
+        k = _rfc6979_k((z % _N).to_bytes(32, 'big'), self._key_bytes)
+        x, y = _mul_g(k)
+        r = x % _N
+        s = pow(k, -1, _N) * (z + r * self._d) % _N
+        high = s * 2 >= _N
+        v = (y & 1) ^ high
+        if high:
+            s = _N - s
+        return r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + bytes((v + 27,))
+
+    def sign_order(self, order: Dict, verifying_contract: Union[str, int, bytes]) -> str:
+        return "0x" + self.sign_digest(self.order_digest(order, verifying_contract)).hex()
+
+    def sign_cancellation(self, cancellation: Dict, verifying_contract: Union[str, int, bytes]) -> str:
+        return "0x" + self.sign_digest(self.cancellation_digest(cancellation, verifying_contract)).hex()
+
+
+# ---------------------------
+# Off-loop signing pool
+# ---------------------------
+
+SIGNER_MODES = ("inline", "thread", "process")
+# Fewest digests worth a process round trip: smaller batches (a 2-order quote) stay in one chunk
+MIN_CHUNK = 4
+
+_WORKER_SIGNER: Optional[NadoSigner] = None
+
+
+def _init_worker(key_bytes: bytes, chain_id: int) -> None:
+    """Process-pool initializer: one signer (and fixed-base table) per worker."""
+    global _WORKER_SIGNER
+    _WORKER_SIGNER = NadoSigner(key_bytes, chain_id)
+
+
+def _sign_chunk_in_worker(digests: Sequence[bytes]) -> List[bytes]:
+    return [_WORKER_SIGNER.sign_digest(d) for d in digests]
+
+
+def _chunks(items: Sequence, parts: int) -> List[Sequence]:
+    size = -(-len(items) // parts)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class SigningPool:
+    """Signs EIP-712 digests on a thread or process pool instead of the event loop.
+
+    Modes (``NADO_SIGNER_MODE``):
+      - ``inline``:  sign on the caller, no executor (default)
+      - ``thread``:  ThreadPoolExecutor; the signer is pure-Python big-int code that holds the
+                     GIL, so this only lets the loop run between switch intervals and never
+                     signs faster than inline. Each batch goes to the pool as one chunk
+      - ``process``: ProcessPoolExecutor; each worker holds its own NadoSigner, so batch
+                     throughput scales with cores. This is the scaling path; it forks workers
+                     that hold the key, so the owner must call ``shutdown()``
+
+    ``NADO_SIGNER_WORKERS`` sets the pool size (default ``min(4, cpu_count)``). In process mode
+    a batch is split into at most one chunk per worker and at least ``MIN_CHUNK`` digests per
+    chunk, so a 2-order quote is one round trip.
+    """
+
+    def __init__(self, signer: NadoSigner, mode: Optional[str] = None, workers: Optional[int] = None):
+        cpus = os.cpu_count() or 1
+        mode = (mode or os.getenv('NADO_SIGNER_MODE') or 'inline').lower()
+        if mode not in SIGNER_MODES:
+            raise ValueError(f"NADO_SIGNER_MODE must be one of {SIGNER_MODES}, got {mode!r}")
+        self.signer = signer
+        self.mode = mode
+        self.workers = max(1, int(workers or os.getenv('NADO_SIGNER_WORKERS') or min(4, cpus)))
+        self._executor: Optional[Executor] = None
+
+    def _ensure_executor(self) -> Optional[Executor]:
+        if self._executor is None and self.mode != 'inline':
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker,
+                    initargs=(self.signer._key_bytes, self.signer.chain_id))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nado-signer")
+        return self._executor
+
+    async def start(self) -> None:
+        """Spawn and warm every worker up front so the first order doesn't pay for it."""
+        executor = self._ensure_executor()
+        if executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        if self.mode == 'process':
+            warm = [loop.run_in_executor(executor, _sign_chunk_in_worker, [b"\x01" * 32])
+                    for _ in range(self.workers)]
+        else:
+            warm = [loop.run_in_executor(executor, self.signer.sign_digest, b"\x01" * 32)]
+        await asyncio.gather(*warm)
+
+    async def sign_digests(self, digests: Sequence[bytes]) -> List[str]:
+        """0x-prefixed signatures for ``digests``, in order."""
+        if not digests:
+            return []
+        executor = self._ensure_executor()
+        if executor is None:
+            return ["0x" + self.signer.sign_digest(d).hex() for d in digests]
+        loop = asyncio.get_running_loop()
+        if self.mode == 'process':
+            func = _sign_chunk_in_worker
+            count = min(self.workers, -(-len(digests) // MIN_CHUNK))
+        else:
+            # Threads share the GIL: splitting would only add hand-offs
+            func = lambda chunk: [self.signer.sign_digest(d) for d in chunk]
+            count = 1
+        parts = await asyncio.gather(*(loop.run_in_executor(executor, func, chunk)
+                                       for chunk in _chunks(list(digests), count)))
+        return ["0x" + sig.hex() for part in parts for sig in part]
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
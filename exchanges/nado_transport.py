@@ -0,0 +1,141 @@
+"""
+Shared keep-alive HTTP transport for NadoClient REST calls.
+
+One ``aiohttp.ClientSession`` per client, created lazily on the running loop,
+on a tuned ``TCPConnector`` (keep-alive, DNS cache, per-host limits), so an
+order is a single request on an already open socket instead of a fresh TCP +
+TLS handshake. ``warm()`` opens the sockets ahead of the first order and
+``stats()`` reports per-host request / connection counters from aiohttp's
+tracing hooks.
+
+Pool settings can be overridden with NADO_HTTP_LIMIT, NADO_HTTP_LIMIT_PER_HOST,
+NADO_HTTP_KEEPALIVE and NADO_HTTP_WARM (sockets opened per host by ``warm()``).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+
+DEFAULT_LIMIT = 64
+DEFAULT_LIMIT_PER_HOST = 16
+DEFAULT_KEEPALIVE = 60.0
+DEFAULT_DNS_TTL = 300
+DEFAULT_WARM_CONNECTIONS = 2
+DEFAULT_TIMEOUT = 30.0
+
+
+class HttpTransport:
+    """Lazily created, pre-warmable aiohttp session owned by one client."""
+
+    def __init__(self, limit: Optional[int] = None, limit_per_host: Optional[int] = None,
+                 keepalive_timeout: Optional[float] = None, dns_ttl: int = DEFAULT_DNS_TTL,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.limit = limit if limit is not None else int(os.getenv("NADO_HTTP_LIMIT", DEFAULT_LIMIT))
+        self.limit_per_host = (limit_per_host if limit_per_host is not None
+                               else int(os.getenv("NADO_HTTP_LIMIT_PER_HOST", DEFAULT_LIMIT_PER_HOST)))
+        self.keepalive_timeout = (keepalive_timeout if keepalive_timeout is not None
+                                  else float(os.getenv("NADO_HTTP_KEEPALIVE", DEFAULT_KEEPALIVE)))
+        self.warm_connections = int(os.getenv("NADO_HTTP_WARM", DEFAULT_WARM_CONNECTIONS))
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, (re)created on first use; must be called on the running loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                  trace_configs=[self._trace_config()])
+        return self._session
+
+    async def warm(self, probe: Callable[[], Awaitable[Any]], connections: Optional[int] = None) -> int:
+        """Open ``connections`` sockets by running ``probe`` (one cheap request) that many times at once.
+
+        Returns how many probes succeeded; failures are left to the caller's first real request.
+        """
+        count = self.warm_connections if connections is None else connections
+        if count <= 0:
+            return 0
+        results = await asyncio.gather(*(probe() for _ in range(count)), return_exceptions=True)
+        return sum(1 for r in results if not isinstance(r, BaseException))
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    # ---------------------------
+    # Stats
+    # ---------------------------
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {"requests": 0, "errors": 0, "connections_created": 0,
+                                         "connections_reused": 0, "in_flight": 0,
+                                         "last_ms": 0.0, "total_ms": 0.0}
+        return entry
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host
+            ctx.started = time.perf_counter()
+            self._host(ctx.host)["in_flight"] += 1
+
+        async def on_request_end(session, ctx, params):
+            entry = self._host(ctx.host)
+            elapsed = (time.perf_counter() - ctx.started) * 1000
+            entry["in_flight"] -= 1
+            entry["requests"] += 1
+            entry["last_ms"] = elapsed
+            entry["total_ms"] += elapsed
+
+        async def on_request_exception(session, ctx, params):
+            entry = self._host(ctx.host)
+            entry["in_flight"] -= 1
+            entry["errors"] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self._host(ctx.host)["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._host(ctx.host)["connections_reused"] += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host counters plus the sockets currently idle in the pool."""
+        idle: Dict[str, int] = {}
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        for key, conns in (getattr(connector, "_conns", None) or {}).items():
+            idle[key.host] = idle.get(key.host, 0) + len(conns)
+        out = {}
+        for host, entry in self._hosts.items():
+            row = dict(entry)
+            row["avg_ms"] = round(entry["total_ms"] / entry["requests"], 3) if entry["requests"] else 0.0
+            row["last_ms"] = round(entry["last_ms"], 3)
+            del row["total_ms"]
+            row["idle_connections"] = idle.get(host, 0)
+            out[host] = row
+        return out
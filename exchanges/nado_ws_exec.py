@@ -0,0 +1,180 @@
+"""
+Order execution over the gateway WebSocket.
+
+``WsExecutionChannel`` keeps one socket to the gateway open (on the client's
+shared HttpTransport session) and sends execute payloads (place_orders,
+cancel_orders, ...) over it with an ``id`` field; the gateway echoes the id in
+its response, which resolves the matching pending request. Responses have the
+same ``{"status", "data", "error"}`` shape as POST /execute, so callers build
+the same OrderResult either way.
+
+While the socket is down (not yet connected, reconnecting, or disabled with
+NADO_WS_EXECUTE=0) executes go over REST instead. A request whose socket drops
+before its ack is only retried over REST when it is a cancel: a placement may
+already have reached the gateway, and resending it is left to the caller.
+Acks that take longer than NADO_WS_EXECUTE_TIMEOUT seconds raise TimeoutError.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+DEFAULT_TIMEOUT = 5.0
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+CONNECT_TIMEOUT = 5.0
+
+WS_HEADERS = {
+    "Origin": "https://app.nado.xyz",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+}
+
+
+class WsExecutionChannel:
+    """Persistent execute socket with request-id correlation and REST fallback."""
+
+    def __init__(self, client, url: Optional[str] = None, timeout: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        self.client = client
+        self.url = url
+        self.timeout = timeout if timeout is not None else float(os.getenv("NADO_WS_EXECUTE_TIMEOUT", DEFAULT_TIMEOUT))
+        self.enabled = (enabled if enabled is not None
+                        else os.getenv("NADO_WS_EXECUTE", "1").lower() not in ("0", "false", "no"))
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self.sent = 0
+        self.acked = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.last_ms = 0.0
+        self.total_ms = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    async def start(self, wait: float = CONNECT_TIMEOUT) -> bool:
+        """Open the socket (keeps reconnecting in the background); returns whether it is up after ``wait`` s."""
+        if not self.enabled:
+            return False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+        return self.connected
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._ws is not None:
+            await self._ws.close()
+            self._ws = None
+        self._fail_pending()
+
+    async def _run(self) -> None:
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                self._ws = await self.client.http.session.ws_connect(
+                    self.url or self.client.ws_url, headers=WS_HEADERS, heartbeat=20)
+                self._connected.set()
+                self.client.logger.log(f"WS execution channel connected: {self.url or self.client.ws_url}", "INFO")
+                delay = RECONNECT_DELAY
+                await self._read(self._ws)
+                self.client.logger.log("WS execution channel closed, executes fall back to REST", "WARNING")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.client.logger.log(f"WS execution channel error: {e}", "WARNING")
+            finally:
+                self._connected.clear()
+                self._fail_pending()
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            try:
+                body = json.loads(msg.data)
+            except ValueError:
+                continue
+            future = self._pending.pop(body.get("id"), None) if isinstance(body, dict) else None
+            if future is not None and not future.done():
+                future.set_result(body)
+
+    def _fail_pending(self) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("WS execution channel closed before the ack"))
+
+    # ---------------------------
+    # Executes
+    # ---------------------------
+
+    async def execute(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one execute payload; the gateway's JSON response, from the socket or from REST."""
+        if not self.connected:
+            return await self._rest(payload)
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        sent_at = time.perf_counter()
+        text = json.dumps({**payload, "id": request_id}, separators=(',', ':'))
+        if self.client.logger.enabled_for("DEBUG"):
+            self.client.logger.log("FORENSIC_PAYLOAD (ws): %s", "DEBUG", text, category="payload")
+        try:
+            await self._ws.send_str(text)
+        except Exception:
+            self._pending.pop(request_id, None)
+            return await self._rest(payload)
+        self.sent += 1
+        try:
+            response = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            self.timeouts += 1
+            raise TimeoutError(f"No WS ack for execute {request_id} within {self.timeout}s")
+        except ConnectionError:
+            if next(iter(payload), "").startswith("cancel"):
+                return await self._rest(payload)
+            raise
+        elapsed = (time.perf_counter() - sent_at) * 1000
+        self.acked += 1
+        self.last_ms = elapsed
+        self.total_ms += elapsed
+        response.pop("id", None)
+        return response
+
+    async def _rest(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.fallbacks += 1
+        return await self.client._post("/execute", payload)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"connected": self.connected, "sent": self.sent, "acked": self.acked,
+                "fallbacks": self.fallbacks, "timeouts": self.timeouts, "reconnects": self.reconnects,
+                "pending": len(self._pending), "last_ms": round(self.last_ms, 3),
+                "avg_ms": round(self.total_ms / self.acked, 3) if self.acked else 0.0}
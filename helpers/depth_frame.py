@@ -0,0 +1,36 @@
+"""
+Venue-neutral depth update struct.
+
+``DepthFrame`` is what the local order book consumes: the exchange frame
+decoders (exchanges/nado_frames.py) produce it from WS frames, and
+``depth_frame_from_snapshot`` wraps a REST market_liquidity body, so the order
+book never depends on an exchange module.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def _opt_int(value) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+class DepthFrame:
+    """One depth update (or snapshot); levels are [price_x18, size_x18] wire pairs."""
+    __slots__ = ('product_id', 'bids', 'asks', 'last_max_ts', 'max_ts', 'seq', 'is_snapshot')
+
+    def __init__(self, product_id: Optional[int], bids: List, asks: List,
+                 last_max_ts: Optional[int] = None, max_ts: Optional[int] = None,
+                 seq: Optional[int] = None, is_snapshot: bool = False):
+        self.product_id = product_id
+        self.bids = bids
+        self.asks = asks
+        self.last_max_ts = last_max_ts
+        self.max_ts = max_ts
+        self.seq = seq
+        self.is_snapshot = is_snapshot
+
+
+def depth_frame_from_snapshot(snap: Dict[str, Any], product_id: Optional[int] = None) -> DepthFrame:
+    """Wrap a REST market_liquidity response body as a snapshot DepthFrame."""
+    return DepthFrame(product_id, snap.get('bids') or [], snap.get('asks') or [],
+                      max_ts=_opt_int(snap.get('timestamp')), is_snapshot=True)
@@ -0,0 +1,227 @@
+"""
+Binary market-data recorder and memory-mapped replay reader.
+
+File layout (little-endian):
+    header : 8s magic b"NADOFEED" | u16 version | 6 bytes reserved
+    record : i64 ts_ns | u8 kind | u32 length | payload (raw WS frame bytes)
+
+The recorder never blocks the caller: frames go into a bounded queue and a
+background thread writes them in batches, rotating files by size. A batch
+that fails to write (e.g. disk full) is dropped and counted in ``errors``.
+"""
+
+import asyncio
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+MAGIC = b"NADOFEED"
+VERSION = 1
+_HEADER = struct.Struct("<8sH6x")
+_RECORD = struct.Struct("<qBI")
+
+KIND_TEXT = 0
+KIND_BINARY = 1
+
+_STOP = object()
+
+
+class RecordedFrame(NamedTuple):
+    ts_ns: int
+    kind: int
+    payload: bytes
+
+    @property
+    def text(self) -> str:
+        return self.payload.decode('utf-8')
+
+
+class FeedRecorder:
+    """Append-only, rotating binary recorder fed from the WS listen loop."""
+
+    def __init__(self, directory: str, prefix: str = "nado_feed", max_bytes: int = 256 * 1024 * 1024,
+                 queue_size: int = 100_000, batch_size: int = 512):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._file_seq = 0
+        self._written = 0
+        self.current_path: Optional[str] = None
+        self.frames_written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self) -> 'FeedRecorder':
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="FeedRecorder", daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, raw: Union[str, bytes], ts_ns: Optional[int] = None) -> None:
+        """Queue one frame; drops (and counts) it if the writer has fallen behind."""
+        if ts_ns is None:
+            ts_ns = time.time_ns()
+        try:
+            self._queue.put_nowait((ts_ns, raw))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending frames and stop the writer thread."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                # Writer wedged with a full queue: don't block shutdown on it
+                pass
+            self._thread.join(timeout)
+        self._thread = None
+
+    # ---------------------------
+    # Writer thread
+    # ---------------------------
+
+    def _open_next(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        while True:
+            self._file_seq += 1
+            self.current_path = os.path.join(self.directory, f"{self.prefix}_{stamp}_{self._file_seq:04d}.bin")
+            try:
+                # Exclusive create: a restart within the same second must not append to an earlier file
+                self._file = open(self.current_path, "xb")
+                break
+            except FileExistsError:
+                continue
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._written = _HEADER.size
+
+    def _write(self, data: bytes, frames: int):
+        """Write one batch; I/O errors are counted (the batch is lost) so the writer keeps draining."""
+        try:
+            if self._file is None or (self._written + len(data) > self.max_bytes and self._written > _HEADER.size):
+                self._open_next()
+            self._file.write(data)
+            self._file.flush()
+            self._written += len(data)
+            self.frames_written += frames
+        except OSError:
+            self.errors += 1
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            batch = []
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            chunks = []
+            for ts_ns, raw in batch:
+                if isinstance(raw, str):
+                    payload, kind = raw.encode('utf-8'), KIND_TEXT
+                else:
+                    payload, kind = bytes(raw), KIND_BINARY
+                chunks.append(_RECORD.pack(ts_ns, kind, len(payload)))
+                chunks.append(payload)
+            if chunks:
+                self._write(b"".join(chunks), len(batch))
+        if self._file:
+            try:
+                self._file.close()
+            except OSError:
+                self.errors += 1
+            self._file = None
+
+
+class FeedReader:
+    """Memory-mapped reader for one recorded file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, "rb")
+        size = os.fstat(self._fh.fileno()).st_size
+        if size < _HEADER.size:
+            raise ValueError(f"{path}: not a feed recording (too short)")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: bad magic {magic!r}")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported version {version}")
+
+    def __iter__(self) -> Iterator[RecordedFrame]:
+        mm = self._mm
+        end = len(mm)
+        offset = _HEADER.size
+        unpack = _RECORD.unpack_from
+        rec_size = _RECORD.size
+        while offset + rec_size <= end:
+            ts_ns, kind, length = unpack(mm, offset)
+            start = offset + rec_size
+            if start + length > end:
+                # Truncated tail from an unclean shutdown
+                break
+            yield RecordedFrame(ts_ns, kind, mm[start:start + length])
+            offset = start + length
+
+    def close(self):
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def feed_files(directory: str, prefix: str = "nado_feed") -> List[str]:
+    """Recorded files of one recorder in chronological order."""
+    names = sorted(n for n in os.listdir(directory) if n.startswith(prefix + "_") and n.endswith(".bin"))
+    return [os.path.join(directory, n) for n in names]
+
+
+def iter_frames(paths: Union[str, List[str]]) -> Iterator[RecordedFrame]:
+    """Yield frames from one file or a list of rotated files, in order."""
+    for path in [paths] if isinstance(paths, str) else paths:
+        with FeedReader(path) as reader:
+            yield from reader
+
+
+async def replay(paths: Union[str, List[str]], speed: float = 1.0):
+    """Async generator yielding frames paced at ``speed`` x original rate (0 = as fast as possible)."""
+    first_ts = None
+    started = time.monotonic()
+    for frame in iter_frames(paths):
+        if speed and speed > 0:
+            if first_ts is None:
+                first_ts = frame.ts_ns
+            due = (frame.ts_ns - first_ts) / 1e9 / speed
+            delay = due - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield frame
@@ -0,0 +1,292 @@
+"""
+Non-blocking log pipeline for the trading hot path.
+
+Callers only append (sink, render, item) to a bounded ring buffer; a single
+background thread renders the items (log records are formatted there, not at
+the call site) and writes them in batches, one write + flush per sink per
+batch, rotating files by size. When the buffer is full the oldest entries are
+overwritten and counted in ``dropped``, so a slow disk never stalls an order.
+
+High-frequency categories are sampled (keep 1 in N) through ``Sampler``.
+
+Settings: NADO_LOG_BUFFER (entries), NADO_LOG_MAX_MB and NADO_LOG_BACKUPS
+(rotation of the activity logs), NADO_LOG_SAMPLE ("payload=20,depth=20").
+"""
+
+import atexit
+import csv
+import io
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+DEFAULT_CAPACITY = 65536
+DEFAULT_BATCH_SIZE = 512
+DEFAULT_FLUSH_INTERVAL = 0.05
+DEFAULT_MAX_MB = 50
+DEFAULT_BACKUPS = 5
+# Category -> keep one entry in N
+DEFAULT_SAMPLE = {"payload": 20, "depth": 20}
+
+
+class Sampler:
+    """Deterministic 1-in-N sampling per category; unknown categories are always kept."""
+
+    def __init__(self, rates: Optional[Dict[str, int]] = None):
+        self.rates = dict(DEFAULT_SAMPLE if rates is None else rates)
+        self._seen: Dict[str, int] = {}
+        self.suppressed: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> 'Sampler':
+        rates = dict(DEFAULT_SAMPLE)
+        for part in os.getenv("NADO_LOG_SAMPLE", "").split(","):
+            name, _, every = part.partition("=")
+            if name.strip() and every.strip():
+                rates[name.strip()] = int(every)
+        return cls(rates)
+
+    def keep(self, category: Optional[str]) -> bool:
+        every = self.rates.get(category, 1) if category else 1
+        if every <= 1:
+            return True
+        seen = self._seen.get(category, 0)
+        self._seen[category] = seen + 1
+        if seen % every == 0:
+            return True
+        self.suppressed[category] = self.suppressed.get(category, 0) + 1
+        return False
+
+
+class Sink:
+    """One output owned by the writer thread: a size-rotated file, or a stream when ``stream`` is given."""
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None, mode: str = "a",
+                 max_bytes: int = 0, backups: int = 0, header: Optional[str] = None):
+        self.path = path
+        self.stream = stream
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.header = header
+        self._file = None
+        self._written = 0
+
+    def _open(self, mode: str):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, mode + "b")
+        self._written = self._file.tell() if mode == "a" else 0
+        if self.header and self._written == 0:
+            self._file.write(self.header.encode("utf-8"))
+            self._written = len(self.header)
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._open("w")
+
+    def write(self, lines: List[str]) -> None:
+        text = "".join(lines)
+        if self.stream is not None:
+            self.stream.write(text)
+            self.stream.flush()
+            return
+        if self._file is None:
+            self._open(self.mode)
+        data = text.encode("utf-8")
+        if self.max_bytes and self._written > 0 and self._written + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._written += len(data)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def csv_line(row) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(row)
+    return buf.getvalue()
+
+
+class PipelineHandler(logging.Handler):
+    """logging.Handler that only queues the record; formatting and I/O happen on the writer thread.
+
+    Records are formatted after ``emit`` returns, so arguments passed for %-formatting
+    must not be mutated by the caller afterwards.
+    """
+
+    def __init__(self, pipeline: 'LogPipeline', sink: Sink, level=logging.NOTSET):
+        super().__init__(level)
+        self.pipeline = pipeline
+        self.sink = sink
+
+    def render(self, record: logging.LogRecord) -> str:
+        return self.format(record) + "\n"
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.pipeline.submit(self.sink, self.render, record)
+
+
+class LogPipeline:
+    """Bounded ring buffer drained by one batching writer thread."""
+
+    def __init__(self, capacity: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.capacity = capacity or int(os.getenv("NADO_LOG_BUFFER", DEFAULT_CAPACITY))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = int(float(os.getenv("NADO_LOG_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        self.backups = int(os.getenv("NADO_LOG_BACKUPS", DEFAULT_BACKUPS))
+        self.sampler = Sampler.from_env()
+        self._buffer = deque(maxlen=self.capacity)
+        self._sinks: Dict[Any, Sink] = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+
+    def start(self) -> 'LogPipeline':
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="LogPipeline", daemon=True)
+            self._thread.start()
+        return self
+
+    # ---------------------------
+    # Producers (any thread, never block)
+    # ---------------------------
+
+    def submit(self, sink: Sink, render: Callable[[Any], str], item: Any) -> None:
+        """Queue one entry; once the buffer is full the oldest entry is overwritten (and counted)."""
+        buffer = self._buffer
+        if len(buffer) >= self.capacity:
+            self.dropped += 1
+        buffer.append((sink, render, item))
+
+    def file_sink(self, path: str, mode: str = "a", max_bytes: Optional[int] = None,
+                  backups: Optional[int] = None, header: Optional[str] = None) -> Sink:
+        """The sink for ``path``, shared by everything writing to that file."""
+        key = os.path.abspath(path)
+        sink = self._sinks.get(key)
+        if sink is None:
+            sink = self._sinks[key] = Sink(
+                path, mode=mode, header=header,
+                max_bytes=self.max_bytes if max_bytes is None else max_bytes,
+                backups=self.backups if backups is None else backups)
+        return sink
+
+    def stream_sink(self, stream: Optional[TextIO] = None) -> Sink:
+        stream = stream or sys.stderr
+        sink = self._sinks.get(id(stream))
+        if sink is None:
+            sink = self._sinks[id(stream)] = Sink(stream=stream)
+        return sink
+
+    def file_handler(self, path: str, mode: str = "a", level=logging.NOTSET, **kwargs) -> PipelineHandler:
+        return PipelineHandler(self, self.file_sink(path, mode=mode, **kwargs), level)
+
+    def stream_handler(self, stream: Optional[TextIO] = None, level=logging.NOTSET) -> PipelineHandler:
+        return PipelineHandler(self, self.stream_sink(stream), level)
+
+    def write_row(self, sink: Sink, row) -> None:
+        """Queue one CSV row for ``sink``."""
+        self.submit(sink, csv_line, row)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been written."""
+        if self._thread is None:
+            return False
+        done = threading.Event()
+        self._buffer.append((None, None, done))
+        self._wake.set()
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is pending, close the files and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": len(self._buffer), "capacity": self.capacity, "dropped": self.dropped,
+                "written": self.written, "errors": self.errors, "sampled_out": dict(self.sampler.suppressed)}
+
+    # ---------------------------
+    # Writer thread
+    # ---------------------------
+
+    def _drain(self) -> None:
+        popleft = self._buffer.popleft
+        while True:
+            pending: Dict[Sink, List[str]] = {}
+            markers = []
+            count = 0
+            while count < self.batch_size:
+                try:
+                    sink, render, item = popleft()
+                except IndexError:
+                    break
+                count += 1
+                if sink is None:
+                    markers.append(item)
+                    continue
+                try:
+                    line = render(item)
+                except Exception as e:
+                    line = f"<unformattable log entry: {e!r}>\n"
+                pending.setdefault(sink, []).append(line)
+            for sink, lines in pending.items():
+                try:
+                    sink.write(lines)
+                    self.written += len(lines)
+                except (OSError, ValueError):
+                    self.errors += 1
+            for marker in markers:
+                marker.set()
+            if count < self.batch_size:
+                return
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._drain()
+        self._drain()
+        for sink in self._sinks.values():
+            sink.close()
+
+
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> LogPipeline:
+    """The process-wide pipeline, started on first use and flushed at exit."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                pipeline = LogPipeline().start()
+                atexit.register(pipeline.close)
+                _pipeline = pipeline
+    return _pipeline
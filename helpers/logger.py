@@ -1,24 +1,31 @@
 """
 Trading logger with structured output and error handling.
+
+Records and CSV rows are handed to the shared LogPipeline (helpers/log_pipeline.py),
+so logging from the event loop never formats a record or touches a file.
 """
 
 import os
-import csv
 import logging
 from datetime import datetime
 import pytz
 from decimal import Decimal
 
+from .log_pipeline import csv_line, get_pipeline
+
+_LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
 
 class TradingLogger:
     """Enhanced logging with structured output and error handling."""
 
-    def __init__(self, exchange: str, ticker: str, log_to_console: bool = False):
+    def __init__(self, exchange: str, ticker: str, log_to_console: bool = False, logs_dir: str = None):
         self.exchange = exchange
         self.ticker = ticker
-        # Ensure logs directory exists at the project root
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        logs_dir = os.path.join(project_root, 'logs')
+        # Ensure logs directory exists (project root's logs/ unless one is given)
+        if logs_dir is None:
+            project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+            logs_dir = os.path.join(project_root, 'logs')
         os.makedirs(logs_dir, exist_ok=True)
 
         order_file_name = f"{exchange}_{ticker}_orders.csv"
@@ -33,12 +40,18 @@ class TradingLogger:
         self.log_file = os.path.join(logs_dir, order_file_name)
         self.debug_log_file = os.path.join(logs_dir, debug_log_file_name)
         self.timezone = pytz.timezone(os.getenv('TIMEZONE', 'Asia/Shanghai'))
+        self.pipeline = get_pipeline()
+        self._prefix = f"[{exchange.upper()}_{ticker.upper()}] "
+        self._orders_sink = self.pipeline.file_sink(
+            self.log_file, max_bytes=0,
+            header=csv_line(['Timestamp', 'OrderID', 'Side', 'Quantity', 'Price', 'Status']))
         self.logger = self._setup_logger(log_to_console)
 
     def _setup_logger(self, log_to_console: bool) -> logging.Logger:
         """Setup the logger with proper configuration."""
         logger = logging.getLogger(f"trading_bot_{self.exchange}_{self.ticker}")
-        logger.setLevel(logging.INFO)
+        # NADO_LOG_LEVEL=DEBUG turns on the forensic payload dumps
+        logger.setLevel(_LEVELS.get(os.getenv('NADO_LOG_LEVEL', 'INFO').upper(), logging.INFO))
 
         # Prevent propagation to root logger to avoid duplicate messages
         logger.propagate = False
@@ -64,49 +77,36 @@ class TradingLogger:
             tz=self.timezone
         )
 
-        # File handler
-        file_handler = logging.FileHandler(self.debug_log_file)
+        # File handler (size-rotated, written by the pipeline thread)
+        file_handler = self.pipeline.file_handler(self.debug_log_file)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
         logger.addHandler(file_handler)
 
         # Console handler if requested
         if log_to_console:
-            console_handler = logging.StreamHandler()
+            console_handler = self.pipeline.stream_handler()
             console_handler.setLevel(logging.INFO)
             console_handler.setFormatter(formatter)
             logger.addHandler(console_handler)
 
         return logger
 
-    def log(self, message: str, level: str = "INFO"):
-        """Log a message with the specified level."""
-        formatted_message = f"[{self.exchange.upper()}_{self.ticker.upper()}] {message}"
-        if level.upper() == "DEBUG":
-            self.logger.debug(formatted_message)
-        elif level.upper() == "INFO":
-            self.logger.info(formatted_message)
-        elif level.upper() == "WARNING":
-            self.logger.warning(formatted_message)
-        elif level.upper() == "ERROR":
-            self.logger.error(formatted_message)
-        else:
-            self.logger.info(formatted_message)
+    def log(self, message: str, level: str = "INFO", *args, category: str = None):
+        """Log a message with the specified level.
+
+        ``args`` are %-formatted into ``message`` on the writer thread; messages with a
+        ``category`` are subject to the pipeline's sampling (see NADO_LOG_SAMPLE).
+        """
+        if category is not None and not self.pipeline.sampler.keep(category):
+            return
+        self.logger.log(_LEVELS.get(level.upper(), logging.INFO), self._prefix + message, *args)
+
+    def enabled_for(self, level: str) -> bool:
+        """Whether a message at ``level`` would be written; guard expensive arguments with it."""
+        return self.logger.isEnabledFor(_LEVELS.get(level.upper(), logging.INFO))
 
     def log_transaction(self, order_id: str, side: str, quantity: Decimal, price: Decimal, status: str):
-        """Log a transaction to CSV file."""
-        try:
-            timestamp = datetime.now(self.timezone).strftime("%Y-%m-%d %H:%M:%S")
-            row = [timestamp, order_id, side, quantity, price, status]
-
-            # Check if file exists to write headers
-            file_exists = os.path.isfile(self.log_file)
-
-            with open(self.log_file, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                if not file_exists:
-                    writer.writerow(['Timestamp', 'OrderID', 'Side', 'Quantity', 'Price', 'Status'])
-                writer.writerow(row)
-
-        except Exception as e:
-            self.log(f"Failed to log transaction: {e}", "ERROR")
+        """Queue a transaction row for the orders CSV file."""
+        timestamp = datetime.now(self.timezone).strftime("%Y-%m-%d %H:%M:%S")
+        self.pipeline.write_row(self._orders_sink, [timestamp, order_id, side, quantity, price, status])
@@ -0,0 +1,80 @@
+"""
+X18 fixed-point helpers.
+
+Nado sends every price, size and balance as an integer scaled by 10**18.
+These helpers keep those raw integers end to end and only convert to
+Decimal/float at the API/UI edge.
+"""
+
+from decimal import Decimal
+from typing import Union
+
+X18_ONE = 10 ** 18
+_DEC_X18_ONE = Decimal(X18_ONE)
+
+
+class X18(int):
+    """A raw X18 fixed-point integer (value * 10**18).
+
+    Being an int subclass it can be passed anywhere the wire format is expected,
+    while letting callers such as place_open_order tell it apart from a plain price.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_decimal(cls, value: Union[Decimal, str, float, int]) -> 'X18':
+        return cls(decimal_to_x18(value))
+
+    def to_decimal(self) -> Decimal:
+        return x18_to_decimal(self)
+
+    def to_float(self) -> float:
+        return x18_to_float(self)
+
+    def quantize(self, tick: int) -> 'X18':
+        return X18(quantize_x18(self, tick))
+
+    def __repr__(self):
+        return f"X18({int(self)})"
+
+    # int subclasses inherit object.__str__ (which calls __repr__); wire payloads need plain digits
+    __str__ = int.__repr__
+
+
+def parse_x18(raw) -> int:
+    """Wire value (int or decimal string) -> raw X18 integer."""
+    return raw if type(raw) is int else int(raw)
+
+
+def x18_to_decimal(raw) -> Decimal:
+    """Raw X18 integer (or wire string) -> Decimal."""
+    return Decimal(int(raw)) / _DEC_X18_ONE
+
+
+def x18_to_float(raw) -> float:
+    """Raw X18 integer (or wire string) -> float, for UI/stats output."""
+    return int(raw) / X18_ONE
+
+
+def decimal_to_x18(value: Union[Decimal, str, float, int]) -> int:
+    """Human-unit value -> raw X18 integer (truncated like int(Decimal))."""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return int(value * _DEC_X18_ONE)
+
+
+def to_x18(value) -> int:
+    """Like decimal_to_x18, but passes X18 values through untouched."""
+    if isinstance(value, X18):
+        return int(value)
+    return decimal_to_x18(value)
+
+
+def quantize_x18(raw: int, tick: int) -> int:
+    """Round a raw X18 value to the nearest multiple of tick (half away from zero)."""
+    if tick <= 0:
+        return raw
+    q, r = divmod(abs(raw), tick)
+    if 2 * r >= tick:
+        q += 1
+    return q * tick if raw >= 0 else -q * tick
@@ -4,20 +4,26 @@ HFT 策略核心引擎
 """
 
 import asyncio
-import json
 import time
 import logging
-import random
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
+from typing import List, Optional, Tuple
 import aiohttp
 
 # Architecture Standardization
 from exchanges.factory import ExchangeFactory
 from exchanges.base import BaseExchangeClient
 from pnl_tracker import PnLTracker
+from orderbook import LocalOrderBook, DepthSynchronizer
+from market_data import MarketDataHub
+from helpers.feed_recorder import FeedRecorder
+from helpers.log_pipeline import get_pipeline
+from exchanges.nado_frames import (
+    DepthFrame, ErrorFrame, FillFrame, OrderUpdateFrame, PingFrame, decode_frame
+)
+from helpers.x18 import X18, X18_ONE, decimal_to_x18, quantize_x18, x18_to_decimal
 
 
 @dataclass
@@ -48,45 +54,43 @@ class TradingConfig:
 # Logger inherited from root or configured by caller
 logger = logging.getLogger("HFTBot")
 
-class LocalOrderBook:
-    """Thread-safe local copy of the orderbook."""
-    def __init__(self):
-        self.bids: Dict[Decimal, Decimal] = {} # Price -> Size
-        self.asks: Dict[Decimal, Decimal] = {}
-        self.lock = asyncio.Lock()
-
-    async def update(self, side: str, price: Decimal, size: Decimal):
-        """Update a level safely."""
-        async with self.lock:
-            book = self.bids if side == 'buy' else self.asks
-            if size == 0:
-                book.pop(price, None)
-            else:
-                book[price] = size
-
-    async def get_mid_price(self) -> Decimal:
-        async with self.lock:
-            if not self.bids or not self.asks:
-                return Decimal(0)
-            bb = max(self.bids.keys())
-            ba = min(self.asks.keys())
-            return (bb + ba) / 2
-
 class WebSocketManager:
-    """Manages WebSocket connections with Infinite Retry."""
-    def __init__(self, client: BaseExchangeClient, bot: 'HFTBot'):
+    """Manages WebSocket connections with Infinite Retry.
+
+    When a shared MarketDataHub is given, no socket is opened: the book and the
+    private fill/order events come from the hub's multiplexed connection.
+    """
+    SNAPSHOT_DEPTH = 100
+
+    def __init__(self, client: BaseExchangeClient, bot: 'HFTBot', hub: Optional[MarketDataHub] = None,
+                 recorder: Optional[FeedRecorder] = None):
         self.client = client
         self.bot = bot
+        self.hub = hub
+        self.recorder = recorder
         self.base_url = getattr(client, 'ws_url', "wss://gateway.prod.nado.xyz/v1/ws")
         self.product_id = getattr(client, 'product_id', 4)
         
         self.public_ws = None
         self.session = None
-        self.book = LocalOrderBook()
+        if hub:
+            self.book = hub.add_product(self.product_id)
+            self.depth_sync = None
+        else:
+            self.book = LocalOrderBook()
+            self.depth_sync = DepthSynchronizer(self.book, self._fetch_depth_snapshot)
         self.stop_event = asyncio.Event()
+        # Depth timestamps double as gateway clock samples for the client's nonce allocator
+        nonces = getattr(client, 'nonces', None)
+        self._clock_sample = nonces.observe_stream_ns if nonces is not None else None
 
     async def connect(self):
         self.stop_event.clear()
+        if self.hub:
+            self.hub.add_event_handlers(self.product_id, on_fill=self.bot._handle_fill_update,
+                                        on_order_update=self.bot._handle_order_update)
+            await self.hub.start()
+            return
         asyncio.create_task(self._supervisor_loop())
 
     async def _supervisor_loop(self):
@@ -100,8 +104,23 @@ class WebSocketManager:
                 logger.error(f"WS Supervisor Connection Lost: {e}. Retrying in 5s...")
                 await asyncio.sleep(5)
 
+    async def _fetch_depth_snapshot(self) -> dict:
+        """market_liquidity snapshot used by the depth synchronizer to repair gaps."""
+        if not hasattr(self.client, 'get_depth'):
+            return {}
+        return await self.client.get_depth(self.product_id, depth=self.SNAPSHOT_DEPTH)
+
+    async def resync_book(self):
+        """Rebuild the book from a snapshot through the synchronizer (the hub's, when shared)."""
+        if self.hub:
+            await self.hub.resync(self.product_id)
+        else:
+            await self.depth_sync.resync()
+
     async def _connect_and_listen(self):
         self.session = aiohttp.ClientSession()
+        # Sequence state does not survive a reconnect; the first delta triggers a resync
+        self.depth_sync.reset()
         
         # 1. Fetch Account ID if missing (Critical for Private Stream)
         if not getattr(self.client, 'account_id', None):
@@ -113,7 +132,7 @@ class WebSocketManager:
         account_id = getattr(self.client, 'account_id', 0)
         
         # 2. Build Authenticated URL & Headers
-        url = "wss://gateway.prod.nado.xyz/v1/ws"
+        url = self.base_url
         timestamp = int(time.time() * 1000)
         
         headers = {
@@ -173,66 +192,72 @@ class WebSocketManager:
 
             raw = msg.data
             if not raw: continue
+            if self.recorder:
+                self.recorder.record(raw)
             
             try:
-                data = json.loads(raw)
-                msg_type = data.get('type', data.get('event', 'unknown'))
-                
-                # Diagnostics: Log everything except frequent depth
-                if msg_type not in ('depth', 'book_depth', 'quote-event'):
-                     logger.info(f"WS RX JSON: {msg_type} | Data: {raw[:300]}")
-                elif time.time() % 60 < 2: 
-                     logger.info(f"WS RX Depth Heartbeat (Channel: {data.get('channel')})")
-
-                if msg_type == 'ping':
-                    await self.public_ws.send_json({"type": "pong", "time": data.get('time')})
-                    continue
-                     
-                # Routing
-                if msg_type in ('depth', 'snapshot', 'book_depth') or (msg_type == 'quote-event' and 'depth' in data.get('channel', '')):
-                    await self._handle_depth_update(data)
-                elif msg_type in ('fill', 'match', 'order_update', 'trade', 'order', 'position', 'account'):
-                    await self.bot._handle_fill_update(data)
-                elif msg_type == 'error':
-                    logger.error(f"WS Server Error: {data}")
-                        
+                await self._dispatch(raw)
             except Exception as e:
                 logger.error(f"WS Processing Error: {e}")
                 
         logger.warning("WS Connection Loop ended. Supervisor will reconnect...")
 
-    async def _handle_depth_update(self, msg_data):
-        # Support both wrapped "data" and flat structure
-        data = msg_data.get('data', msg_data)
+    async def _dispatch(self, raw):
+        """Decode one frame once into a typed struct and route it."""
+        frame = decode_frame(raw)
         
-        # Debug Log first few updates
-        if random.random() < 0.05:
-            logger.info(f"WS Raw Depth: {str(msg_data)[:200]}")
-            
-        bids = data.get('bids', [])
-        asks = data.get('asks', [])
+        # Routing (hot path first)
+        if type(frame) is DepthFrame:
+            # Diagnostics: depth is too frequent to log, emit a heartbeat now and then
+            if time.time() % 60 < 2:
+                logger.info(f"WS RX Depth Heartbeat (Product: {frame.product_id})")
+            await self._handle_depth_update(frame)
+            return
         
-        for p, s in bids:
-            # Nado Sends X18 Strings -> Float conversion required
-            p_val = Decimal(str(p)) / Decimal(10**18)
-            s_val = Decimal(str(s)) / Decimal(10**18)
-            await self.book.update('buy', p_val, s_val)
-            
-        for p, s in asks:
-            p_val = Decimal(str(p)) / Decimal(10**18)
-            s_val = Decimal(str(s)) / Decimal(10**18)
-            await self.book.update('sell', p_val, s_val)
+        # Diagnostics: Log everything except frequent depth
+        logger.info("WS RX %s | Data: %s", type(frame).__name__, raw[:300])
+        
+        if type(frame) is PingFrame:
+            await self.public_ws.send_json({"type": "pong", "time": frame.time})
+        elif type(frame) is FillFrame:
+            await self.bot._handle_fill_update(frame)
+        elif type(frame) is OrderUpdateFrame:
+            await self.bot._handle_order_update(frame)
+        elif type(frame) is ErrorFrame:
+            logger.error(f"WS Server Error: {frame.raw}")
+
+    async def _handle_depth_update(self, frame: DepthFrame):
+        # Debug Log a sample of updates (1 in N, see NADO_LOG_SAMPLE)
+        if get_pipeline().sampler.keep("depth"):
+            logger.info("WS Raw Depth: bids=%s asks=%s", frame.bids[:2], frame.asks[:2])
+        
+        if self._clock_sample and frame.max_ts:
+            self._clock_sample(frame.max_ts)
+        # Nado Sends X18 Strings -> kept as raw X18 ints; whole message applied at once,
+        # with sequence checking and automatic snapshot resync on gaps
+        await self.depth_sync.on_depth(frame)
 
     async def close(self):
         self.stop_event.set()
+        if self.hub:
+            # The hub is shared with other bots; only detach this one
+            self.hub.remove_event_handlers(self.product_id, on_fill=self.bot._handle_fill_update,
+                                           on_order_update=self.bot._handle_order_update)
+            return
         if self.public_ws: await self.public_ws.close()
         if self.session: await self.session.close()
 
 class HFTBot:
-    def __init__(self, config_dict: dict, ws_manager=None, client=None):
+    def __init__(self, config_dict: dict, ws_manager=None, client=None, market_data: Optional[MarketDataHub] = None,
+                 recorder: Optional[FeedRecorder] = None, clock=None):
         self.config = config_dict
         self.running = False
+        # Injectable clock (time() + async sleep()) so the replay harness can run on simulated time
+        self._now = clock.time if clock else time.time
+        self._sleep = clock.sleep if clock else asyncio.sleep
         self.ws_manager = ws_manager
+        self.market_data = market_data
+        self.recorder = recorder
         
         # Architecture Standardization: Use Factory
         if client:
@@ -264,12 +289,26 @@ class HFTBot:
                 await self.client.get_contract_attributes() # type: ignore
         except:
              pass 
+
+        # Spawn and warm the signing workers so the first quote doesn't pay for it
+        if hasattr(self.client, 'signing_pool'):
+            await self.client.signing_pool.start()
+        # Open keep-alive REST sockets now so the first order skips the TCP/TLS handshake
+        if hasattr(self.client, 'warm_transport'):
+            await self.client.warm_transport()
+        # Keep oracle prices refreshed in memory once a market / un-priced order needs one
+        # (maker quotes carry explicit prices and never start the poll)
+        if hasattr(self.client, 'prices'):
+            self.client.prices.start()
+        # Order executes over the gateway WS (falls back to REST while it is down)
+        if hasattr(self.client, 'ws_exec'):
+            await self.client.ws_exec.start()
              
         logger.info(f"Starting HFT Bot (Prod: {getattr(self.client, 'product_id', 'Unknown')})...")
         self.running = True
         
         if not self.ws_manager:
-            self.ws_manager = WebSocketManager(self.client, self)
+            self.ws_manager = WebSocketManager(self.client, self, hub=self.market_data, recorder=self.recorder)
             
         await self.ws_manager.connect()
         self._stats_task = asyncio.create_task(self._stats_loop())
@@ -280,7 +319,7 @@ class HFTBot:
             pid = getattr(self.client, 'product_id', 4)
             await self.client.cancel_all_orders(str(pid))
             logger.info("⏳ [V3] 进入启动宁静期 (Calm Start Delay)...")
-            await asyncio.sleep(3) 
+            await self._sleep(3) 
             
             # Populate initial position cache to avoid first-cycle glitch
             if hasattr(self.client, 'get_account_positions'):
@@ -298,39 +337,61 @@ class HFTBot:
             logger.info("🛡️ ENGINE START: MAKER MODE (BRACKET) 🛡️")
             self._strategy_task = asyncio.create_task(self._run_maker_strategy())
 
-    async def _handle_fill_update(self, data):
+    async def _handle_fill_update(self, fill: FillFrame):
         """Handle real-time fill event for position and volume tracking."""
         try:
-            fill = data.get('data', data)
-            pid = int(fill.get('product_id', 0))
-            if pid == self.product_id:
-                amt = Decimal(str(fill.get('amount', 0)))
-                px = Decimal(str(fill.get('price', 0))) / Decimal(10**18)
+            if fill.product_id == self.product_id:
+                amt = x18_to_decimal(fill.amount)
+                px = x18_to_decimal(fill.price_x18)
                 
                 # Proactive position cache update
                 if hasattr(self.client, '_pos_cache') and self.client._pos_cache is not None:
                     self.client._pos_cache += amt
                     logger.info(f"⚡ [WS FILL] Real-time Pos Update: {self.client._pos_cache} ETH (Change: {amt})")
+                # The cached subaccount_info predates this fill
+                self.pnl.account.invalidate()
                 
                 # Record Volume & Trade History
                 self.pnl.add_volume(abs(amt), px)
                 trade = {
-                    "ts": time.time(),
-                    "time": datetime.now().strftime("%H:%M:%S"),
+                    "ts": self._now(),
+                    "time": datetime.fromtimestamp(self._now()).strftime("%H:%M:%S"),
                     "side": "buy" if amt > 0 else "sell",
                     "size": float(abs(amt)),
                     "price": float(px),
-                    "id": fill.get('order_id', 'unknown')
+                    "id": fill.order_id
                 }
                 self.trade_history.insert(0, trade)
                 self.trade_history = self.trade_history[:50] # Keep last 50
                 
+            # A fully filled order is no longer resting: drop it from the client's pending table
+            if hasattr(self.client, '_settle_pending'):
+                self.client._settle_pending(fill.order_id, remaining_x18=fill.remaining)
+
             if hasattr(self.client, '_zero_balance_strikes'):
                 self.client._zero_balance_strikes = 0
                 
         except Exception as e:
             logger.error(f"Error handling fill update: {e}")
 
+    async def _handle_order_update(self, update: OrderUpdateFrame):
+        """Order/position/account events: forward to the client's order handler if one is registered."""
+        try:
+            handler = getattr(self.client, '_order_update_handler', None)
+            if handler:
+                res = handler(update.raw)
+                if asyncio.iscoroutine(res):
+                    await res
+            if hasattr(self.client, '_settle_pending'):
+                self.client._settle_pending(update.digest, reason=update.reason)
+            # The cached subaccount_info predates a position/account change
+            if update.kind in ('position', 'account'):
+                self.pnl.account.invalidate()
+            if hasattr(self.client, '_zero_balance_strikes'):
+                self.client._zero_balance_strikes = 0
+        except Exception as e:
+            logger.error(f"Error handling order update: {e}")
+
     async def get_mid_price(self) -> Optional[Decimal]:
         # Bot's mid price comes from its ws_manager's book
         if not self.ws_manager: return Decimal(0)
@@ -341,29 +402,10 @@ class HFTBot:
             
         # Fallback to REST if WS is silent
         try:
-            if hasattr(self.client, 'get_depth'):
-                logger.warning("WS Mid 0: Polling REST Depth Fallback...")
-                pid = getattr(self.client, 'product_id', 4)
-                data = await self.client.get_depth(pid)
-                     
-                # Handle wrapped 'data' if present (API quirk)
-                data = data.get('data', data)
-                    
-                bids = data.get('bids', [])
-                asks = data.get('asks', [])
-                
-                if not bids or not asks:
-                    return Decimal(0)
-                    
-                for p, s in bids: 
-                    p_val = Decimal(str(p)) / Decimal(10**18)
-                    s_val = Decimal(str(s)) / Decimal(10**18)
-                    await self.ws_manager.book.update('buy', p_val, s_val)
-                    
-                for p, s in asks: 
-                    p_val = Decimal(str(p)) / Decimal(10**18)
-                    s_val = Decimal(str(s)) / Decimal(10**18)
-                    await self.ws_manager.book.update('sell', p_val, s_val)
+            if hasattr(self.client, 'get_depth') and hasattr(self.ws_manager, 'resync_book'):
+                logger.warning("WS Mid 0: Resyncing book from REST snapshot...")
+                # Through the synchronizer, so later WS deltas are sequenced against the snapshot
+                await self.ws_manager.resync_book()
                 
                 return await self.ws_manager.book.get_mid_price()
         except Exception as e:
@@ -371,15 +413,21 @@ class HFTBot:
             
         return Decimal(0)
 
+    async def _ladder_mid(self) -> Optional[Decimal]:
+        """WS-book mid for the pre-signed ladder; None while the book is stale (no REST fallback)."""
+        if not self.ws_manager or self.ws_manager.book.stale:
+            return None
+        return await self.ws_manager.book.get_mid_price()
+
     async def _stats_loop(self):
         """Background task to keep PnL and account stats fresh."""
         while self.running:
             try:
                 await self.pnl.update()
-                await asyncio.sleep(10)
+                await self._sleep(10)
             except Exception as e:
                 logger.error(f"Stats Update Error: {e}")
-                await asyncio.sleep(5)
+                await self._sleep(5)
 
 
     async def _run_maker_strategy(self):
@@ -394,9 +442,22 @@ class HFTBot:
                 if not mp or mp == 0:
                      if self.cycle_count % 5 == 0:
                          logger.info(f"Maker: 等待价格数据... (Waiting for Price) [Cycle {self.cycle_count}]")
-                     await asyncio.sleep(1)
+                     await self._sleep(1)
                      continue
                 
+                # Never quote off a book with a detected gap; the synchronizer is already resyncing it
+                if self.ws_manager and self.ws_manager.book.stale:
+                    if self.cycle_count % 5 == 0:
+                        logger.warning(f"Maker: 订单簿同步中，暂停报价 (Book stale, resyncing) [Cycle {self.cycle_count}]")
+                    await self._sleep(0.5)
+                    continue
+                # One X18 mid for the quotes below; the logged and risk-checked mid is derived from it
+                mp_x18 = self.ws_manager.book.get_mid_price_x18()
+                if not mp_x18:
+                    await self._sleep(0.5)
+                    continue
+                mp = x18_to_decimal(mp_x18)
+                
                 logger.info(f"Maker Cycle {self.cycle_count} | Mid: {mp}")
 
                 # 2. Cleanup Active Orders (Optimized Refresh)
@@ -416,10 +477,10 @@ class HFTBot:
                             ids = [o.order_id for o in active_orders]
                             await self.client.cancel_orders(ids)
                             self.active_orders = []
-                            await asyncio.sleep(0.5) 
+                            await self._sleep(0.5) 
                         else:
                             # Orders still good, sleep and skip placement
-                            await asyncio.sleep(max(1, self.config.get('interval', 5)))
+                            await self._sleep(max(1, self.config.get('interval', 5)))
                             continue
                     except Exception as e:
                         logger.error(f"Refresh failed: {e}")
@@ -443,7 +504,7 @@ class HFTBot:
                 if self.current_pos_notional > self.max_exposure_usd:
                     if self.cycle_count % 5 == 0:
                         logger.warning(f"WAIT: Max Exposure Reached! Pos Val: {self.current_pos_notional:.2f} USD > Limit: {self.max_exposure_usd} USD (Config Limit)")
-                    await asyncio.sleep(5)
+                    await self._sleep(5)
                     continue
                     
                 # SAFETY 3: Hard Leverage Cap (Dynamic based on Equity)
@@ -454,12 +515,12 @@ class HFTBot:
                     if self.current_pos_notional >= hard_limit_usd:
                         if self.cycle_count % 5 == 0:
                             logger.warning(f"🛑 杠杆熔断 (Leverage Cap): 当前价值 {self.current_pos_notional:.2f}U 已达权益 {equity:.2f}U 的 {self.MAX_LEVERAGE} 倍上限。")
-                        await asyncio.sleep(10)
+                        await self._sleep(10)
                         continue
                 else:
                     # If equity is 0 or negative (risk of liq), STOP and WAIT
                     logger.error(f"🚨 风险警告: 账户权益异常 ({equity})，停止下单。")
-                    await asyncio.sleep(10)
+                    await self._sleep(10)
                     continue
 
                 spread = Decimal(str(self.config.get('spread', 0.0005)))
@@ -470,19 +531,21 @@ class HFTBot:
                 order_value = qty * mp
                 if order_value + self.current_pos_notional > self.max_exposure_usd:
                      logger.warning(f"SKIPPED: Order value {order_value:.2f} would exceed Max Exposure")
-                     await asyncio.sleep(5)
+                     await self._sleep(5)
                      continue
 
                 tick_size = getattr(self.client.config, 'tick_size', Decimal("0.1")) 
                 
-                # Rounding
-                raw_bid = mp * (1 - spread)
-                raw_ask = mp * (1 + spread)
+                # Rounding (integer X18 math; prices go to the client without a Decimal round-trip)
+                spread_x18 = decimal_to_x18(spread)
+                tick_x18 = decimal_to_x18(tick_size)
+                raw_bid = mp_x18 * (X18_ONE - spread_x18) // X18_ONE
+                raw_ask = mp_x18 * (X18_ONE + spread_x18) // X18_ONE
                 # Quantize using tick_size
-                bid_price = (raw_bid / tick_size).quantize(Decimal("1")) * tick_size
-                ask_price = (raw_ask / tick_size).quantize(Decimal("1")) * tick_size
+                bid_price = X18(quantize_x18(raw_bid, tick_x18))
+                ask_price = X18(quantize_x18(raw_ask, tick_x18))
 
-                logger.info(f"Maker: Placing {qty} @ B:{bid_price} A:{ask_price}")
+                logger.info(f"Maker: Placing {qty} @ B:{bid_price.to_decimal()} A:{ask_price.to_decimal()}")
                  
                 orders = [
                     (qty, "buy", bid_price),
@@ -498,12 +561,12 @@ class HFTBot:
                 # logger.info(f"Batch Res: {res}")
                 # Success: reset error counter
                 self.consecutive_errors = 0
-                await asyncio.sleep(max(2, self.config.get('interval', 5)))
+                await self._sleep(max(2, self.config.get('interval', 5)))
                 
             except Exception as e:
                 self.consecutive_errors += 1
                 logger.error(f"Maker Loop Error ({self.consecutive_errors}): {e}")
-                await asyncio.sleep(2)
+                await self._sleep(2)
 
     async def _run_booster_strategy(self):
         """
@@ -519,6 +582,10 @@ class HFTBot:
         
         qty = Decimal(str(self.config.get('quantity', 0.01)))
         
+        # Keep IOC orders for qty pre-signed around the WS mid so each leg is a single POST
+        if self.config.get('presign_ladder', True) and hasattr(self.client, 'start_presign_ladder'):
+            self.client.start_presign_ladder(qty, self._ladder_mid)
+        
         while self.running:
             try:
                 self.cycle_count += 1
@@ -541,7 +608,7 @@ class HFTBot:
                         # Add stats volume? Not yet, we blindly assume.
                     else:
                         logger.error(f"Boost Open Failed: {res.error_message}")
-                        await asyncio.sleep(1)
+                        await self._sleep(1)
                         
                 elif current_state == STATE_CLOSE:
                     # Place Market SELL
@@ -552,14 +619,14 @@ class HFTBot:
                          current_state = STATE_OPEN
                     else:
                          logger.error(f"Boost Close Failed: {res.error_message}")
-                         await asyncio.sleep(1)
+                         await self._sleep(1)
                 
                 # Nap to avoid rate limits?
-                await asyncio.sleep(0.5) 
+                await self._sleep(0.5) 
                 
             except Exception as e:
                 logger.error(f"Booster Loop Error: {e}")
-                await asyncio.sleep(1)
+                await self._sleep(1)
 
     async def stop(self):
         logger.info("🛑 [V3] Stopping HFT Bot (Atomic Termination)...")
@@ -574,6 +641,9 @@ class HFTBot:
             self._stats_task.cancel()
             logger.info("🧹 Stats task cancelled.")
 
+        if hasattr(self.client, 'stop_presign_ladder'):
+            await self.client.stop_presign_ladder()
+
         # 2. Cleanup WebSockets
         if self.ws_manager:
             await self.ws_manager.close()
@@ -587,3 +657,14 @@ class HFTBot:
                  logger.info("🧼 Final order purge complete.")
         except Exception as e:
              logger.error(f"Final purge failed: {e}")
+
+        # 4. Release the execute WS, the price refresh, the REST transport and the signing workers
+        #    (recreated on demand if the client is reused)
+        if hasattr(self.client, 'ws_exec'):
+            await self.client.ws_exec.stop()
+        if hasattr(self.client, 'prices'):
+            await self.client.prices.stop()
+        if hasattr(self.client, 'http'):
+            await self.client.http.close()
+        if hasattr(self.client, 'signing_pool'):
+            self.client.signing_pool.shutdown()
@@ -0,0 +1,300 @@
+"""
+多品种行情中心 (Market Data Hub)
+作用：通过一条 WebSocket 连接订阅 N 个品种的深度 (depth.{pid}) 与私有成交流，每个品种维护一本订单簿，
+并通过按品种的异步队列/回调把更新分发给任意数量的机器人或 API 处理器，避免 N 个品种开 N 条连接、重复解码。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from exchanges.nado_frames import (
+    DepthFrame, ErrorFrame, FillFrame, OrderUpdateFrame, PingFrame, decode_frame
+)
+from helpers.feed_recorder import FeedRecorder
+from orderbook import DepthSynchronizer, LocalOrderBook
+
+logger = logging.getLogger("MarketData")
+
+BookCallback = Callable[[int, LocalOrderBook], None]
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+class _ProductFeed:
+    """Book, sequencing state and subscribers for one product."""
+    __slots__ = ('product_id', 'book', 'sync', 'queues', 'callbacks')
+
+    def __init__(self, product_id: int, book: LocalOrderBook, sync: DepthSynchronizer):
+        self.product_id = product_id
+        self.book = book
+        self.sync = sync
+        self.queues: List[asyncio.Queue] = []
+        self.callbacks: List[BookCallback] = []
+
+
+class MarketDataHub:
+    """One shared Nado WS connection multiplexing depth for many products plus private fills."""
+
+    SNAPSHOT_DEPTH = 100
+
+    def __init__(self, client, product_ids: Iterable[int] = (), ws_url: Optional[str] = None,
+                 recorder: Optional[FeedRecorder] = None):
+        self.client = client
+        self.recorder = recorder
+        self.ws_url = ws_url or getattr(client, 'ws_url', "wss://gateway.prod.nado.xyz/v1/ws")
+        self._feeds: Dict[int, _ProductFeed] = {}
+        # product_id -> handlers for private fill / order events
+        self._fill_handlers: Dict[int, List[EventHandler]] = {}
+        self._order_handlers: Dict[int, List[EventHandler]] = {}
+        self._fills_sender: Optional[str] = None
+        # Depth timestamps double as gateway clock samples for the client's nonce allocator
+        nonces = getattr(client, 'nonces', None)
+        self._clock_sample = nonces.observe_stream_ns if nonces is not None else None
+
+        self.ws = None
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.stop_event = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
+
+        for pid in product_ids:
+            self.add_product(pid)
+
+    # ---------------------------
+    # Registration
+    # ---------------------------
+
+    def add_product(self, product_id: int) -> LocalOrderBook:
+        """Track a product (idempotent) and return its shared book."""
+        product_id = int(product_id)
+        feed = self._feeds.get(product_id)
+        if feed is None:
+            book = LocalOrderBook()
+            sync = DepthSynchronizer(book, lambda pid=product_id: self._fetch_snapshot(pid))
+            feed = self._feeds[product_id] = _ProductFeed(product_id, book, sync)
+            if self.ws is not None and not self.ws.closed:
+                asyncio.create_task(self._subscribe_depth(product_id))
+        return feed.book
+
+    async def resync(self, product_id: int) -> None:
+        """Resync a tracked product's shared book from a market_liquidity snapshot."""
+        feed = self._feeds.get(int(product_id))
+        if feed:
+            await feed.sync.resync()
+
+    def get_book(self, product_id: int) -> Optional[LocalOrderBook]:
+        feed = self._feeds.get(int(product_id))
+        return feed.book if feed else None
+
+    @property
+    def product_ids(self) -> List[int]:
+        return list(self._feeds)
+
+    def subscribe(self, product_id: int, callback: Optional[BookCallback] = None,
+                  maxsize: int = 100) -> Optional[asyncio.Queue]:
+        """Subscribe to book updates for a product.
+
+        With a callback, it is invoked synchronously as callback(product_id, book) after every
+        applied depth frame. Without one, a bounded queue of product ids is returned; when a slow
+        consumer lets it fill up, the oldest notification is dropped rather than blocking the feed.
+        """
+        self.add_product(product_id)
+        feed = self._feeds[int(product_id)]
+        if callback is not None:
+            feed.callbacks.append(callback)
+            return None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        feed.queues.append(queue)
+        return queue
+
+    def unsubscribe(self, product_id: int, subscriber) -> None:
+        feed = self._feeds.get(int(product_id))
+        if not feed:
+            return
+        if subscriber in feed.queues:
+            feed.queues.remove(subscriber)
+        if subscriber in feed.callbacks:
+            feed.callbacks.remove(subscriber)
+
+    def add_event_handlers(self, product_id: int, on_fill: Optional[EventHandler] = None,
+                           on_order_update: Optional[EventHandler] = None) -> None:
+        """Route this subaccount's fill/order events for a product to the given coroutines."""
+        product_id = int(product_id)
+        if on_fill:
+            self._fill_handlers.setdefault(product_id, []).append(on_fill)
+        if on_order_update:
+            self._order_handlers.setdefault(product_id, []).append(on_order_update)
+        if self.ws is not None and not self.ws.closed and self._fills_sender is None:
+            asyncio.create_task(self._subscribe_fills())
+
+    def bind_client(self, client) -> None:
+        """Use ``client`` for snapshots, clock samples and the private fills subscription.
+
+        The hub outlives the bots it serves; each new bot may come with a different subaccount,
+        so its fills channel is switched over on the live connection.
+        """
+        if client is self.client:
+            return
+        self.client = client
+        nonces = getattr(client, 'nonces', None)
+        self._clock_sample = nonces.observe_stream_ns if nonces is not None else None
+        if self.ws is not None and not self.ws.closed and self._fills_sender is not None:
+            asyncio.create_task(self._resubscribe_fills())
+
+    def remove_event_handlers(self, product_id: int, on_fill: Optional[EventHandler] = None,
+                              on_order_update: Optional[EventHandler] = None) -> None:
+        for table, handler in ((self._fill_handlers, on_fill), (self._order_handlers, on_order_update)):
+            handlers = table.get(int(product_id), [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    # ---------------------------
+    # Connection
+    # ---------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._supervisor is not None and not self._supervisor.done()
+
+    async def start(self):
+        """Start the shared connection (no-op if already running)."""
+        if self.running:
+            return
+        self.stop_event.clear()
+        self._supervisor = asyncio.create_task(self._supervisor_loop())
+
+    async def close(self):
+        self.stop_event.set()
+        if self.ws:
+            await self.ws.close()
+        if self.session:
+            await self.session.close()
+        if self._supervisor:
+            self._supervisor.cancel()
+
+    async def _supervisor_loop(self):
+        """Infinite Retry Loop to maintain connection."""
+        while not self.stop_event.is_set():
+            try:
+                await self._connect_and_listen()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Market data WS lost: {e}. Retrying in 5s...")
+            if not self.stop_event.is_set():
+                await asyncio.sleep(5)
+
+    async def _fetch_snapshot(self, product_id: int) -> dict:
+        if not hasattr(self.client, 'get_depth'):
+            return {}
+        return await self.client.get_depth(product_id, depth=self.SNAPSHOT_DEPTH)
+
+    async def _subscribe_depth(self, product_id: int):
+        await self.ws.send_json({"type": "subscribe", "channel": f"depth.{product_id}"})
+        logger.info(f"Hub subscribed to depth.{product_id}")
+
+    async def _subscribe_fills(self):
+        if not hasattr(self.client, '_subaccount_to_bytes32'):
+            return
+        sender = self.client._subaccount_to_bytes32(self.client.wallet_address, self.client.subaccount_name)
+        self._fills_sender = sender
+        await self.ws.send_json({"type": "subscribe", "channel": f"fills.{sender}"})
+        logger.info(f"Hub subscribed to private fills for: {sender[:10]}...")
+
+    async def _resubscribe_fills(self):
+        old = self._fills_sender
+        if hasattr(self.client, '_subaccount_to_bytes32'):
+            sender = self.client._subaccount_to_bytes32(self.client.wallet_address, self.client.subaccount_name)
+            if sender == old:
+                return
+        try:
+            if old is not None:
+                await self.ws.send_json({"type": "unsubscribe", "channel": f"fills.{old}"})
+            self._fills_sender = None
+            await self._subscribe_fills()
+        except Exception as e:
+            logger.warning(f"Hub fills resubscription failed: {e}")
+
+    async def _connect_and_listen(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        headers = {
+            "Origin": "https://app.nado.xyz",
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Sec-WebSocket-Version": "13",
+        }
+        ws_url = f"{self.ws_url}?timestamp={int(time.time() * 1000)}"
+        logger.info(f"Hub connecting WS: {ws_url}")
+        self.ws = await self.session.ws_connect(ws_url, headers=headers, heartbeat=15)
+
+        self._fills_sender = None
+        for feed in self._feeds.values():
+            # Sequence state does not survive a reconnect
+            feed.sync.reset()
+            await self._subscribe_depth(feed.product_id)
+        if self._fill_handlers or self._order_handlers:
+            try:
+                await self._subscribe_fills()
+            except Exception as e:
+                logger.warning(f"Hub fills subscription failed: {e}")
+
+        async for msg in self.ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+                continue
+            if not msg.data:
+                continue
+            if self.recorder:
+                self.recorder.record(msg.data)
+            try:
+                await self._dispatch(msg.data)
+            except Exception as e:
+                logger.error(f"Hub processing error: {e}")
+        logger.warning("Hub WS loop ended. Supervisor will reconnect...")
+
+    # ---------------------------
+    # Dispatch
+    # ---------------------------
+
+    async def _dispatch(self, raw):
+        frame = decode_frame(raw)
+        if type(frame) is DepthFrame:
+            await self.on_depth(frame)
+        elif type(frame) is FillFrame:
+            for handler in self._fill_handlers.get(frame.product_id, ()):
+                await handler(frame)
+        elif type(frame) is OrderUpdateFrame:
+            if frame.product_id is not None:
+                handlers = self._order_handlers.get(frame.product_id, ())
+            else:
+                # Account-wide updates carry no product: every subscribed bot gets them once
+                handlers = list(dict.fromkeys(h for hs in self._order_handlers.values() for h in hs))
+                if not handlers:
+                    logger.debug(f"Dropped order update without product_id: {frame.kind}")
+            for handler in handlers:
+                await handler(frame)
+        elif type(frame) is PingFrame:
+            await self.ws.send_json({"type": "pong", "time": frame.time})
+        elif type(frame) is ErrorFrame:
+            logger.error(f"Hub WS Server Error: {frame.raw}")
+
+    async def on_depth(self, frame: DepthFrame):
+        """Apply a depth frame to its product's book and notify subscribers."""
+        if self._clock_sample and frame.max_ts:
+            self._clock_sample(frame.max_ts)
+        feed = self._feeds.get(frame.product_id)
+        if feed is None:
+            return
+        await feed.sync.on_depth(frame)
+        for callback in feed.callbacks:
+            try:
+                callback(feed.product_id, feed.book)
+            except Exception as e:
+                logger.error(f"Hub subscriber callback failed: {e}")
+        for queue in feed.queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(feed.product_id)
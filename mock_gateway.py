@@ -0,0 +1,566 @@
+"""
+本地 Nado 模拟网关 (Mock Gateway)
+作用：在本机用 aiohttp 模拟 Nado 网关的 /v1/query、/v1/execute 与 /v1/ws (depth / fills 频道，以及带 id 的 execute 消息)，
+内置随机游走盘口和简易撮合，并可注入延迟、抖动、错误、丢帧与断线，用于无网络环境下的端到端延迟基准和混沌测试。
+
+用法: python mock_gateway.py [--port 8080] [--latency-ms 5] [--jitter-ms 2] [--error-rate 0.01] [--drop-rate 0.001]
+然后设置 NADO_GATEWAY_URL / NADO_WS_URL / NADO_ARCHIVE_URL 指向它（启动时会打印）。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from exchanges.nado import DEFAULT_ENDPOINT_ADDR, PRODUCT_IDS, network_config
+from exchanges.nado_signer import order_digest
+from helpers.x18 import X18_ONE
+
+logger = logging.getLogger("MockGateway")
+
+EXECUTE_KINDS = ("place_order", "place_orders", "cancel_orders", "cancel_product_orders")
+
+# Appendix order type bits 9-10 (see NadoClient._build_appendix)
+ORDER_DEFAULT, ORDER_IOC, ORDER_FOK, ORDER_POST_ONLY = 0, 1, 2, 3
+
+DEFAULT_PRODUCTS = {
+    PRODUCT_IDS["BTC"]: ("BTC-PERP", 60000, "1"),
+    PRODUCT_IDS["ETH"]: ("ETH-PERP", 3000, "0.1"),
+    PRODUCT_IDS["SOL"]: ("SOL-PERP", 150, "0.01"),
+}
+
+
+@dataclass
+class FaultConfig:
+    """Latency and chaos knobs; rates are probabilities per request / per frame."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0       # REST request answered with HTTP 500
+    reject_rate: float = 0.0      # /execute answered with status "failure"
+    drop_rate: float = 0.0        # depth frame silently dropped (forces client-side gap detection)
+    disconnect_rate: float = 0.0  # server closes the WS after a frame
+
+    def delay(self) -> float:
+        if not self.latency_ms and not self.jitter_ms:
+            return 0.0
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+
+
+def _to_x18(value) -> int:
+    return int(round(float(value) * 10**6)) * 10**12
+
+
+def _norm_hex(value: str) -> str:
+    value = str(value or "").lower()
+    return value[2:] if value.startswith("0x") else value
+
+
+class _MockProduct:
+    """Random-walk book for one product; levels are X18 ints on a fixed tick grid."""
+
+    def __init__(self, product_id: int, symbol: str, price: float, tick: str, levels: int):
+        self.product_id = product_id
+        self.symbol = symbol
+        self.tick_x18 = _to_x18(tick)
+        self.mid_x18 = _to_x18(price)
+        self.levels = levels
+        self.bids: Dict[int, int] = {}
+        self.asks: Dict[int, int] = {}
+        self.last_ts = 0
+
+    def step(self, vol: float) -> Tuple[List[List[str]], List[List[str]]]:
+        """Move the mid and rebuild the ladder; returns the changed levels as wire deltas."""
+        ticks = round(random.gauss(0, vol) * self.mid_x18 / self.tick_x18)
+        self.mid_x18 = max(self.tick_x18 * 10, self.mid_x18 + ticks * self.tick_x18)
+        best_bid = (self.mid_x18 // self.tick_x18) * self.tick_x18
+        best_ask = best_bid + self.tick_x18
+        bids = {best_bid - k * self.tick_x18: random.randint(1, 50) * 10**16 for k in range(self.levels)}
+        asks = {best_ask + k * self.tick_x18: random.randint(1, 50) * 10**16 for k in range(self.levels)}
+        deltas = []
+        for old, new in ((self.bids, bids), (self.asks, asks)):
+            side = [[str(p), str(s)] for p, s in new.items() if old.get(p) != s]
+            side += [[str(p), "0"] for p in old if p not in new]
+            deltas.append(side)
+        self.bids, self.asks = bids, asks
+        return deltas[0], deltas[1]
+
+    def best_bid(self) -> Optional[int]:
+        return max(self.bids) if self.bids else None
+
+    def best_ask(self) -> Optional[int]:
+        return min(self.asks) if self.asks else None
+
+    def liquidity(self, depth: int) -> Dict[str, Any]:
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return {"product_id": self.product_id,
+                "bids": [[str(p), str(s)] for p, s in bids],
+                "asks": [[str(p), str(s)] for p, s in asks],
+                "timestamp": str(self.last_ts)}
+
+
+class _Subscriber:
+    """One WS client: its channels plus an ordered, latency-delayed send queue."""
+
+    def __init__(self, ws: web.WebSocketResponse, faults: FaultConfig):
+        self.ws = ws
+        self.faults = faults
+        self.channels: Set[str] = set()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._last_due = 0.0
+        self._task = asyncio.create_task(self._writer())
+
+    def send(self, text: str, droppable: bool = False):
+        if droppable and self.faults.drop_rate and random.random() < self.faults.drop_rate:
+            return
+        loop = asyncio.get_running_loop()
+        # Jitter never reorders frames on one connection
+        self._last_due = max(self._last_due, loop.time() + self.faults.delay())
+        self._queue.put_nowait((self._last_due, text))
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due, text = await self._queue.get()
+            wait = due - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self.ws.closed:
+                return
+            await self.ws.send_str(text)
+            if self.faults.disconnect_rate and random.random() < self.faults.disconnect_rate:
+                await self.ws.close()
+                return
+
+    def close(self):
+        self._task.cancel()
+
+
+class MockGateway:
+    """In-process stand-in for the Nado gateway (REST + WS) with a simple matching engine.
+
+    Signatures are not verified. Digests are the EIP-712 order digests for ``chain_id``, which
+    defaults to the chain of the client's network (NADO_NETWORK), so a client pointed at the mock
+    gets back the digests it computed. Accounts are created on first use with ``initial_balance`` USDC.
+    """
+
+    def __init__(self, products: Optional[Dict[int, Tuple[str, float, str]]] = None,
+                 faults: Optional[FaultConfig] = None, tick_interval: float = 0.05, levels: int = 10,
+                 volatility: float = 0.0002, initial_balance: float = 1000.0, chain_id: Optional[int] = None,
+                 seed: Optional[int] = None):
+        if seed is not None:
+            random.seed(seed)
+        self.faults = faults or FaultConfig()
+        self.tick_interval = tick_interval
+        self.volatility = volatility
+        self.initial_balance_x18 = _to_x18(initial_balance)
+        self.chain_id = chain_id if chain_id is not None else network_config()["chain_id"]
+        self.endpoint_addr = DEFAULT_ENDPOINT_ADDR
+        self.products = {pid: _MockProduct(pid, sym, px, tick, levels)
+                         for pid, (sym, px, tick) in (products or DEFAULT_PRODUCTS).items()}
+
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        # sender -> {"spot": x18, "perp": {pid: [amount_x18, v_quote_x18]}}
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.subscribers: List[_Subscriber] = []
+
+        # Benchmark hooks: server-side receive times of /execute calls and last emitted depth per product
+        self.execute_log: deque = deque(maxlen=100_000)
+        self.last_depth_ns: Dict[int, int] = {}
+        self.stats = {"queries": 0, "executes": 0, "errors": 0, "rejects": 0, "fills": 0,
+                      "frames": 0, "ws_clients": 0}
+
+        self.app = web.Application()
+        self.app.router.add_post("/v1/query", self._handle_query)
+        self.app.router.add_post("/v1/execute", self._handle_execute)
+        self.app.router.add_get("/v1/ws", self._handle_ws)
+        self.app.router.add_post("/archive/v1/query", self._handle_archive)
+        self.app.on_startup.append(self._on_startup)
+        self.app.on_cleanup.append(self._on_cleanup)
+        self._runner: Optional[web.AppRunner] = None
+        self._market_task: Optional[asyncio.Task] = None
+        for product in self.products.values():
+            product.step(0)
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Dict[str, str]:
+        """Serve in the running loop; returns the NADO_*_URL values to point a client at."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        return self.urls(host, port)
+
+    @staticmethod
+    def urls(host: str, port: int) -> Dict[str, str]:
+        return {
+            "NADO_GATEWAY_URL": f"http://{host}:{port}/v1",
+            "NADO_WS_URL": f"ws://{host}:{port}/v1/ws",
+            "NADO_ARCHIVE_URL": f"http://{host}:{port}/archive/v1",
+        }
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _on_startup(self, app):
+        self._market_task = asyncio.create_task(self._market_loop())
+
+    async def _on_cleanup(self, app):
+        if self._market_task:
+            self._market_task.cancel()
+        for sub in list(self.subscribers):
+            sub.close()
+            await sub.ws.close()
+
+    # ---------------------------
+    # Market simulation
+    # ---------------------------
+
+    async def _market_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            for product in self.products.values():
+                self._publish_depth(product)
+                self._match_resting(product)
+
+    def _publish_depth(self, product: _MockProduct):
+        prev = product.last_ts
+        bids, asks = product.step(self.volatility)
+        ts = max(time.time_ns(), prev + 1)
+        product.last_ts = ts
+        self.last_depth_ns[product.product_id] = ts
+        if not bids and not asks:
+            return
+        channel = f"depth.{product.product_id}"
+        text = json.dumps({"type": "book_depth", "channel": channel, "data": {
+            "product_id": product.product_id, "min_timestamp": str(prev + 1), "max_timestamp": str(ts),
+            "last_max_timestamp": str(prev), "bids": bids, "asks": asks}})
+        for sub in self.subscribers:
+            if channel in sub.channels:
+                sub.send(text, droppable=True)
+                self.stats["frames"] += 1
+
+    def _account(self, sender: str) -> Dict[str, Any]:
+        acct = self.accounts.get(sender)
+        if acct is None:
+            acct = self.accounts[sender] = {"spot": self.initial_balance_x18, "perp": {}}
+        return acct
+
+    def _fill(self, order: Dict[str, Any], amount_x18: int, price_x18: int, is_taker: bool):
+        """Apply a (signed) fill to the account and push it to the sender's fills channel."""
+        sender, pid = order["sender"], order["product_id"]
+        perp = self._account(sender)["perp"].setdefault(pid, [0, 0])
+        perp[0] += amount_x18
+        perp[1] -= amount_x18 * price_x18 // X18_ONE
+        order["unfilled"] -= amount_x18
+        self.stats["fills"] += 1
+        channel = f"fills.{sender}"
+        text = json.dumps({"type": "fill", "channel": channel, "data": {
+            "product_id": pid, "subaccount": sender, "order_digest": order["digest"],
+            "amount": str(amount_x18), "filled_qty": str(abs(amount_x18)),
+            "remaining_qty": str(abs(order["unfilled"])), "original_qty": str(abs(order["amount"])),
+            "price": str(price_x18), "is_taker": is_taker, "is_bid": amount_x18 > 0,
+            "timestamp": str(time.time_ns())}})
+        for sub in self.subscribers:
+            if channel in sub.channels:
+                sub.send(text)
+
+    def _take(self, order: Dict[str, Any], product: _MockProduct) -> None:
+        """Cross an incoming order against the book up to its limit price."""
+        buy = order["unfilled"] > 0
+        limit = order["price_x18"]
+        book = sorted(product.asks.items()) if buy else sorted(product.bids.items(), reverse=True)
+        for price, size in book:
+            if order["unfilled"] == 0 or (price > limit if buy else price < limit):
+                break
+            qty = min(abs(order["unfilled"]), size)
+            self._fill(order, qty if buy else -qty, price, is_taker=True)
+
+    def _match_resting(self, product: _MockProduct):
+        best_bid, best_ask = product.best_bid(), product.best_ask()
+        for digest, order in list(self.orders.items()):
+            if order["product_id"] != product.product_id:
+                continue
+            buy = order["unfilled"] > 0
+            if (buy and best_ask is not None and best_ask <= order["price_x18"]) or \
+                    (not buy and best_bid is not None and best_bid >= order["price_x18"]):
+                self._fill(order, order["unfilled"], order["price_x18"], is_taker=False)
+                del self.orders[digest]
+
+    # ---------------------------
+    # HTTP plumbing
+    # ---------------------------
+
+    async def _inject(self) -> Optional[web.Response]:
+        delay = self.faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.faults.error_rate and random.random() < self.faults.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=500, text="injected gateway error")
+        return None
+
+    @staticmethod
+    def _success(data: Any, request_type: str) -> Dict[str, Any]:
+        return {"status": "success", "data": data, "request_type": request_type}
+
+    @staticmethod
+    def _failure(error: str, request_type: str, code: int = 1000) -> Dict[str, Any]:
+        return {"status": "failure", "error": error, "error_code": code, "request_type": request_type}
+
+    def _ok(self, data: Any, request_type: str) -> web.Response:
+        return web.json_response(self._success(data, request_type))
+
+    def _fail(self, error: str, request_type: str, code: int = 1000) -> web.Response:
+        return web.json_response(self._failure(error, request_type, code))
+
+    # ---------------------------
+    # /query
+    # ---------------------------
+
+    async def _handle_query(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.stats["queries"] += 1
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        kind = body.get("type")
+        request_type = f"query_{kind}"
+        if kind == "status":
+            return self._ok("active", request_type)
+        if kind == "all_products":
+            return self._ok(self._all_products(), request_type)
+        if kind == "contracts":
+            return self._ok({"chain_id": str(self.chain_id), "endpoint_addr": self.endpoint_addr}, request_type)
+        if kind == "symbols":
+            return self._ok({"symbols": {p.symbol: {"type": "perp", "product_id": p.product_id, "symbol": p.symbol,
+                                                    "price_increment_x18": str(p.tick_x18),
+                                                    "min_size": str(10**16)}
+                                         for p in self.products.values()}}, request_type)
+        if kind == "subaccount_info":
+            return self._ok(self._subaccount_info(_norm_hex(body.get("subaccount"))), request_type)
+        if kind == "subaccount_orders":
+            sender = _norm_hex(body.get("sender"))
+            pid = int(body.get("product_id", 0))
+            orders = [self._order_view(o) for o in self.orders.values()
+                      if o["sender"] == sender and o["product_id"] == pid]
+            return self._ok({"sender": sender, "product_id": pid, "orders": orders}, request_type)
+        if kind == "market_liquidity":
+            product = self.products.get(int(body.get("product_id", 0)))
+            if product is None:
+                return self._fail("invalid product_id", request_type, 2000)
+            return self._ok(product.liquidity(int(body.get("depth", 10))), request_type)
+        return self._fail(f"unsupported query type: {kind}", request_type)
+
+    def _all_products(self) -> Dict[str, Any]:
+        return {
+            "spot_products": [{"product_id": 0, "oracle_price_x18": str(X18_ONE)}],
+            "perp_products": [{"product_id": p.product_id, "oracle_price_x18": str(p.mid_x18),
+                               "book_info": {"price_increment_x18": str(p.tick_x18),
+                                             "size_increment": str(10**16)}}
+                              for p in self.products.values()],
+        }
+
+    def _subaccount_info(self, sender: str) -> Dict[str, Any]:
+        acct = self._account(sender)
+        perp_balances = []
+        health = acct["spot"]
+        for pid, (amount, v_quote) in acct["perp"].items():
+            perp_balances.append({"product_id": pid,
+                                  "balance": {"amount": str(amount), "v_quote_balance": str(v_quote)}})
+            health += v_quote + amount * self.products[pid].mid_x18 // X18_ONE
+        return {
+            "subaccount": "0x" + sender,
+            "exists": True,
+            "healths": [{"health": str(health)}, {"health": str(health)}, {"health": str(health)}],
+            "spot_balances": [{"product_id": 0, "balance": {"amount": str(acct["spot"])}}],
+            "perp_balances": perp_balances,
+            "spot_products": [{"product_id": 0, "oracle_price_x18": str(X18_ONE)}],
+            "perp_products": self._all_products()["perp_products"],
+        }
+
+    @staticmethod
+    def _order_view(order: Dict[str, Any]) -> Dict[str, Any]:
+        return {"product_id": order["product_id"], "sender": order["sender"],
+                "price_x18": str(order["price_x18"]), "amount": str(order["unfilled"]),
+                "unfilled_amount": str(order["unfilled"]), "expiration": order["expiration"],
+                "nonce": order["nonce"], "appendix": order["appendix"], "digest": order["digest"],
+                "placed_at": order["placed_at"]}
+
+    # ---------------------------
+    # /execute
+    # ---------------------------
+
+    async def _handle_execute(self, request: web.Request) -> web.Response:
+        recv_ns = time.time_ns()
+        body = await request.json()
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        return web.json_response(self._execute(body, recv_ns))
+
+    def _execute(self, body: Any, recv_ns: int) -> Dict[str, Any]:
+        """One execute, shared by POST /execute and execute messages on /ws."""
+        self.stats["executes"] += 1
+        self.execute_log.append(recv_ns)
+        kind = next(iter(body), "") if isinstance(body, dict) else ""
+        request_type = f"execute_{kind}"
+        if self.faults.reject_rate and random.random() < self.faults.reject_rate:
+            self.stats["rejects"] += 1
+            return self._failure("injected rejection", request_type, 2064)
+        if kind == "place_orders":
+            results = [self._place(item) for item in body[kind].get("orders", [])]
+            return self._success(results, request_type)
+        if kind == "place_order":
+            result = self._place(body[kind])
+            if "error" in result:
+                return self._failure(result["error"], request_type)
+            return self._success(result, request_type)
+        if kind == "cancel_orders":
+            tx = body[kind].get("tx", {})
+            digests = {"0x" + _norm_hex(d) for d in tx.get("digests", [])}
+            return self._success({"cancelled_orders": self._cancel(_norm_hex(tx.get("sender")),
+                                                                   lambda o: o["digest"] in digests)}, request_type)
+        if kind == "cancel_product_orders":
+            tx = body[kind].get("tx", {})
+            pids = {int(p) for p in tx.get("productIds", [])}
+            return self._success({"cancelled_orders": self._cancel(_norm_hex(tx.get("sender")),
+                                                                   lambda o: not pids or o["product_id"] in pids)},
+                                 request_type)
+        return self._failure(f"unsupported execute type: {kind}", request_type)
+
+    def _place(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        pid = int(item.get("product_id", 0))
+        product = self.products.get(pid)
+        if product is None:
+            return {"error": f"invalid product_id {pid}"}
+        raw = item.get("order", {})
+        try:
+            price_x18, amount = int(raw["priceX18"]), int(raw["amount"])
+            appendix = int(raw.get("appendix", 0))
+            digest = "0x" + order_digest(raw, self.chain_id, pid).hex()
+        except (KeyError, ValueError) as e:
+            return {"error": f"malformed order: {e}"}
+        if amount == 0 or price_x18 <= 0:
+            return {"error": "invalid amount or price"}
+        if price_x18 % product.tick_x18:
+            return {"error": "price not a multiple of price_increment_x18"}
+
+        order = {"digest": digest, "product_id": pid, "sender": _norm_hex(raw.get("sender")),
+                 "price_x18": price_x18, "amount": amount, "unfilled": amount,
+                 "expiration": str(raw.get("expiration", "0")), "nonce": str(raw.get("nonce", "0")),
+                 "appendix": str(appendix), "placed_at": int(time.time())}
+        order_type = (appendix >> 9) & 3
+
+        best_bid, best_ask = product.best_bid(), product.best_ask()
+        crosses = (amount > 0 and best_ask is not None and price_x18 >= best_ask) or \
+                  (amount < 0 and best_bid is not None and price_x18 <= best_bid)
+        if order_type == ORDER_POST_ONLY and crosses:
+            return {"error": "post-only order crosses the book"}
+        if order_type == ORDER_FOK:
+            side = product.asks if amount > 0 else product.bids
+            avail = sum(s for p, s in side.items() if (p <= price_x18 if amount > 0 else p >= price_x18))
+            if avail < abs(amount):
+                return {"error": "FOK order could not be filled"}
+        if crosses:
+            self._take(order, product)
+        if order["unfilled"] and order_type == ORDER_DEFAULT:
+            self.orders[digest] = order
+        return {"digest": digest}
+
+    def _cancel(self, sender: str, match) -> List[Dict[str, Any]]:
+        cancelled = []
+        for digest, order in list(self.orders.items()):
+            if order["sender"] == sender and match(order):
+                cancelled.append(self._order_view(self.orders.pop(digest)))
+        return cancelled
+
+    # ---------------------------
+    # Archive (indexer) - only what NadoClient reads
+    # ---------------------------
+
+    async def _handle_archive(self, request: web.Request) -> web.Response:
+        injected = await self._inject()
+        if injected is not None:
+            return injected
+        return web.json_response({"data": {"matches": []}})
+
+    # ---------------------------
+    # /ws
+    # ---------------------------
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        sub = _Subscriber(ws, self.faults)
+        self.subscribers.append(sub)
+        self.stats["ws_clients"] += 1
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    body = json.loads(msg.data)
+                except ValueError:
+                    sub.send(json.dumps({"type": "error", "error": "malformed json"}))
+                    continue
+                kind, channel = body.get("type"), body.get("channel")
+                if kind == "subscribe" and channel:
+                    sub.channels.add(channel)
+                    sub.send(json.dumps({"type": "subscribed", "channel": channel}))
+                elif kind == "unsubscribe" and channel:
+                    sub.channels.discard(channel)
+                    sub.send(json.dumps({"type": "unsubscribed", "channel": channel}))
+                elif kind == "ping":
+                    sub.send(json.dumps({"type": "pong", "time": body.get("time")}))
+                elif kind is None and isinstance(body, dict) and next(iter(body), "") in EXECUTE_KINDS:
+                    # Execute over the socket: same handling as POST /execute, response echoes "id"
+                    request_id = body.pop("id", None)
+                    response = self._execute(body, time.time_ns())
+                    response["id"] = request_id
+                    sub.send(json.dumps(response))
+        finally:
+            sub.close()
+            self.subscribers.remove(sub)
+        return ws
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in Nado gateway")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--tick-ms", type=float, default=50, help="depth update interval")
+    parser.add_argument("--levels", type=int, default=10, help="book levels per side")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    faults = FaultConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.reject_rate,
+                         args.drop_rate, args.disconnect_rate)
+    gateway = MockGateway(faults=faults, tick_interval=args.tick_ms / 1000, levels=args.levels, seed=args.seed)
+    for key, value in MockGateway.urls(args.host, args.port).items():
+        print(f"export {key}={value}")
+    web.run_app(gateway.app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
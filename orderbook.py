@@ -0,0 +1,318 @@
+"""
+本地订单簿 (Local Order Book)
+作用：以有序价格阶梯维护买卖盘，缓存最优买卖价，为做市/Taker 策略提供常数时间的盘口读取。
+"""
+
+import asyncio
+import logging
+import operator
+from bisect import bisect_left
+from collections import deque
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from helpers.depth_frame import DepthFrame, depth_frame_from_snapshot
+from helpers.x18 import X18, x18_to_decimal
+
+logger = logging.getLogger("OrderBook")
+
+
+class BookSnapshot(NamedTuple):
+    """Read-only view of both ladders (raw X18 integers), best level first.
+
+    The lists are the book's own arrays (no copy). They stay valid until the
+    next mutation, so read them without awaiting in between.
+    """
+    bid_prices: List[int]
+    bid_sizes: List[int]
+    ask_prices: List[int]
+    ask_sizes: List[int]
+
+
+class _PriceLadder:
+    """One side of the book: parallel price/size arrays sorted best-first."""
+    __slots__ = ('prices', 'sizes', '_key')
+
+    def __init__(self, descending: bool):
+        self.prices: List[int] = []
+        self.sizes: List[int] = []
+        # bisect needs an ascending key; bids are stored highest-first
+        self._key = operator.neg if descending else None
+
+    def _index(self, price) -> int:
+        if self._key is None:
+            return bisect_left(self.prices, price)
+        return bisect_left(self.prices, -price, key=self._key)
+
+    def set(self, price, size):
+        """Insert, replace or (size == 0) remove a level."""
+        prices = self.prices
+        i = self._index(price)
+        if i < len(prices) and prices[i] == price:
+            if size == 0:
+                del prices[i]
+                del self.sizes[i]
+            else:
+                self.sizes[i] = size
+        elif size != 0:
+            prices.insert(i, price)
+            self.sizes.insert(i, size)
+
+    def clear(self):
+        self.prices.clear()
+        self.sizes.clear()
+
+    def replace(self, levels):
+        """Replace the whole side with (price, size) levels in any order."""
+        merged = {}
+        for p, s in levels:
+            s = int(s)
+            if s:
+                merged[int(p)] = s
+            else:
+                merged.pop(int(p), None)
+        prices = sorted(merged, reverse=self._key is not None)
+        self.prices[:] = prices
+        self.sizes[:] = [merged[p] for p in prices]
+
+    def best(self) -> Optional[Tuple[int, int]]:
+        if not self.prices:
+            return None
+        return self.prices[0], self.sizes[0]
+
+    def depth(self, n: int) -> List[Tuple[int, int]]:
+        return list(zip(self.prices[:n], self.sizes[:n]))
+
+    def __len__(self):
+        return len(self.prices)
+
+
+class LocalOrderBook:
+    """Sorted, array-backed local copy of the orderbook.
+
+    Both sides are kept best-first, so top-of-book reads are O(1) regardless of depth.
+    Prices and sizes are raw X18 integers straight from the wire; conversion to
+    Decimal only happens in get_mid_price().
+    """
+    def __init__(self):
+        self._bids = _PriceLadder(descending=True)
+        self._asks = _PriceLadder(descending=False)
+        self.lock = asyncio.Lock()
+        # Set by DepthSynchronizer while a gap is being repaired; strategies must not quote off a stale book
+        self.stale = False
+
+    async def update(self, side: str, price: int, size: int):
+        """Update a level safely."""
+        async with self.lock:
+            ladder = self._bids if side == 'buy' else self._asks
+            ladder.set(price, size)
+
+    async def apply_levels(self, bids, asks, is_snapshot: bool = False):
+        """Apply one depth message atomically under a single lock acquisition.
+
+        bids/asks are iterables of (price, size) pairs in X18 (ints or wire strings).
+        A snapshot replaces both sides; otherwise levels are merged as deltas.
+        """
+        async with self.lock:
+            if is_snapshot:
+                self._bids.replace(bids)
+                self._asks.replace(asks)
+                return
+            bid_set = self._bids.set
+            for p, s in bids:
+                bid_set(int(p), int(s))
+            ask_set = self._asks.set
+            for p, s in asks:
+                ask_set(int(p), int(s))
+
+    def best_bid(self) -> Optional[Tuple[int, int]]:
+        """(price, size) of the best bid, or None if the side is empty."""
+        return self._bids.best()
+
+    def best_ask(self) -> Optional[Tuple[int, int]]:
+        """(price, size) of the best ask, or None if the side is empty."""
+        return self._asks.best()
+
+    def depth(self, n: int) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Top-N (price, size) levels of each side, best first."""
+        return self._bids.depth(n), self._asks.depth(n)
+
+    def snapshot(self) -> BookSnapshot:
+        """Zero-copy view of the full book (see BookSnapshot)."""
+        return BookSnapshot(self._bids.prices, self._bids.sizes, self._asks.prices, self._asks.sizes)
+
+    def clear(self):
+        self._bids.clear()
+        self._asks.clear()
+
+    @property
+    def bid_levels(self) -> int:
+        return len(self._bids)
+
+    @property
+    def ask_levels(self) -> int:
+        return len(self._asks)
+
+    def get_mid_price_x18(self) -> X18:
+        """Mid price as X18 (0 if either side is empty)."""
+        if not self._bids.prices or not self._asks.prices:
+            return X18(0)
+        return X18((self._bids.prices[0] + self._asks.prices[0]) // 2)
+
+    async def get_mid_price(self) -> Decimal:
+        async with self.lock:
+            if not self._bids.prices or not self._asks.prices:
+                return Decimal(0)
+            return x18_to_decimal(self._bids.prices[0] + self._asks.prices[0]) / 2
+
+
+class DepthSynchronizer:
+    """Applies one product's depth stream to a LocalOrderBook with gap detection.
+
+    Nado depth events carry ``max_timestamp`` and ``last_max_timestamp`` (the previous
+    event's ``max_timestamp``); feeds that send a plain ``seq``/``sequence`` are handled too.
+    On a gap the book is marked stale, deltas are buffered, a ``market_liquidity``
+    snapshot is fetched and the buffered deltas newer than it are replayed. Deltas stay
+    buffered until a replay is contiguous, so a retry with a newer snapshot still has them.
+    """
+
+    def __init__(self, book: LocalOrderBook, fetch_snapshot: Callable[[], Awaitable[Dict[str, Any]]],
+                 max_buffer: int = 2000, max_attempts: int = 3):
+        self.book = book
+        self.fetch_snapshot = fetch_snapshot
+        self.max_attempts = max_attempts
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._last_ts: Optional[int] = None
+        self._last_seq: Optional[int] = None
+        # Snapshot had no timestamp: accept the next delta as the new baseline
+        self._trust_next = False
+        self._resync_task: Optional[asyncio.Task] = None
+        self.gaps = 0
+        self.resyncs = 0
+
+    def reset(self):
+        """Forget sequencing state (e.g. after a reconnect); the next delta triggers a resync."""
+        self._last_ts = None
+        self._last_seq = None
+        self._trust_next = False
+        self._buffer.clear()
+
+    def _in_sequence(self, frame: DepthFrame) -> Optional[bool]:
+        """True = contiguous, False = gap, None = stale/duplicate (drop)."""
+        max_ts, seq = frame.max_ts, frame.seq
+        if max_ts is not None and self._last_ts is not None:
+            if max_ts <= self._last_ts:
+                return None
+            if frame.last_max_ts is not None:
+                return frame.last_max_ts == self._last_ts
+            return True
+        if seq is not None and self._last_seq is not None:
+            if seq <= self._last_seq:
+                return None
+            return seq == self._last_seq + 1
+        if self._last_ts is not None or self._last_seq is not None:
+            return True
+        # No baseline yet (fresh start / reconnect) or a feed without sequencing fields
+        return self._trust_next or (max_ts is None and seq is None)
+
+    def _advance(self, frame: DepthFrame):
+        if frame.max_ts is not None:
+            self._last_ts = frame.max_ts
+        if frame.seq is not None:
+            self._last_seq = frame.seq
+
+    async def on_depth(self, frame: DepthFrame):
+        """Feed one decoded depth frame."""
+        if frame.is_snapshot:
+            await self.book.apply_levels(frame.bids, frame.asks, is_snapshot=True)
+            self._advance(frame)
+            return
+
+        if self._resync_task and not self._resync_task.done():
+            self._buffer.append(frame)
+            return
+
+        ok = self._in_sequence(frame)
+        if ok is None:
+            return
+        if ok:
+            await self.book.apply_levels(frame.bids, frame.asks)
+            self._advance(frame)
+            return
+
+        if self._last_ts is not None or self._last_seq is not None:
+            self.gaps += 1
+            prev = frame.last_max_ts if frame.last_max_ts is not None else frame.seq
+            logger.warning(f"Depth gap detected (last={self._last_ts or self._last_seq}, got prev={prev}). "
+                           f"Resyncing book...")
+        self.book.stale = True
+        self._buffer.append(frame)
+        self._resync_task = asyncio.create_task(self._resync())
+
+    async def resync(self):
+        """Rebuild the book from a snapshot now (e.g. the stream went silent); joins a running resync."""
+        if self._resync_task is None or self._resync_task.done():
+            self.book.stale = True
+            self._resync_task = asyncio.create_task(self._resync())
+        await asyncio.shield(self._resync_task)
+
+    async def _resync(self):
+        """Snapshot + replay loop; keeps the book stale until it is contiguous again."""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                snap = await self.fetch_snapshot()
+                if not snap or 'bids' not in snap:
+                    raise ValueError("empty market_liquidity snapshot")
+                snap_frame = depth_frame_from_snapshot(snap)
+                snap_ts = snap_frame.max_ts
+
+                await self.book.apply_levels(snap_frame.bids, snap_frame.asks, is_snapshot=True)
+                self._last_ts = snap_ts
+                self._last_seq = None
+                self._trust_next = snap_ts is None
+
+                if not await self._replay(snap_ts):
+                    logger.warning(f"Buffered deltas not contiguous with the snapshot (attempt {attempt}), retrying...")
+                    await asyncio.sleep(0.2 * attempt)
+                    continue
+
+                self.resyncs += 1
+                self.book.stale = False
+                logger.info(f"Depth book resynced (snapshot ts={snap_ts}, total resyncs={self.resyncs})")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Depth resync failed (attempt {attempt}/{self.max_attempts}): {e}")
+                await asyncio.sleep(0.5 * attempt)
+        # Give up for now; the next delta re-triggers a resync
+        self.reset()
+
+    async def _replay(self, snap_ts: Optional[int]) -> bool:
+        """Apply the buffered deltas the snapshot does not cover, in order.
+
+        Returns False at the first delta that does not continue the book (the snapshot is
+        older than the buffer, or a second gap); every delta newer than the snapshot is then
+        put back so the next attempt can replay it on top of a newer snapshot.
+        """
+        applied = []
+        while self._buffer:
+            delta = self._buffer[0]
+            if snap_ts is not None and delta.max_ts is not None and delta.max_ts <= snap_ts:
+                self._buffer.popleft()  # already in the snapshot
+                continue
+            if snap_ts is not None and self._last_ts == snap_ts:
+                # First delta after the snapshot: its range must start at or before it
+                ok = delta.last_max_ts is None or delta.last_max_ts <= snap_ts
+            else:
+                ok = self._in_sequence(delta)
+            if ok is None:
+                self._buffer.popleft()
+                continue
+            if not ok:
+                self._buffer = deque(applied + list(self._buffer), maxlen=self._buffer.maxlen)
+                return False
+            applied.append(self._buffer.popleft())
+            await self.book.apply_levels(delta.bids, delta.asks)
+            self._advance(delta)
+        return True
@@ -2,7 +2,9 @@
 import time
 from decimal import Decimal
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from exchanges.nado_account import AccountStateService
 
 logger = logging.getLogger("PnLTracker")
 
@@ -20,91 +22,37 @@ class PnLTracker:
         self.liq_price = 0
         self.active_pos = Decimal("0")
         
-    async def update(self) -> Dict[str, Any]:
-        """Fetch account state, calculate equity, and update PnL."""
+        # Clients without their own account service (e.g. the backtest sim) get an uncached one
+        self.account = getattr(client, 'account_state', None) or AccountStateService(client, ttl_ms=0)
+        
+    async def update(self, max_age_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Read account state (shared subaccount_info snapshot), calculate equity, and update PnL."""
         try:
-            # 1. Fetch Subaccount Info
-            sender = self.client._subaccount_to_bytes32(self.client.wallet_address, self.client.subaccount_name)
-            payload = {"type": "subaccount_info", "subaccount": sender}
-            res = await self.client._post("/query", payload)
-            
-            data = res.get('data', {})
-            if not data:
+            # 1. Fetch Subaccount Info (cached / coalesced with the client's other account queries)
+            snapshot = await self.account.get(max_age_ms)
+            if snapshot.empty:
                 return {}
                 
-            # 2. Calculate Spot Balance (Product 0 = USDC usually)
-            spot_val = Decimal("0")
-            for s in data.get('spot_balances', []):
-                if int(s.get('product_id')) == 0:
-                    spot_val = Decimal(s['balance']['amount']) / Decimal(10**18)
-                    break
-            
-            # 3. Calculate Perp Unrealized PnL
-            # Equity = Spot + Sum(Pos * Price + v_quote)
-            # wait, formula for Equity in Vertex:
-            # Equity = Spot_Balance + Sum(v_quote_balance + (Position * OraclePrice))
-            # Wait, v_quote_balance is the entry cost (negative if long, positive if short?)
-            # Let's verify formula.
-            # If Long 1 ETH @ 3000. Cost -3000 USDC. v_quote = -3000.
-            # Value = (-3000) + (1 * CurrentPrice).
-            # If CurrentPrice = 3100 -> -3000 + 3100 = +100.
-            # Correct.
-            
-            perp_val = Decimal("0")
-            
-            # We need oracle prices for all products.
-            # subaccount_info response *sometimes* includes oracle prices in `spot_products`/`perp_products`?
-            # Looking at probe result: data['perp_products'] list contains 'oracle_price_x18'.
-            # Yes! It's all there.
-            
-            prices = {}
-            for p in data.get('perp_products', []):
-                pid = int(p.get('product_id'))
-                px = Decimal(p.get('oracle_price_x18', "0")) / Decimal(10**18)
-                prices[pid] = px
-                
-            for p in data.get('perp_balances', []):
-                pid = int(p.get('product_id'))
-                amt = Decimal(p['balance']['amount']) / Decimal(10**18)
-                v_quote = Decimal(p['balance']['v_quote_balance']) / Decimal(10**18)
-                
-                oracle_price = prices.get(pid, Decimal("0"))
-                
-                # Equity Contribution = v_quote + (amt * oracle)
-                # Note: v_quote includes funding? 
-                # Yes, v_quote is "virtual quote balance".
-                
-                term_val = v_quote + (amt * oracle_price)
-                perp_val += term_val
-                
-            total_equity = spot_val + perp_val
+            # 2-3. Equity = Spot (Product 0 = USDC) + Sum(v_quote_balance + Position * OraclePrice)
+            # v_quote is the entry cost: Long 1 ETH @ 3000 -> v_quote = -3000,
+            # at 3100 the position is worth -3000 + 3100 = +100.
+            # Oracle prices come from data['perp_products'] of the same response.
+            total_equity = snapshot.equity()
             
             # --- Advanced Docs: Health & Liq Price ---
-            # Health is already fetched in Step 1 (but not parsed completely)
-            current_health = Decimal("0")
-            if 'healths' in data:
-                # Use health[0] (Maintenance) or health[1] (Initial)?
-                # Usually we care about Maintenance for Liquidation.
-                # data['healths'][0] is typically Maintenance.
-                current_health = Decimal(data['healths'][0].get('health', 0)) / Decimal(10**18)
+            # healths[0] is Maintenance health, the one that matters for liquidation
+            current_health = snapshot.health(0)
                 
-            # Calc Liq Price for the ACTIVE position (e.g. Product 4)
-            # We need to know which product we are botting. 
-            # The bot sets client.product_id.
+            # Calc Liq Price for the ACTIVE position (the bot sets client.product_id)
             liq_price = 0
             active_pos = Decimal("0")
-            
-            # Find active position
             if self.client.product_id:
-                for p in data.get('perp_balances', []):
-                    if int(p.get('product_id')) == getattr(self.client, 'product_id', 4):
-                        active_pos = Decimal(p['balance']['amount']) / Decimal(10**18)
-                        break
+                active_pos = snapshot.position(self.client.product_id)
             
             # Approx Liq Price = CurrentPrice - (Health / Position)
             # Only valid if position != 0
-            if active_pos != 0 and self.client.product_id in prices:
-                curr_px = prices[self.client.product_id]
+            if active_pos != 0 and self.client.product_id in snapshot.oracle_prices:
+                curr_px = snapshot.oracle_price(self.client.product_id)
                 try:
                     liq_diff = current_health / active_pos
                     liq_price = float(curr_px - liq_diff)
@@ -0,0 +1,112 @@
+"""
+Unit tests for NonceAllocator (exchanges/nado.py).
+
+Covers the ``(recv_time_ms << 20) | low bits`` layout, lanes, monotonicity
+when the local clock steps back, lane overflow into the next millisecond,
+concurrent allocation from several threads and the Date-header offset bracket.
+
+用法: python -m pytest -q test_nado_nonces.py  (或 python test_nado_nonces.py)
+"""
+
+import threading
+import unittest
+
+from exchanges.nado import NonceAllocator
+
+LOW_MASK = (1 << 20) - 1
+LANE_SPAN = 1 << NonceAllocator.LANE_BITS
+NOW = 1_700_000_000.0
+
+
+class FakeClock:
+    """Settable local clock (seconds)."""
+
+    def __init__(self, now: float = NOW):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestNonceAllocator(unittest.TestCase):
+    """NonceAllocator must hand out strictly increasing nonces per lane."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.nonces = NonceAllocator(clock=self.clock)
+
+    def test_layout(self):
+        """Test recv_time_ms in the high bits, then the lane bit, then the per-ms counter."""
+        first, second = self.nonces.allocate(2, lead_ms=10_000)
+        self.assertEqual(first >> 20, int(NOW * 1000) + 10_000)
+        self.assertEqual(first & LOW_MASK, 0)
+        self.assertEqual(second, first + 1)
+
+        ladder = self.nonces.next(lead_ms=10_000, lane=1)
+        self.assertEqual(ladder >> 20, int(NOW * 1000) + 10_000)
+        self.assertEqual(ladder & LOW_MASK, LANE_SPAN)
+
+        self.clock.now += 0.005
+        self.assertEqual(self.nonces.next(lead_ms=10_000) & LOW_MASK, 0)
+
+    def test_monotonic_when_clock_steps_back(self):
+        """Test that a backwards clock step never repeats or lowers a nonce."""
+        before = self.nonces.allocate(3)
+        self.clock.now -= 5.0
+        after = self.nonces.allocate(3)
+        sequence = before + after
+        self.assertEqual(sequence, sorted(set(sequence)))
+        self.assertEqual(after[0] >> 20, before[-1] >> 20)
+
+        self.clock.now += 10.0
+        later = self.nonces.next()
+        self.assertEqual(later >> 20, int(self.clock.now * 1000) + 10_000)
+        self.assertGreater(later, after[-1])
+
+    def test_lane_overflow_carries_into_next_ms(self):
+        """Test that an exhausted lane counter moves to the next millisecond, not into the other lane."""
+        allocated = self.nonces.allocate(LANE_SPAN + 2)
+        ms = int(NOW * 1000) + 10_000
+        self.assertEqual(allocated[LANE_SPAN - 1], (ms << 20) | (LANE_SPAN - 1))
+        self.assertEqual(allocated[LANE_SPAN:], [((ms + 1) << 20), ((ms + 1) << 20) | 1])
+        self.assertFalse(any(n & LANE_SPAN for n in allocated))
+        self.assertTrue(all(a < b for a, b in zip(allocated, allocated[1:])))
+
+        # The clock catching up with the carried millisecond must not reuse its counters
+        self.clock.now += 0.001
+        self.assertEqual(self.nonces.next(), ((ms + 1) << 20) | 2)
+
+    def test_concurrent_next(self):
+        """Test next() from several threads: no duplicates, each thread sees increasing nonces."""
+        per_thread, threads = 2000, 8
+        results = [[] for _ in range(threads)]
+        start = threading.Barrier(threads)
+
+        def worker(out):
+            start.wait()
+            for _ in range(per_thread):
+                out.append(self.nonces.next())
+
+        pool = [threading.Thread(target=worker, args=(out,)) for out in results]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+        combined = [n for out in results for n in out]
+        self.assertEqual(len(set(combined)), per_thread * threads)
+        for out in results:
+            self.assertEqual(out, sorted(out))
+
+    def test_date_header_offset(self):
+        """Test that a Date header sample brackets the offset and shifts recv_time."""
+        # Server clock 3s ahead; the header truncates to the second
+        self.nonces.observe_date_header("Tue, 14 Nov 2023 22:13:23 GMT", NOW - 0.1, NOW + 0.1)
+        self.assertAlmostEqual(self.nonces.offset, 3.5, places=6)
+        self.assertAlmostEqual(self.nonces.uncertainty, 0.6, places=6)
+        self.assertEqual(self.nonces.next(lead_ms=0) >> 20, int((NOW + 3.5) * 1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
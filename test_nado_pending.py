@@ -0,0 +1,146 @@
+"""
+Unit tests for NadoClient's pending-order table (exchanges/nado.py).
+
+Orders are tracked under their local EIP-712 digest as soon as they are
+signed, marked open or dropped by the place response, settled by WS fills and
+order updates, and reconciled against subaccount_orders snapshots. The
+gateway is stubbed at ``_execute`` / ``_post``; nothing leaves the process.
+
+用法: python -m pytest -q test_nado_pending.py  (或 python test_nado_pending.py)
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+# Fixed throwaway key; logs go to a temporary directory
+os.environ.setdefault("NADO_PRIVATE_KEY", "0x" + "11" * 32)
+os.environ["NADO_LOGS_DIR"] = tempfile.mkdtemp(prefix="nado-test-logs-")
+
+from exchanges.nado import NadoClient
+from hft_bot import TradingConfig
+
+QUOTE = [(Decimal("0.01"), "buy", Decimal("2999.9")), (Decimal("0.01"), "sell", Decimal("3000.1"))]
+
+
+def _success(digests):
+    return {"status": "success", "data": [{"digest": d} for d in digests]}
+
+
+class TestPendingOrders(unittest.TestCase):
+    """The pending table must follow placements, fills, rejects and open-order snapshots."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = NadoClient(TradingConfig(ticker="ETH", tick_size=Decimal("0.1")))
+        self.client.product_id = 4
+        self.client.endpoint_addr = "0x05ec92d78ed421f3d3ada77ffde167106565974e"
+        self.responses = []
+        self.sent = []
+
+        async def execute(payload):
+            self.sent.append(payload)
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response(payload) if callable(response) else response
+
+        self.client._execute = execute
+
+    def _place_quote(self, response):
+        self.responses.append(response)
+        return asyncio.run(self.client.place_batch_open_orders(QUOTE))
+
+    def _echo_digests(self, payload):
+        """Success response echoing the digests the client computed for this payload."""
+        return _success([o.digest for o in self.client.tracked_orders()])
+
+    def test_insert_on_sign(self):
+        """Test that signed orders are tracked as pending before any response."""
+        _, digests = asyncio.run(self.client._sign_place_orders(QUOTE))
+        tracked = self.client.tracked_orders(4)
+        self.assertEqual([o.digest for o in tracked], digests)
+        self.assertEqual([o.status for o in tracked], ["pending", "pending"])
+        self.assertEqual([o.side for o in tracked], ["buy", "sell"])
+        self.assertEqual(tracked[0].amount_x18, 10**16)
+        self.assertEqual(tracked[1].amount_x18, -10**16)
+        self.assertEqual(tracked[1].price_x18, 3000_1 * 10**17)
+        self.assertEqual(self.client.tracked_orders(2), [])
+
+    def test_open_on_place(self):
+        """Test that a successful placement marks the orders open under the gateway digests."""
+        result = self._place_quote(self._echo_digests)
+        self.assertTrue(result.success)
+        tracked = self.client.tracked_orders()
+        self.assertEqual([o.digest for o in tracked], result.order_ids)
+        self.assertEqual({o.status for o in tracked}, {"open"})
+
+    def test_settle_on_fill(self):
+        """Test that partial fills shrink the tracked size and a full fill drops the order."""
+        buy, sell = self._place_quote(self._echo_digests).order_ids
+        self.client._settle_pending(sell, remaining_x18=4 * 10**15)
+        self.assertEqual(self.client._pending_orders[sell].amount_x18, -4 * 10**15)
+        self.client._settle_pending(sell.upper().replace("0X", ""), remaining_x18=0)
+        self.assertEqual([o.digest for o in self.client.tracked_orders()], [buy])
+        self.client._settle_pending(buy, reason="cancelled")
+        self.assertEqual(self.client.tracked_orders(), [])
+        # Unknown digests and fills without a remaining size are ignored
+        self.client._settle_pending("0x" + "ff" * 32, remaining_x18=0)
+        self.client._settle_pending(None)
+
+    def test_drop_on_reject(self):
+        """Test that rejected batches, rejected items and failed sends leave nothing tracked."""
+        self.assertFalse(self._place_quote({"status": "failure", "error": "rejected"}).success)
+        self.assertEqual(self.client.tracked_orders(), [])
+
+        def first_rejected(payload):
+            digests = [o.digest for o in self.client.tracked_orders()]
+            return {"status": "success", "data": [{"error": "post-only crosses"}, {"digest": digests[1]}]}
+
+        result = self._place_quote(first_rejected)
+        self.assertEqual(result.order_ids[0], None)
+        self.assertEqual([o.digest for o in self.client.tracked_orders()], [result.order_ids[1]])
+
+        self.client._pending_orders.clear()
+        self.assertFalse(self._place_quote(ConnectionError("socket closed")).success)
+        self.assertEqual(self.client.tracked_orders(), [])
+
+    def test_ioc_not_kept(self):
+        """Test that a filled IOC order leaves the table once the gateway answers."""
+        self.responses.append(self._echo_digests)
+        result = asyncio.run(self.client.place_open_order("4", Decimal("0.01"), "buy", Decimal("3000.1"), order_type=1))
+        self.assertTrue(result.success)
+        self.assertEqual(self.client.tracked_orders(), [])
+
+    def test_reconcile_with_open_orders_snapshot(self):
+        """Test that open orders missing from subaccount_orders are dropped, in-flight ones kept."""
+        buy, sell = self._place_quote(self._echo_digests).order_ids
+        _, (in_flight,) = asyncio.run(self.client._sign_place_orders(QUOTE[:1]))
+
+        async def post(endpoint, payload):
+            self.assertEqual(payload["type"], "subaccount_orders")
+            return {"status": "success", "data": {"orders": [
+                {"digest": buy, "order": {"amount": str(10**16), "priceX18": str(2999_9 * 10**17)}}]}}
+
+        self.client._post = post
+        orders = asyncio.run(self.client.get_active_orders("4"))
+        self.assertEqual([o.order_id for o in orders], [buy])
+        self.assertEqual(sorted(o.digest for o in self.client.tracked_orders()), sorted([buy, in_flight]))
+        self.assertNotIn(sell, self.client._pending_orders)
+
+    def test_failed_snapshot_keeps_table(self):
+        """Test that a failed subaccount_orders query does not drop anything."""
+        self._place_quote(self._echo_digests)
+
+        async def post(endpoint, payload):
+            return {"status": "failure", "error": "rate limited"}
+
+        self.client._post = post
+        asyncio.run(self.client.get_active_orders("4"))
+        self.assertEqual(len(self.client.tracked_orders()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Offline check of the precomputed EIP-712 signer (exchanges/nado_signer.py).
+
+Compares NadoSigner's digests and signatures byte for byte with eth_account's
+sign_typed_data on random orders and cancellations, and the RFC 6979 nonces
+with published secp256k1 vectors. Fixed order digests (computed once with
+eth_account) check that mock_gateway.py answers with the digest the client
+expects on each network. No gateway or key from .env is needed.
+
+用法: python -m pytest -q test_nado_signer.py  (或 python test_nado_signer.py)
+"""
+
+import hashlib
+import os
+import random
+import unittest
+from unittest import mock
+
+from eth_account import Account
+from eth_keys import keys
+
+from exchanges.nado import network_config
+from exchanges.nado_signer import NadoSigner, _N, _rfc6979_k
+from mock_gateway import MockGateway
+
+CHAIN_ID = 57073
+ENDPOINT = "0x05ec92d78ed421f3d3ada77ffde167106565974e"
+
+DOMAIN_FIELDS = {"name": "Nado", "version": "0.0.1", "chainId": CHAIN_ID}
+ORDER_TYPES = {"Order": [
+    {"name": "sender", "type": "bytes32"},
+    {"name": "priceX18", "type": "int128"},
+    {"name": "amount", "type": "int128"},
+    {"name": "expiration", "type": "uint64"},
+    {"name": "nonce", "type": "uint64"},
+    {"name": "appendix", "type": "uint128"},
+]}
+CANCELLATION_TYPES = {"Cancellation": [
+    {"name": "sender", "type": "bytes32"},
+    {"name": "productIds", "type": "uint32[]"},
+    {"name": "digests", "type": "bytes32[]"},
+    {"name": "nonce", "type": "uint64"},
+]}
+
+# secp256k1 / SHA-256 deterministic nonces (private key, message, k)
+RFC6979_VECTORS = [
+    (1, b"Satoshi Nakamoto",
+     0x8F8A276C19F4149656B280621E358CCE24F5F52542772691EE69063B74F15D15),
+    (1, b"All those moments will be lost in time, like tears in rain. Time to die...",
+     0x38AA22D72376B4DBC472E06C3BA403EE0A394DA63FC58D88686C611ABA98D6B3),
+    (_N - 1, b"Satoshi Nakamoto",
+     0x33A19B60E25FB6F4435AF53A3D42D493644827367E6453928554F43E49AA6F90),
+    (0xF8B8AF8CE3C7CCA5E300D33939540C10D45CE001B8F252BFBC57BA0342904181, b"Alan Turing",
+     0x525A82B70E67874398067543FD84C83D30C175FDC45FDEEE082FE13B1D7CFDF1),
+]
+
+
+# One ETH-PERP post-only order and its EIP-712 digest per chain, from eth_account's encode_typed_data
+FIXED_ORDER = {
+    "sender": "0x" + "ab" * 20 + "64656661756c740000000000",
+    "priceX18": 3000 * 10**18,
+    "amount": 10**16,
+    "expiration": 4294967295,
+    "nonce": (1_700_000_000_000 << 20) | 7,
+    "appendix": 1 | (3 << 9),
+}
+FIXED_PRODUCT_ID = 4
+FIXED_ORDER_DIGESTS = {
+    57073: "0x0dffc06f966318a4e5cc3ea83277c352a7d765ad230e3d4d4485a217d0c8452d",
+    763373: "0x47946a82b5707b63ad78f7f8168b9be12494723cb6636b93c2dd66cf94a0abcf",
+}
+
+
+def _product_contract(product_id: int) -> str:
+    return "0x" + format(product_id, "040x")
+
+
+def _random_order(rng: random.Random) -> dict:
+    return {
+        "sender": "0x" + rng.randbytes(32).hex(),
+        "priceX18": rng.randrange(1, 10**24),
+        "amount": rng.choice((1, -1)) * rng.randrange(1, 10**21),
+        "expiration": rng.randrange(1 << 64),
+        "nonce": rng.randrange(1 << 64),
+        "appendix": rng.randrange(1 << 128),
+    }
+
+
+def _random_cancellation(rng: random.Random) -> dict:
+    count = rng.randint(1, 8)
+    return {
+        "sender": "0x" + rng.randbytes(32).hex(),
+        "productIds": [rng.randrange(1 << 32) for _ in range(count)],
+        "digests": ["0x" + rng.randbytes(32).hex() for _ in range(count)],
+        "nonce": rng.randrange(1 << 64),
+    }
+
+
+class TestNadoSigner(unittest.TestCase):
+    """NadoSigner must stay byte-identical to eth_account.Account.sign_typed_data."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures."""
+        cls.rng = random.Random(11)
+        cls.key = cls.rng.randbytes(32)
+        cls.signer = NadoSigner(cls.key, CHAIN_ID)
+
+    def test_orders_match_eth_account(self):
+        """Test order digests and signatures against sign_typed_data on random orders."""
+        for _ in range(200):
+            order = _random_order(self.rng)
+            product_id = self.rng.randrange(1, 300)
+            expected = Account.sign_typed_data(
+                self.key,
+                domain_data={**DOMAIN_FIELDS, "verifyingContract": _product_contract(product_id)},
+                message_types=ORDER_TYPES,
+                message_data={**order, "sender": bytes.fromhex(order["sender"][2:])})
+            digest = self.signer.order_digest(order, product_id)
+            self.assertEqual(digest, bytes(expected.message_hash))
+            self.assertEqual(self.signer.sign_digest(digest), bytes(expected.signature))
+
+    def test_cancellations_match_eth_account(self):
+        """Test cancellation digests and signatures against sign_typed_data."""
+        for _ in range(100):
+            cancellation = _random_cancellation(self.rng)
+            expected = Account.sign_typed_data(
+                self.key,
+                domain_data={**DOMAIN_FIELDS, "verifyingContract": ENDPOINT},
+                message_types=CANCELLATION_TYPES,
+                message_data={**cancellation, "sender": bytes.fromhex(cancellation["sender"][2:]),
+                              "digests": [bytes.fromhex(d[2:]) for d in cancellation["digests"]]})
+            digest = self.signer.cancellation_digest(cancellation, ENDPOINT)
+            self.assertEqual(digest, bytes(expected.message_hash))
+            self.assertEqual(self.signer.sign_cancellation(cancellation, ENDPOINT),
+                             "0x" + bytes(expected.signature).hex())
+
+    def test_rfc6979_vectors(self):
+        """Test the deterministic nonce and the signature on published secp256k1 vectors."""
+        for private_key, message, k in RFC6979_VECTORS:
+            key_bytes = private_key.to_bytes(32, "big")
+            msg_hash = hashlib.sha256(message).digest()
+            self.assertEqual(_rfc6979_k(msg_hash, key_bytes), k)
+            expected = keys.PrivateKey(key_bytes).sign_msg_hash(msg_hash).to_bytes()
+            signature = NadoSigner(key_bytes, CHAIN_ID).sign_digest(msg_hash)
+            self.assertEqual(signature[:64], expected[:64])
+            self.assertEqual(signature[64], expected[64] + 27)
+            self.assertLessEqual(int.from_bytes(signature[32:64], "big") * 2, _N)
+
+    def test_fixed_order_digests(self):
+        """Test the order digest against fixed known-good digests on mainnet and testnet."""
+        for chain_id, expected in FIXED_ORDER_DIGESTS.items():
+            digest = NadoSigner(self.key, chain_id).order_digest(FIXED_ORDER, FIXED_PRODUCT_ID)
+            self.assertEqual("0x" + digest.hex(), expected)
+
+
+class TestMockGatewayDigests(unittest.TestCase):
+    """The mock must answer with the digest a client on the same NADO_NETWORK computed."""
+
+    def _placed_digest(self, gateway: MockGateway) -> str:
+        order = {key: str(value) if key != "sender" else value for key, value in FIXED_ORDER.items()}
+        return gateway._place({"product_id": FIXED_PRODUCT_ID, "order": order})["digest"]
+
+    def test_follows_client_network(self):
+        """Test the mock's default chain id and digests on each NADO_NETWORK."""
+        for network, chain_id in (("mainnet", 57073), ("testnet", 763373)):
+            with mock.patch.dict(os.environ, {"NADO_NETWORK": network}):
+                gateway = MockGateway(seed=1)
+                self.assertEqual(gateway.chain_id, network_config()["chain_id"])
+                self.assertEqual(gateway.chain_id, chain_id)
+                self.assertEqual(self._placed_digest(gateway), FIXED_ORDER_DIGESTS[chain_id])
+
+    def test_default_network_is_mainnet(self):
+        """Test that with NADO_NETWORK unset the mock signs for mainnet, like NadoClient."""
+        env = {k: v for k, v in os.environ.items() if k != "NADO_NETWORK"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            self.assertEqual(self._placed_digest(MockGateway(seed=1)), FIXED_ORDER_DIGESTS[57073])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for DepthSynchronizer (orderbook.py).
+
+Each delta adds one bid level whose price is its ``max_timestamp`` and each
+snapshot holds one bid at its own timestamp, so the book's bid prices show
+exactly which updates were applied. Snapshots come from a stub
+``fetch_snapshot``; no gateway is involved.
+
+用法: python -m pytest -q test_orderbook_sync.py  (或 python test_orderbook_sync.py)
+"""
+
+import asyncio
+import unittest
+
+from helpers.depth_frame import DepthFrame
+from orderbook import DepthSynchronizer, LocalOrderBook
+
+
+def delta(last_max_ts: int, max_ts: int) -> DepthFrame:
+    return DepthFrame(4, [[str(max_ts), "1"]], [], last_max_ts=last_max_ts, max_ts=max_ts)
+
+
+def snapshot(ts: int) -> dict:
+    return {"bids": [[str(ts), "1"]], "asks": [], "timestamp": str(ts)}
+
+
+class TestDepthSynchronizer(unittest.IsolatedAsyncioTestCase):
+    """DepthSynchronizer must keep the book contiguous across gaps and resyncs."""
+
+    async def asyncSetUp(self):
+        """Set up test fixtures."""
+        self.book = LocalOrderBook()
+        self.snapshots = []
+        self.fetched = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.sync = DepthSynchronizer(self.book, self._fetch)
+        await self.sync.on_depth(DepthFrame(4, [["100", "1"]], [], max_ts=100, is_snapshot=True))
+
+    async def _fetch(self):
+        self.fetched += 1
+        await self.release.wait()
+        return snapshot(self.snapshots.pop(0))
+
+    def bid_prices(self):
+        return sorted(price for price, _ in self.book.depth(100)[0])
+
+    async def finish_resync(self):
+        await asyncio.wait_for(self.sync._resync_task, 10)
+
+    async def test_in_order_updates(self):
+        """Test that contiguous deltas are applied without a resync."""
+        for last, ts in ((100, 110), (110, 120), (120, 130)):
+            await self.sync.on_depth(delta(last, ts))
+        self.assertEqual(self.bid_prices(), [100, 110, 120, 130])
+        self.assertEqual((self.sync.gaps, self.fetched), (0, 0))
+        self.assertFalse(self.book.stale)
+
+    async def test_gap_then_resync(self):
+        """Test that a gap marks the book stale, buffers, and replays on top of the snapshot."""
+        self.snapshots.append(135)
+        self.release.clear()
+        await self.sync.on_depth(delta(130, 140))  # 110..130 missing
+        self.assertTrue(self.book.stale)
+        await self.sync.on_depth(delta(140, 150))  # arrives while the snapshot is in flight
+        self.release.set()
+        await self.finish_resync()
+
+        self.assertEqual(self.bid_prices(), [135, 140, 150])
+        self.assertFalse(self.book.stale)
+        self.assertEqual((self.sync.gaps, self.sync.resyncs, self.fetched), (1, 1, 1))
+        await self.sync.on_depth(delta(150, 160))
+        self.assertEqual(self.bid_prices(), [135, 140, 150, 160])
+
+    async def test_stale_frames_skipped(self):
+        """Test that deltas the snapshot already covers are not replayed, nor applied afterwards."""
+        self.snapshots.append(145)
+        self.release.clear()
+        await self.sync.on_depth(delta(120, 130))  # gap (last is 100)
+        await self.sync.on_depth(delta(130, 140))
+        await self.sync.on_depth(delta(140, 150))
+        self.release.set()
+        await self.finish_resync()
+        self.assertEqual(self.bid_prices(), [145, 150])
+
+        await self.sync.on_depth(delta(130, 140))  # late duplicate
+        self.assertEqual(self.bid_prices(), [145, 150])
+        self.assertEqual(self.sync.gaps, 1)
+
+    async def test_second_gap_during_replay(self):
+        """Test that a gap inside the buffer keeps the deltas for the next, newer snapshot."""
+        self.snapshots.extend([135, 165])
+        self.release.clear()
+        await self.sync.on_depth(delta(130, 140))
+        await self.sync.on_depth(delta(160, 170))  # 150 never arrived
+        await self.sync.on_depth(delta(170, 180))
+        self.release.set()
+        await self.finish_resync()
+
+        self.assertEqual(self.fetched, 2)
+        self.assertEqual(self.bid_prices(), [165, 170, 180])
+        self.assertFalse(self.book.stale)
+        self.assertEqual(self.sync.resyncs, 1)
+        self.assertEqual(len(self.sync._buffer), 0)
+
+    async def test_snapshot_older_than_buffer(self):
+        """Test that a snapshot predating the first buffered delta is retried, keeping the delta."""
+        self.snapshots.extend([125, 145])
+        self.release.clear()
+        await self.sync.on_depth(delta(130, 140))
+        await self.sync.on_depth(delta(140, 150))
+        self.release.set()
+        await self.finish_resync()
+
+        self.assertEqual(self.fetched, 2)
+        self.assertEqual(self.bid_prices(), [145, 150])
+        self.assertFalse(self.book.stale)
+
+
+if __name__ == "__main__":
+    unittest.main()